@@ -36,7 +36,7 @@ from .comminfo import *
 from .trade import *
 from .position import *
 
-from .store import Store
+from .store import Store, AsyncStore
 
 from . import broker as broker
 from .broker import *
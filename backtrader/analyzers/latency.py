@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import bisect
+import json
+import time
+
+import backtrader as bt
+from backtrader.utils import AutoOrderedDict
+
+
+__all__ = ['Latency']
+
+
+class _Histogram(object):
+    '''Counts latencies (seconds) in buckets of increasing size (1-2-5 from
+    100 microseconds to 100 seconds, plus an overflow bucket)'''
+    BOUNDS = tuple(m * 10.0 ** e for e in range(-4, 2) for m in (1, 2, 5))
+    BOUNDS += (100.0, float('inf'))
+
+    def __init__(self):
+        self.counts = [0] * len(self.BOUNDS)
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(self.BOUNDS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, q):
+        # upper bound of the bucket holding the percentile (capped to max)
+        target = q * self.count
+        cum = 0
+        for bound, count in zip(self.BOUNDS, self.counts):
+            cum += count
+            if cum >= target:
+                return min(bound, self.max)
+
+        return self.max
+
+
+class Latency(bt.Analyzer):
+    '''This analyzer measures the latency of live trading along the way of a
+    bar from the exchange to the strategy and the way of an order from the
+    strategy to the exchange
+
+    It uses the ``stamps`` (wall clock times) set by the live feeds on the
+    last delivered bar and by the live brokers on the orders. Nothing is
+    measured in a backtest, because no stamps are set
+
+    Stages for the bars:
+
+      - ``feed``: exchange event to arrival to the feed queue (includes the
+        difference between the clocks of the exchange and the local one)
+      - ``queue``: waiting in the queue until loaded by the cerebro loop
+      - ``strategy``: from loaded until the strategy has run ``next`` for it
+
+    Stages for the orders:
+
+      - ``submit``: from the submission to the broker until the request leaves
+      - ``ack``: from the request until the answer of the exchange
+      - ``fill``: from the request until the 1st fill is received
+
+    Params:
+
+      - ``logfile`` (default: ``None``)
+
+        File name (or file-like object) to which each measurement is written
+        as a JSON line with keys ``time``, ``stage``, ``latency`` (seconds)
+        and ``source`` (data name or order reference)
+
+    Methods:
+
+      - get_analysis
+
+        Returns a dictionary with the stages as keys and for each a
+        dictionary with ``count``, ``mean``, ``min``, ``max``, ``p50``,
+        ``p90``, ``p99`` and ``hist`` (list of ``[upper bound, count]`` for
+        the non-empty buckets)
+    '''
+    params = (
+        ('logfile', None),
+    )
+
+    BAR_STAGES = (
+        ('feed', 'event', 'queued'),
+        ('queue', 'queued', 'loaded'),
+        ('strategy', 'loaded', None),  # None: when the analyzer runs
+    )
+
+    ORDER_STAGES = (
+        ('submit', 'submit', 'sent'),
+        ('ack', 'sent', 'ack'),
+        ('fill', 'sent', 'fill'),
+    )
+
+    def create_analysis(self):
+        self.rets = AutoOrderedDict()
+
+    def start(self):
+        self._hists = dict()
+        self._laststamps = dict()  # data -> stamps already measured
+        self._ostages = dict()  # order ref -> stages already measured
+
+        self._log = self._logclose = None
+        logfile = self.p.logfile
+        if logfile is not None:
+            if hasattr(logfile, 'write'):
+                self._log = logfile
+            else:
+                self._log = self._logclose = open(logfile, 'a')
+
+    def stop(self):
+        self.get_analysis()
+        if self._logclose is not None:
+            self._logclose.close()
+
+    def _record(self, stage, latency, source, now):
+        hist = self._hists.get(stage)
+        if hist is None:
+            hist = self._hists[stage] = _Histogram()
+
+        hist.add(latency)
+        if self._log is not None:
+            self._log.write(json.dumps(dict(time=now, stage=stage,
+                                            latency=latency, source=source)))
+            self._log.write('\n')
+
+    def next(self):
+        now = None
+        for data in self.datas:
+            stamps = data.stamps
+            if stamps is None or stamps is self._laststamps.get(data):
+                continue
+
+            self._laststamps[data] = stamps
+            now = now or time.time()
+            for stage, begin, end in self.BAR_STAGES:
+                t0 = stamps.get(begin)
+                t1 = now if end is None else stamps.get(end)
+                if t0 is not None and t1 is not None:
+                    self._record(stage, t1 - t0, data._name, now)
+
+    def notify_order(self, order):
+        stamps = order.stamps
+        if stamps:
+            done = self._ostages.setdefault(order.ref, set())
+            now = time.time()
+            for stage, begin, end in self.ORDER_STAGES:
+                if stage in done or begin not in stamps or end not in stamps:
+                    continue
+
+                done.add(stage)
+                self._record(stage, stamps[end] - stamps[begin], order.ref, now)
+
+        if not order.alive():
+            self._ostages.pop(order.ref, None)
+
+    def get_analysis(self):
+        rets = self.rets
+        for stage, hist in self._hists.items():
+            r = rets[stage] = AutoOrderedDict()
+            r.count = hist.count
+            r.mean = hist.total / hist.count
+            r.min = hist.min
+            r.max = hist.max
+            r.p50 = hist.percentile(0.50)
+            r.p90 = hist.percentile(0.90)
+            r.p99 = hist.percentile(0.99)
+            r.hist = [[bound, count]
+                      for bound, count in zip(hist.BOUNDS, hist.counts)
+                      if count]
+
+        return rets
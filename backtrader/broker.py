@@ -50,6 +50,9 @@ class BrokerBase(with_metaclass(MetaBroker, object)):
         ('commission', CommInfoBase(percabs=True)),
     )
 
+    # Live mode: set by cerebro (if any) to be woken up for notifications
+    _wakeup = None
+
     def __init__(self):
         self.comminfo = dict()
         self.init()
@@ -161,6 +164,23 @@ class BrokerBase(with_metaclass(MetaBroker, object)):
 
         raise NotImplementedError
 
+    def submit_batch(self, owner, orders):
+        '''Submits several orders at once, like the ones needed to rebalance
+        a portfolio
+
+          - ``orders``: iterable of ``(data, size, kwargs)`` tuples. A positive
+            ``size`` creates a buy order and a negative one a sell order.
+            ``kwargs`` are passed to ``buy``/``sell``
+
+        Returns the list of created orders (entries with a ``size`` of ``0``
+        are skipped)
+
+        This default implementation submits the orders one by one
+        '''
+        return [(self.buy if size > 0 else self.sell)(owner, data, abs(size),
+                                                      **kwargs)
+                for data, size, kwargs in orders if size]
+
     def next(self):
         pass
 
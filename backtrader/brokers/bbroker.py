@@ -21,9 +21,12 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import bisect
 import collections
 import datetime
 from decimal import Decimal
+import heapq
+import itertools
 
 import backtrader as bt
 from backtrader.order import Order, BuyOrder, SellOrder
@@ -33,6 +36,125 @@ from backtrader.utils.py3 import string_types, integer_types
 __all__ = ['BackBroker', 'BrokerBack']
 
 
+class _OrderBook(object):
+    '''Pending orders of a single data feed
+
+    Resting orders with a fixed trigger price are kept in 2 lists sorted by
+    price: ``downs`` (triggered if the price goes down to the trigger, like a
+    buy limit or a sell stop) and ``ups`` (triggered if the price goes up to
+    it). Orders which have to be looked at on each bar (market, close,
+    trailing ...) are kept in ``always`` and orders with a ``valid`` date are
+    also kept in an expiration heap.
+
+    Entries are not removed from the lists/heap when the order leaves the
+    book. An entry is only current if its version matches the one in ``live``
+    and the stale ones are purged when they outnumber the current ones
+    '''
+    def __init__(self):
+        self.live = dict()  # order.ref -> (seq, version, order)
+        self.always = dict()  # order.ref -> order
+        self.downs = list()  # (trigger, seq, version, order)
+        self.ups = list()  # (trigger, seq, version, order)
+        self.expiry = list()  # heap of (valid, seq, version, order)
+
+    def add(self, order, seq, version, trigger, up):
+        self.live[order.ref] = (seq, version, order)
+        if trigger is None:
+            self.always[order.ref] = order
+        else:
+            bisect.insort(self.ups if up else self.downs,
+                          (trigger, seq, version, order))
+
+        if order.valid:
+            heapq.heappush(self.expiry, (order.valid, seq, version, order))
+
+    def remove(self, order):
+        self.live.pop(order.ref, None)
+        self.always.pop(order.ref, None)
+
+    def _current(self, entry):
+        cur = self.live.get(entry[-1].ref)
+        return cur is not None and cur[1] == entry[-2]
+
+    def take(self, dt, lo, hi):
+        '''Removes from the book and returns as (seq, order) the orders which
+        may be triggered by a bar with a price range ``lo``-``hi`` or which
+        may expire at ``dt``'''
+        entries = [self.live[ref] for ref in self.always]
+
+        if lo is not None:
+            idx = bisect.bisect_left(self.downs, (lo,))
+            entries.extend(e[1:] for e in self.downs[idx:] if self._current(e))
+            del self.downs[idx:]
+
+            idx = bisect.bisect_left(self.ups, (hi, float('inf')))
+            entries.extend(e[1:] for e in self.ups[:idx] if self._current(e))
+            del self.ups[:idx]
+
+        expiry = self.expiry
+        while expiry and expiry[0][0] < dt:
+            e = heapq.heappop(expiry)
+            if self._current(e):
+                entries.append(e[1:])
+
+        taken = list()
+        for seq, version, order in entries:
+            if self.live.pop(order.ref, None) is not None:  # not yet taken
+                self.always.pop(order.ref, None)
+                taken.append((seq, order))
+
+        nlive = len(self.live)
+        if len(self.downs) + len(self.ups) + len(expiry) > 2 * nlive + 64:
+            self.downs = [e for e in self.downs if self._current(e)]
+            self.ups = [e for e in self.ups if self._current(e)]
+            self.expiry = [e for e in expiry if self._current(e)]
+            heapq.heapify(self.expiry)
+
+        return taken
+
+
+class _PendingOrders(object):
+    '''Queue of pending orders used with the order book
+
+    It keeps the orders in the order of the pending deque of the full scan,
+    but an order can be removed without scanning the queue. Each order gets
+    a sequence number which tells its place in the queue'''
+    def __init__(self):
+        self._orders = collections.OrderedDict()  # order.ref -> (seq, order)
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __iter__(self):
+        return (order for seq, order in self._orders.values())
+
+    def append(self, order):
+        self._orders[order.ref] = (next(self._seq), order)
+
+    def remove(self, order):
+        if self._orders.pop(order.ref, None) is None:
+            raise ValueError('order not pending')
+
+    def seq(self, order):
+        return self._orders[order.ref][0]
+
+    def scanback(self, refs, inflight=None):
+        '''Returns the pending orders with a reference in ``refs`` in the
+        order in which the full scan finds them going backwards over its
+        queue. If ``inflight`` is being processed, the orders ahead of it
+        have already been moved to the end of the queue'''
+        entries = [self._orders[ref] for ref in refs if ref in self._orders]
+        if inflight is not None and inflight.ref in self._orders:
+            seq0 = self.seq(inflight)
+            entries = [e for e in entries if e[1] is not inflight]
+            entries.sort(key=lambda e: (e[0] < seq0, e[0]), reverse=True)
+        else:
+            entries.sort(key=lambda e: e[0], reverse=True)
+
+        return [order for seq, order in entries]
+
+
 class BackBroker(bt.BrokerBase):
     '''Broker Simulator
 
@@ -220,6 +342,20 @@ class BackBroker(bt.BrokerBase):
           automatically calculate returns based on the fund value and not on
           the total net asset value
 
+        - ``orderbook`` (default: ``True``)
+
+          Index the pending orders of each data by trigger price and
+          expiration. On each bar only the orders which can be triggered by
+          the price range of the bar, which may expire or which have to be
+          checked on each bar (like ``Market`` or ``StopTrail``) are looked
+          at. Resting ``Limit`` and ``Stop`` orders away from the market cost
+          nothing.
+
+          Executions and notifications (including the ones of canceled
+          ``oco`` orders) happen in the same order as with the full scan
+
+          If ``False`` all pending orders are checked on each bar
+
     '''
     params = (
         ('cash', Decimal('10000.0')),
@@ -239,6 +375,7 @@ class BackBroker(bt.BrokerBase):
         ('shortcash', True),
         ('fundstartval', Decimal('100.0')),
         ('fundmode', False),
+        ('orderbook', True),
     )
 
     def __init__(self):
@@ -261,10 +398,18 @@ class BackBroker(bt.BrokerBase):
         self._unrealized = Decimal('0.0')  # no open position
 
         self.orders = list()  # will only be appending
-        self.pending = collections.deque()  # popleft and append(right)
+        if self.p.orderbook:
+            self.pending = _PendingOrders()
+            self._books = dict()  # per data
+            self._bookversion = itertools.count()  # to spot stale entries
+        else:
+            self.pending = collections.deque()  # popleft and append(right)
+            self._books = None
+        self._inflight = None  # order out of pending during execution
         self._toactivate = collections.deque()  # to activate in next cycle
 
         self.positions = collections.defaultdict(Position)
+        self._posvalues = dict()  # per data: last valuation of the position
         self.d_credit = collections.defaultdict(Decimal)  # credit per data
         self.notifs = collections.deque()
 
@@ -389,12 +534,17 @@ class BackBroker(bt.BrokerBase):
     fundvalue = property(get_fundvalue)
 
     def cancel(self, order, bracket=False):
+        if order is self._inflight:
+            return False  # being processed, not in the pending queue
+
         try:
             self.pending.remove(order)
         except ValueError:
             # If the list didn't have the element we didn't cancel anything
             return False
 
+        self._unbook(order)
+
         order.cancel()
         self.notify(order)
         self._ococheck(order)
@@ -432,14 +582,7 @@ class BackBroker(bt.BrokerBase):
         for data in datas or self.positions:
             comminfo = self.getcommissioninfo(data)
             position = self.positions[data]
-            # use valuesize:  returns raw value, rather than negative adj val
-            if not self.p.shortcash:
-                dvalue = comminfo.getvalue(position, data.close[0])
-            else:
-                dvalue = comminfo.getvaluesize(position.size, data.close[0])
-
-            dunrealized = comminfo.profitandloss(position.size, position.price,
-                                                 data.close[0])
+            dvalue, dunrealized = self._posvalue(data, comminfo, position)
             if datas and len(datas) == 1:
                 if lever and dvalue > 0:
                     dvalue -= dunrealized
@@ -486,6 +629,31 @@ class BackBroker(bt.BrokerBase):
 
         return self._value if not lever else self._valuelever
 
+    def _posvalue(self, data, comminfo, position):
+        # Value and unrealized pnl of a position. Only recalculated if the
+        # price, the position or the commission scheme have changed, which
+        # is not the case for most positions of a large portfolio in a bar
+        close = data.close[0]
+        size, price = position.size, position.price
+        shortcash = self.p.shortcash
+
+        c = self._posvalues.get(data)
+        if (c is not None and c[0] == close and c[1] is size and
+                c[2] is price and c[3] is comminfo and c[4] == shortcash):
+            return c[5], c[6]
+
+        # use valuesize:  returns raw value, rather than negative adj val
+        if not shortcash:
+            dvalue = comminfo.getvalue(position, close)
+        else:
+            dvalue = comminfo.getvaluesize(size, close)
+
+        dunrealized = comminfo.profitandloss(size, price, close)
+
+        self._posvalues[data] = (close, size, price, comminfo, shortcash,
+                                 dvalue, dunrealized)
+        return dvalue, dunrealized
+
     def get_leverage(self):
         return self._leverage
 
@@ -587,8 +755,48 @@ class BackBroker(bt.BrokerBase):
         order.submit()
         order.accept()
         self.pending.append(order)
+        self._bookorder(order)
         self.notify(order)
 
+    def _bookorder(self, order):
+        if self._books is None:
+            return
+
+        book = self._books.get(order.data)
+        if book is None:
+            book = self._books[order.data] = _OrderBook()
+
+        # Only prices which do not move bar after bar can go in the sorted
+        # lists. The rest (market, close, trailing) is checked on each bar
+        exectype = order.exectype
+        trigger = up = None
+        if exectype == Order.Limit:
+            trigger, up = order.created.price, order.issell()
+        elif exectype in [Order.StopLimit, Order.StopTrailLimit]:
+            if order.triggered:
+                trigger, up = order.created.pricelimit, order.issell()
+            elif exectype == Order.StopLimit:
+                trigger, up = order.created.price, order.isbuy()
+        elif exectype == Order.Stop:
+            trigger, up = order.created.price, order.isbuy()
+
+        if trigger:
+            trigger = Decimal(str(trigger))
+            if trigger.is_nan():
+                trigger = None
+        else:
+            trigger = None
+
+        # the place in the pending queue sorts the orders taken from the book
+        seq = self.pending.seq(order)
+        book.add(order, seq, next(self._bookversion), trigger, up)
+
+    def _unbook(self, order):
+        if self._books is not None:
+            book = self._books.get(order.data)
+            if book is not None:
+                book.remove(order)
+
     def _bracketize(self, order, cancel=False):
         oref = order.ref
         pref = getattr(order.parent, 'ref', oref)
@@ -611,11 +819,19 @@ class BackBroker(bt.BrokerBase):
         parentref = self._ocos[order.ref]
         ocoref = self._ocos.get(parentref, None)
         ocol = self._ocol.pop(ocoref, None)
-        if ocol:
+        if ocol and self._books is not None:
+            for o in self.pending.scanback(ocol, self._inflight):
+                self.pending.remove(o)
+                self._unbook(o)
+                o.cancel()
+                self.notify(o)
+
+        elif ocol:
             for i in range(len(self.pending) - 1, -1, -1):
                 o = self.pending[i]
-                if o is not None and o.ref in ocol:
+                if o is not None and o.ref in ocol and o is not self._inflight:
                     del self.pending[i]
+                    self._unbook(o)
                     o.cancel()
                     self.notify(o)
 
@@ -688,6 +904,50 @@ class BackBroker(bt.BrokerBase):
 
         return self.submit(order, check=_checksubmit)
 
+    def submit_batch(self, owner, orders, check=True):
+        '''Submits several orders at once (see ``BrokerBase.submit_batch``)
+
+        The orders are created and transmitted in one go and the cash/margin
+        check (``checksubmit``) is done for the whole batch in the next
+        iteration, in the given order, with the same results and
+        notifications as if the orders had been submitted one by one.
+
+        Only stand-alone orders are supported: ``kwargs`` may contain
+        ``price``, ``exectype``, ``valid`` and ``tradeid`` and the rest is
+        added as information to the order (no brackets, oco or trailing)
+        '''
+        batch = list()
+        for data, size, kwargs in orders:
+            if not size:
+                continue
+
+            kwargs = dict(kwargs)
+            price = kwargs.pop('price', None)
+            ordcls = BuyOrder if size > 0 else SellOrder
+            order = ordcls(owner=owner, data=data, size=abs(size),
+                           price=Decimal(str(price)) if price else None,
+                           exectype=kwargs.pop('exectype', None),
+                           valid=kwargs.pop('valid', None),
+                           tradeid=kwargs.pop('tradeid', 0))
+
+            order.addinfo(**kwargs)
+            self._ocoize(order, None)
+            self._pchildren[order.ref].append(order)  # as in submit
+            batch.append(order)
+
+        if check and self.p.checksubmit:
+            for order in batch:
+                order.submit()
+                self.notify(order)
+
+            self.submitted.extend(batch)
+            self.orders.extend(batch)
+        else:
+            for order in batch:
+                self.submit_accept(order)
+
+        return batch
+
     def _execute(self, order, ago=None, price=None, cash=None, position=None,
                  dtcoc=None):
         # ago = None is used a flag for pseudo execution
@@ -1042,9 +1302,7 @@ class BackBroker(bt.BrokerBase):
 
         return None  # no price can be returned
 
-    def _try_exec(self, order):
-        data = order.data
-
+    def _barprices(self, data):
         popen = getattr(data, 'tick_open', None)
         if popen is None:
             popen = Decimal(str(data.open[0]))
@@ -1058,6 +1316,11 @@ class BackBroker(bt.BrokerBase):
         if pclose is None:
             pclose = Decimal(str(data.close[0]))
 
+        return popen, phigh, plow, pclose
+
+    def _try_exec(self, order):
+        popen, phigh, plow, pclose = self._barprices(order.data)
+
         pcreated = Decimal(str(order.created.price))
         plimit = Decimal(str(order.created.pricelimit)) if order.created.pricelimit else None
 
@@ -1200,29 +1463,32 @@ class BackBroker(bt.BrokerBase):
 
         self._process_order_history()
 
-        # Iterate once over all elements of the pending queue
-        self.pending.append(None)
-        while True:
-            order = self.pending.popleft()
-            if order is None:
-                break
+        if self._books is not None:
+            self._trybooks()
+        else:
+            # Iterate once over all elements of the pending queue
+            self.pending.append(None)
+            while True:
+                order = self.pending.popleft()
+                if order is None:
+                    break
 
-            if order.expire():
-                self.notify(order)
-                self._ococheck(order)
-                self._bracketize(order, cancel=True)
+                if order.expire():
+                    self.notify(order)
+                    self._ococheck(order)
+                    self._bracketize(order, cancel=True)
 
-            elif not order.active():
-                self.pending.append(order)  # cannot yet be processed
+                elif not order.active():
+                    self.pending.append(order)  # cannot yet be processed
 
-            else:
-                self._try_exec(order)
-                if order.alive():
-                    self.pending.append(order)
+                else:
+                    self._try_exec(order)
+                    if order.alive():
+                        self.pending.append(order)
 
-                elif order.status == Order.Completed:
-                    # a bracket parent order may have been executed
-                    self._bracketize(order)
+                    elif order.status == Order.Completed:
+                        # a bracket parent order may have been executed
+                        self._bracketize(order)
 
         # Operations have been executed ... adjust cash end of bar
         for data, pos in self.positions.items():
@@ -1237,6 +1503,48 @@ class BackBroker(bt.BrokerBase):
 
         self._get_value()  # update value
 
+    def _trybooks(self):
+        # Same as iterating over the pending queue, but only for the orders
+        # which can do something in this bar and in the same order
+        taken = []
+        for data, book in self._books.items():
+            if not book.live:
+                continue
+
+            lo = hi = None
+            if book.downs or book.ups:
+                popen, phigh, plow, pclose = self._barprices(data)
+                lo, hi = min(popen, plow), max(popen, phigh)
+
+            taken.extend(book.take(data.datetime[0], lo, hi))
+
+        if not taken:
+            return
+
+        taken.sort(key=lambda x: x[0])
+        for seq, order in taken:
+            if not order.alive():
+                continue  # canceled (oco, bracket) and out of pending
+
+            # Out of the pending queue while it is being processed
+            self._inflight = order
+            if order.expire():
+                self.notify(order)
+                self._ococheck(order)
+                self._bracketize(order, cancel=True)
+
+            elif order.active():
+                self._try_exec(order)
+                if order.status == Order.Completed:
+                    # a bracket parent order may have been executed
+                    self._bracketize(order)
+
+            self._inflight = None
+            if order.alive():
+                self._bookorder(order)
+            else:
+                self.pending.remove(order)
+
 
 # Alias
 BrokerBack = BackBroker
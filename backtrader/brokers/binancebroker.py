@@ -1,9 +1,13 @@
-from collections import deque
+from collections import deque, OrderedDict
+import threading
+import time
 
 import binance.enums as be
 
-from backtrader import BackBroker, CommInfoBase
+from backtrader import BackBroker, BrokerBase, CommInfoBase
 from backtrader.order import *
+from backtrader.stores.orderpipe import OrderPipeline, AsyncOrderPipeline
+from backtrader.utils import AsyncWakeup
 
 
 class BinanceOrder(Order):
@@ -46,12 +50,25 @@ class BinanceOrder(Order):
 class BinanceBroker(BackBroker):
     params = (
         ('cash', Decimal('1000.0')),
+        ('orderbook', False),  # fills come from the exchange (own next)
+        ('asyncsubmit', True),  # orders are placed by background workers
+        ('workers', 4),  # max order requests in flight with asyncsubmit
     )
 
+    # Max unknown orderIds whose fills are kept until the order is registered
+    _EARLYFILLS = 256
+
     def __init__(self, store):
         super(BinanceBroker, self).__init__()
 
-        self.order_trades = deque(maxlen=100)
+        # fills per binance orderId, fed by the user socket thread
+        self._fills = dict()
+        # fills reported before the REST reply (orderId not yet known)
+        self._early = OrderedDict()
+        self._fillslock = threading.Lock()
+        self._pipe = None  # order requests sent by workers (asyncsubmit)
+        self._sending = dict()  # ref -> [order, check, cancel] in flight
+        self._tocancel = deque()  # cancelled in flight, cancel once accepted
         self._store = store
         self._store.binance_socket.start_user_socket(self._handle_user_socket_message)
 
@@ -63,6 +80,23 @@ class BinanceBroker(BackBroker):
             stocklike=True
         )
 
+    def start(self):
+        super(BinanceBroker, self).start()
+        if self.p.asyncsubmit and self._pipe is None:
+            if isinstance(self._wakeup, AsyncWakeup):  # under run_async
+                # requests sent from the event loop (_send in its executor)
+                self._pipe = AsyncOrderPipeline(workers=self.p.workers,
+                                                loop=self._wakeup.loop)
+            else:
+                self._pipe = OrderPipeline(workers=self.p.workers)
+
+    def stop(self):
+        if self._pipe is not None:
+            self._pipe.stop()
+            self._pipe = None
+
+        super(BinanceBroker, self).stop()
+
     def _handle_user_socket_message(self, msg):
         """https://developers.binance.com/docs/binance-spot-api-docs/user-data-stream#order-update"""
         # print(msg)
@@ -73,17 +107,29 @@ class BinanceBroker(BackBroker):
         # 'm': False, 'M': True, 'O': 1707120960761, 'Z': '5.10296600', 'Y': '5.10296600', 'Q': '0.00000000', 'W': 1707120960761, 'V': 'EXPIRE_MAKER'}
         if msg['e'] == 'executionReport':
             if msg['s'] in self._store.symbols and msg['X'] in [be.ORDER_STATUS_FILLED, be.ORDER_STATUS_PARTIALLY_FILLED]:
-                for order in self.pending:
-                    if order.binance['orderId'] == msg['i']:
-                        self.order_trades.append({
-                            'orderId': msg['i'],
-                            'status': msg['X'],
-                            'size': msg['l'],
-                            'price': msg['L'],
-                            'commAmount': msg['n'],
-                            'commAsset': msg['N']
-                        })
-                        break
+                fill = {
+                    'orderId': msg['i'],
+                    'status': msg['X'],
+                    'size': msg['l'],
+                    'price': msg['L'],
+                    'commAmount': msg['n'],
+                    'commAsset': msg['N'],
+                    'stamp': time.time()
+                }
+                with self._fillslock:
+                    fills = self._fills.get(msg['i'])
+                    if fills is None:
+                        # the order may still be waiting for the REST reply
+                        # (or not be ours): keep it until it is registered
+                        self._early.setdefault(msg['i'], []).append(fill)
+                        while len(self._early) > self._EARLYFILLS:
+                            self._early.popitem(last=False)
+                        return
+
+                    fills.append(fill)
+
+                if self._wakeup is not None:
+                    self._wakeup.set()  # apply the fill at once
         elif msg['e'] == 'error':
             raise msg
 
@@ -106,12 +152,26 @@ class BinanceBroker(BackBroker):
 
         return self.submit(order)
 
+    def submit_batch(self, owner, orders):
+        # each order is placed in the exchange when created: one by one
+        return BrokerBase.submit_batch(self, owner, orders)
+
     def cancel(self, order, bracket=False):
+        sending = self._sending.get(order.ref)
+        if sending is not None:  # not yet in the exchange
+            sending[2] = True  # cancel it when the request is done
+            return True
+
+        if not order.alive():  # done (or cancelled again by _bracketize)
+            return False
+
         order_id = order.binance['orderId']
         symbol = order.data.symbol
         self._store.cancel_order(symbol=symbol, order_id=order_id)
-        super().cancel(order, bracket)
-        
+        ret = super().cancel(order, bracket)
+        self._dropfills(order)
+        return ret
+
     def format_price(self, value):
         return self._store.format_price(value)
 
@@ -154,13 +214,45 @@ class BinanceBroker(BackBroker):
         if self.get_cash() + cash <= self._store._cash:
             super().add_cash(cash)
 
+    def _addfills(self, order):
+        '''Registers the queue in which the fills of ``order`` are collected
+        and returns it, with the fills reported before the registration'''
+        oid = order.binance['orderId']
+        with self._fillslock:
+            fills = self._fills.setdefault(oid, deque())
+            fills.extend(self._early.pop(oid, ()))
+            return fills
+
+    def _popfills(self, order):
+        '''Returns the fills received for ``order`` since the last call'''
+        fills = self._fills.get(order.binance['orderId'])
+        trades = []
+        while fills:
+            trades.append(fills.popleft())
+
+        return trades
+
+    def _dropfills(self, order):
+        '''Discards the fills queue of an order which is no longer alive'''
+        if order.binance is not None:
+            with self._fillslock:
+                self._fills.pop(order.binance['orderId'], None)
+
     def next(self):
+        # Called by cerebro in each round of the live loop (even if no bar has
+        # been delivered), which applies fills as soon as they have arrived
         while self._toactivate:
             self._toactivate.popleft().activate()
 
+        if self._pipe is not None:
+            self._collect()
+
         if self.p.checksubmit:
             self.check_submitted()
 
+        while self._tocancel:  # accepted (or rejected) by now
+            self.cancel(self._tocancel.popleft())
+
         # Discount any cash for positions hold
         credit = Decimal('0.0')
         for data, pos in self.positions.items():
@@ -184,6 +276,7 @@ class BinanceBroker(BackBroker):
                 break
 
             if order.expire():
+                self._dropfills(order)
                 self.notify(order)
                 self._ococheck(order)
                 self._bracketize(order, cancel=True)
@@ -192,11 +285,11 @@ class BinanceBroker(BackBroker):
                 self.pending.append(order)  # cannot yet be processed
 
             else:
-                trades = [trade for trade in self.order_trades if trade['orderId'] == order.binance['orderId']]
+                trades = self._popfills(order)
 
                 for trade in trades:
+                    order.stamps.setdefault('fill', trade['stamp'])
                     self._execute(order, ago=0, price=Decimal(str(order.price)))
-                    self.order_trades.remove(trade)
 
                 if trades:
                     self.notify(order)
@@ -205,9 +298,11 @@ class BinanceBroker(BackBroker):
                 if order.alive():
                     self.pending.append(order)
 
-                elif order.status == Order.Completed:
-                    # a bracket parent order may have been executed
-                    self._bracketize(order)
+                else:
+                    self._dropfills(order)
+                    if order.status == Order.Completed:
+                        # a bracket parent order may have been executed
+                        self._bracketize(order)
 
         # Operations have been executed ... adjust cash end of bar
         for data, pos in self.positions.items():
@@ -381,26 +476,69 @@ class BinanceBroker(BackBroker):
             self._bracketize(order, cancel=True)
 
     def transmit(self, order, check=True):
+        order.stamps['submit'] = time.time()
+        if self._pipe is None:
+            self._send(order)
+            return super(BinanceBroker, self).transmit(order, check)
+
+        # The request is made by a worker and the order is accepted/rejected
+        # when collecting the outcome in next
+        order.submit()
+        self.notify(order)
+        self._sending[order.ref] = [order, check, False]
+        self._pipe.put(order.ref, self._send, order)
+        return order
+
+    def _collect(self):
+        '''Accepts/rejects the orders whose requests are done'''
+        while True:
+            done = self._pipe.get()
+            if done is None:
+                break
+
+            oref, ret, exc = done
+            order, check, cancel = self._sending.pop(oref)
+            if exc is not None:
+                order.addinfo(error=exc)
+                order.reject()
+                self.notify(order)
+                self._ococheck(order)
+                self._bracketize(order, cancel=True)
+                continue
+
+            if check and self.p.checksubmit:
+                self.submitted.append(order)  # already notified as Submitted
+                self.orders.append(order)
+            else:
+                self.submit_accept(order)
+
+            if cancel:  # once the order has been checked and accepted
+                self._tocancel.append(order)
+
+    def _send(self, order):
+        '''Places the order in the exchange and queues the fills returned'''
+        order.stamps['sent'] = time.time()
         order.transmit()
+        order.stamps['ack'] = ack = time.time()
 
         # print(1111, binance_order)
         # 1111 {'symbol': 'ETHUSDT', 'orderId': 15860400971, 'orderListId': -1, 'clientOrderId': 'EO7lLPcYNZR8cNEg8AOEPb', 'transactTime': 1707124560731, 'price': '0.00000000', 'origQty': '0.00220000', 'executedQty': '0.00220000', 'cummulativeQuoteQty': '5.10356000', 'status': 'FILLED', 'timeInForce': 'GTC', 'type': 'MARKET', 'side': 'BUY', 'workingTime': 1707124560731, 'fills': [{'price': '2319.80000000', 'qty': '0.00220000', 'commission': '0.00000220', 'commissionAsset': 'ETH', 'tradeId': 1297261843}], 'selfTradePreventionMode': 'EXPIRE_MAKER'}
         # order = BinanceOrder(owner, data, exectype, binance_order)
         execsize = float(order.binance['executedQty'])
 
+        fills = self._addfills(order)
         if execsize:
             for trade in order.binance['fills']:
-                self.order_trades.append({
+                fills.append({
                     'orderId': order.binance['orderId'],
                     'status': order.binance['status'],
                     'size': execsize,
                     'price': trade['price'],
                     'commAmount': trade['commission'],
-                    'commAsset': trade['commissionAsset']
+                    'commAsset': trade['commissionAsset'],
+                    'stamp': ack
                 })
 
-        return super().transmit(order, check)
-
     def submit_accept(self, order):
         self.orders.append(order)
         return super().submit_accept(order)
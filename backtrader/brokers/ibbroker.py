@@ -25,6 +25,7 @@ import collections
 from copy import copy
 from datetime import date, datetime, timedelta
 import threading
+import time
 import uuid
 
 import ib.ext.Order
@@ -38,7 +39,7 @@ from backtrader.metabase import MetaParams
 from backtrader.comminfo import CommInfoBase
 from backtrader.position import Position
 from backtrader.stores import ibstore
-from backtrader.utils import AutoDict, AutoOrderedDict
+from backtrader.utils import AutoDict, AutoOrderedDict, WakeupQueue
 from backtrader.comminfo import CommInfoBase
 
 bytes = bstr  # py2/3 need for ibpy
@@ -274,11 +275,12 @@ class IBBroker(with_metaclass(MetaIBBroker, BrokerBase)):
         self.orderbyid = dict()  # orders by order id
         self.executions = dict()  # notified executions
         self.ordstatus = collections.defaultdict(dict)
-        self.notifs = queue.Queue()  # holds orders which are notified
+        self.notifs = WakeupQueue()  # holds orders which are notified
         self.tonotify = collections.deque()  # hold oids to be notified
 
     def start(self):
         super(IBBroker, self).start()
+        self.notifs.wakeup = self._wakeup
         self.ib.start(broker=self)
 
         if self.ib.connected():
@@ -334,6 +336,7 @@ class IBBroker(with_metaclass(MetaIBBroker, BrokerBase)):
             order.m_ocaGroup = self.orderbyid[order.oco.m_orderId].m_ocaGroup
 
         self.orderbyid[order.m_orderId] = order
+        order.stamps['submit'] = order.stamps['sent'] = time.time()
         self.ib.placeOrder(order.m_orderId, order.data.tradecontract, order)
         self.notify(order)
 
@@ -421,6 +424,7 @@ class IBBroker(with_metaclass(MetaIBBroker, BrokerBase)):
             if order.status == order.Accepted:  # duplicate detection
                 return
 
+            order.stamps.setdefault('ack', time.time())
             order.accept(self)
             self.notify(order)
 
@@ -475,6 +479,10 @@ class IBBroker(with_metaclass(MetaIBBroker, BrokerBase)):
             pass
 
     def push_execution(self, ex):
+        order = self.orderbyid.get(ex.m_orderId)
+        if order is not None:
+            order.stamps.setdefault('fill', time.time())
+
         self.executions[ex.m_execId] = ex
 
     def push_commissionreport(self, cr):
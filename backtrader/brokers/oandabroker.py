@@ -25,6 +25,7 @@ import collections
 from copy import copy
 from datetime import date, datetime, timedelta
 import threading
+import time
 
 from backtrader.feed import DataBase
 from backtrader import (TimeFrame, num2date, date2num, BrokerBase,
@@ -254,6 +255,7 @@ class OandaBroker(with_metaclass(MetaOandaBroker, BrokerBase)):
                 self.put_notification(msg, order, price, size)
                 return
 
+        order.stamps.setdefault('fill', time.time())
         data = order.data
         pos = self.getposition(data, clone=False)
         psize, pprice, opened, closed = pos.update(size, price)
@@ -279,6 +281,7 @@ class OandaBroker(with_metaclass(MetaOandaBroker, BrokerBase)):
             self._bracketize(order)
 
     def _transmit(self, order):
+        order.stamps['submit'] = time.time()
         oref = order.ref
         pref = getattr(order.parent, 'ref', oref)  # parent ref or self
 
@@ -346,6 +349,8 @@ class OandaBroker(with_metaclass(MetaOandaBroker, BrokerBase)):
 
     def notify(self, order):
         self.notifs.append(order.clone())
+        if self._wakeup is not None:
+            self._wakeup.set()  # may come from the store threads
 
     def get_notification(self):
         if not self.notifs:
@@ -21,8 +21,10 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import asyncio
 import datetime
 import collections
+import functools
 import itertools
 import multiprocessing
 
@@ -41,7 +43,8 @@ from .brokers import BackBroker
 from .metabase import MetaParams
 from . import observers
 from .writer import WriterFile
-from .utils import OrderedDict, tzparse, num2date, date2num
+from .utils import (OrderedDict, tzparse, num2date, date2num, Wakeup,
+                    AsyncWakeup)
 from .strategy import Strategy, SignalStrategy
 from .tradingcal import (TradingCalendarBase, TradingCalendar,
                          PandasMarketCalendar)
@@ -269,6 +272,20 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
         Set to ``False`` for compatibility. May be changed to ``True``
 
+      - ``wakeup`` (default: ``0.5``)
+
+        Live mode only. Maximum time (in seconds) the loop sleeps when no
+        data has delivered anything. Feeds, stores and brokers wake the loop
+        up as soon as data or notifications arrive. The time is cut
+        short if a resampled bar can be delivered at an earlier time boundary.
+        The feeds do not wait for data (``qcheck``) on their own
+
+        It is only used if all live feeds wake the loop up when data arrives
+        (the feeds included in the package do, a feed tells it with the class
+        attribute ``_wakes``). Else, or if set to ``0`` (or ``None``), the
+        feeds wait with ``qcheck`` for incoming data. ``run_async`` always
+        sleeps in the event loop and uses ``0.5`` seconds in that case
+
     '''
 
     params = (
@@ -291,9 +308,12 @@ class Cerebro(with_metaclass(MetaParams, object)):
         ('cheat_on_open', False),
         ('broker_coo', True),
         ('quicknotify', False),
+        ('wakeup', 0.5),
     )
 
     def __init__(self):
+        self._wakeup = None
+        self._aloop = None
         self._dolive = False
         self._doreplay = False
         self._dooptimize = False
@@ -837,16 +857,47 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
         Any other kwargs like ``timeframe``, ``compression``, ``todate`` which
         are supported by the resample filter will be passed transparently
+
+        If ``batch=True`` is passed, the data can be preloaded (and the
+        indicators run in vectorized mode) because the resampling is done in a
+        single pass over the preloaded source bars
         '''
         if any(dataname is x for x in self.datas):
             dataname = dataname.clone()
 
         dataname.resample(**kwargs)
         self.adddata(dataname, name=name)
-        self._doreplay = True
+        if not kwargs.get('batch', False):
+            self._doreplay = True
 
         return dataname
 
+    def resampledatas(self, dataname, targets, **kwargs):
+        '''
+        Resamples a ``Data Feed`` to several timeframes/compressions at once
+
+        ``targets`` is an iterable of dicts, each holding the kwargs (like
+        ``timeframe``, ``compression``, ``name``) of one resampling. The
+        ``kwargs`` are common to all targets.
+
+        The resampling is done with ``batch=True`` on clones of ``dataname``,
+        which is added to the system if not already present. The source is
+        iterated only once: the resamplers share its preloaded bars and the
+        session end calculations
+
+        Returns the list of resampled data feeds in the order of ``targets``
+        '''
+        if not any(dataname is x for x in self.datas):
+            self.adddata(dataname)
+
+        datas = list()
+        for target in targets:
+            tkwargs = dict(kwargs, batch=True)
+            tkwargs.update(target)
+            datas.append(self.resampledata(dataname, **tkwargs))
+
+        return datas
+
     def optcallback(self, cb):
         '''
         Adds a *callback* to the list of callbacks that will be called with the
@@ -1026,6 +1077,8 @@ class Cerebro(with_metaclass(MetaParams, object)):
         '''If invoked from inside a strategy or anywhere else, including other
         threads the execution will stop as soon as possible.'''
         self._event_stop = True  # signal a stop has been requested
+        if self._wakeup is not None:
+            self._wakeup.set()  # do not wait for anything else
 
     def run(self, **kwargs):
         '''The core method to perform backtesting. Any ``kwargs`` passed to it
@@ -1042,10 +1095,54 @@ class Cerebro(with_metaclass(MetaParams, object)):
           - For Optimization: a list of lists which contain instances of the
             Strategy classes added with ``addstrategy``
         '''
+        iterstrats = self._runsetup(**kwargs)
+        if iterstrats is None:
+            return []  # nothing can be run
+
+        if not self._dooptimize or self.p.maxcpus == 1:
+            # If no optimmization is wished ... or 1 core is to be used
+            # let's skip process "spawning"
+            for iterstrat in iterstrats:
+                runstrat = self.runstrategies(iterstrat)
+                self.runstrats.append(runstrat)
+                if self._dooptimize:
+                    for cb in self.optcbs:
+                        cb(runstrat)  # callback receives finished strategy
+        else:
+            if self.p.optdatas and self._dopreload and self._dorunonce:
+                for data in self.datas:
+                    data.reset()
+                    if self._exactbars < 1:  # datas can be full length
+                        data.extend(size=self.params.lookahead)
+                    data._start()
+                    if self._dopreload:
+                        data.preload()
+
+            pool = multiprocessing.Pool(self.p.maxcpus or None)
+            for r in pool.imap(self, iterstrats):
+                self.runstrats.append(r)
+                for cb in self.optcbs:
+                    cb(r)  # callback receives finished strategy
+
+            pool.close()
+
+            if self.p.optdatas and self._dopreload and self._dorunonce:
+                for data in self.datas:
+                    data.stop()
+
+        if not self._dooptimize:
+            # avoid a list of list for regular cases
+            return self.runstrats[0]
+
+        return self.runstrats
+
+    def _runsetup(self, **kwargs):
+        '''Prepares a run (``run``/``run_async``) and returns the iterable
+        of the strategies to run or ``None`` if there are no datas'''
         self._event_stop = False  # Stop is requested
 
         if not self.datas:
-            return []  # nothing can be run
+            return None  # nothing can be run
 
         pkeys = self.params._getkeys()
         for key, val in kwargs.items():
@@ -1072,6 +1169,15 @@ class Cerebro(with_metaclass(MetaParams, object)):
             # preloading is not supported with replay. full timeframe bars
             # are constructed in realtime
             self._dopreload = False
+        elif any(x._resamplebatch() is not None and
+                 (not x._resamplebatch() or self._exactbars or
+                  not self._dopreload or self._dolive or self.p.live)
+                 for x in self.datas):
+            # batch resampling needs the data to be preloaded (and the
+            # resampler to be the last filter). If not, resample in realtime
+            # as with no batch
+            self._doreplay = True
+            self._dopreload = False
 
         if self._dolive or self.p.live:
             # in this case both preload and runonce must be off
@@ -1124,37 +1230,63 @@ class Cerebro(with_metaclass(MetaParams, object)):
         if not self.strats:  # Datas are present, add a strategy
             self.addstrategy(Strategy)
 
-        iterstrats = itertools.product(*self.strats)
-        if not self._dooptimize or self.p.maxcpus == 1:
-            # If no optimmization is wished ... or 1 core is to be used
-            # let's skip process "spawning"
+        return itertools.product(*self.strats)
+
+    async def run_async(self, **kwargs):
+        '''Coroutine variant of ``run`` for live trading, to be awaited from
+        an asyncio event loop. Takes the same ``kwargs`` and has the same
+        return values
+
+        When idle, the loop awaits the wakeup of the feeds, stores and broker
+        instead of blocking, so that the coroutines of async feeds and stores
+        (``AsyncDataBase``, ``AsyncStore``) run in the same event loop: one
+        loop multiplexes all streams and requests without a thread for each.
+
+        Regular (thread based) feeds, stores and brokers work unchanged. The
+        calls which may block (``start``, ``preload``, ``stop`` and the
+        loading of bars by a live feed which is not yet ``LIVE``, i.e.
+        backfilling) are run in the executor of the event loop, to keep the
+        loop running. Once ``LIVE`` they do not wait for data (see
+        ``wakeup``)
+
+        There is no async broker interface: the strategies place orders with
+        synchronous calls, which have to return the order at once. A broker
+        talking to the server sends the requests from an ``OrderPipeline``
+        and notifies the outcome from ``next``. Under ``run_async`` the
+        ``AsyncOrderPipeline`` sends them from the event loop, as
+        ``BinanceBroker`` does
+
+        Optimization runs the strategies one after the other (no
+        multiprocessing)
+        '''
+        self._aloop = asyncio.get_running_loop()
+        try:
+            iterstrats = self._runsetup(**kwargs)
+            if iterstrats is None:
+                return []  # nothing can be run
+
             for iterstrat in iterstrats:
-                runstrat = self.runstrategies(iterstrat)
+                steps = self._runstrategies(iterstrat)
+                ret = None
+                while True:
+                    try:
+                        step = steps.send(ret)
+                    except StopIteration as e:
+                        runstrat = e.value
+                        break
+
+                    ret = None
+                    if callable(step):  # blocking call (see _blockcall)
+                        ret = await self._aloop.run_in_executor(None, step)
+                    else:
+                        await self._wakeup.wait_async(step)
+
                 self.runstrats.append(runstrat)
                 if self._dooptimize:
                     for cb in self.optcbs:
                         cb(runstrat)  # callback receives finished strategy
-        else:
-            if self.p.optdatas and self._dopreload and self._dorunonce:
-                for data in self.datas:
-                    data.reset()
-                    if self._exactbars < 1:  # datas can be full length
-                        data.extend(size=self.params.lookahead)
-                    data._start()
-                    if self._dopreload:
-                        data.preload()
-
-            pool = multiprocessing.Pool(self.p.maxcpus or None)
-            for r in pool.imap(self, iterstrats):
-                self.runstrats.append(r)
-                for cb in self.optcbs:
-                    cb(r)  # callback receives finished strategy
-
-            pool.close()
-
-            if self.p.optdatas and self._dopreload and self._dorunonce:
-                for data in self.datas:
-                    data.stop()
+        finally:
+            self._aloop = None
 
         if not self._dooptimize:
             # avoid a list of list for regular cases
@@ -1172,11 +1304,55 @@ class Cerebro(with_metaclass(MetaParams, object)):
         '''
         Internal method invoked by ``run``` to run a set of strategies
         '''
+        steps = self._runstrategies(iterstrat, predata=predata)
+        while True:
+            try:
+                tmout = next(steps)
+            except StopIteration as e:
+                return e.value
+
+            self._wakeup.wait(tmout)
+
+    def _blockcall(self, obj, func, *args, **kwargs):
+        '''
+        Generator (to be used with ``yield from``) returning the result of
+        ``func(*args, **kwargs)``, a call of ``obj`` which may block. Under
+        ``run_async`` the call is yielded to be run in the executor of the
+        event loop, unless ``obj`` is an async feed/store (which has to run
+        in the loop)
+        '''
+        if (self._aloop is None or
+                isinstance(obj, (bt.AsyncDataBase, bt.AsyncStore))):
+            return func(*args, **kwargs)
+
+        return (yield functools.partial(func, *args, **kwargs))
+
+    def _runstrategies(self, iterstrat, predata=False):
+        '''
+        Generator running a set of strategies. It yields the time the live
+        loop wants to sleep (waiting on the wakeup) or (under ``run_async``)
+        a blocking call to run in the executor, whose result has to be sent
+        back (see ``_blockcall``). It returns the results
+        '''
         self._init_stcount()
 
         self.runningstrats = runstrats = list()
+
+        # In live mode the threads delivering data/notifications wake the
+        # loop up instead of having the feeds waiting for data
+        self._wakeup = None
+        if self._dolive or self.p.live:
+            if self._aloop is not None:  # run_async: sleep in the event loop
+                self._wakeup = AsyncWakeup(self._aloop)
+            elif self.p.wakeup and all(d._wakes for d in self.datas
+                                       if d.islive()):
+                self._wakeup = Wakeup()
+
+        for obj in itertools.chain(self.stores, self.datas, [self._broker]):
+            obj._wakeup = self._wakeup
+
         for store in self.stores:
-            store.start()
+            yield from self._blockcall(store, store.start)
 
         if self.p.cheat_on_open and self.p.broker_coo:
             # try to activate in broker
@@ -1189,10 +1365,10 @@ class Cerebro(with_metaclass(MetaParams, object)):
         for orders, onotify in self._ohistory:
             self._broker.add_order_history(orders, onotify)
 
-        self._broker.start()
+        yield from self._blockcall(self._broker, self._broker.start)
 
         for feed in self.feeds:
-            feed.start()
+            yield from self._blockcall(feed, feed.start)
 
         if self.writers_csv:
             wheaders = list()
@@ -1212,9 +1388,9 @@ class Cerebro(with_metaclass(MetaParams, object)):
                 data.reset()
                 if self._exactbars < 1:  # datas can be full length
                     data.extend(size=self.params.lookahead)
-                data._start()
+                yield from self._blockcall(data, data._start)
                 if self._dopreload:
-                    data.preload()
+                    yield from self._blockcall(data, data.preload)
 
         for stratcls, sargs, skwargs in iterstrat:
             sargs = self.datas + list(sargs)
@@ -1300,22 +1476,22 @@ class Cerebro(with_metaclass(MetaParams, object)):
                 if self.p.oldsync:
                     self._runnext_old(runstrats)
                 else:
-                    self._runnext(runstrats)
+                    yield from self._runnext_steps(runstrats)
 
             for strat in runstrats:
                 strat._stop()
 
-        self._broker.stop()
+        yield from self._blockcall(self._broker, self._broker.stop)
 
         if not predata:
             for data in self.datas:
-                data.stop()
+                yield from self._blockcall(data, data.stop)
 
         for feed in self.feeds:
-            feed.stop()
+            yield from self._blockcall(feed, feed.stop)
 
         for store in self.stores:
-            store.stop()
+            yield from self._blockcall(store, store.stop)
 
         self.stop_writers(runstrats)
 
@@ -1500,6 +1676,15 @@ class Cerebro(with_metaclass(MetaParams, object)):
         Actual implementation of run in full next mode. All objects have its
         ``next`` method invoke on each data arrival
         '''
+        for tmout in self._runnext_steps(runstrats):
+            self._wakeup.wait(tmout)
+
+    def _runnext_steps(self, runstrats):
+        '''
+        Generator with the loop of ``_runnext``. Instead of sleeping it yields
+        how long to wait on the wakeup, to let the caller do the waiting
+        (blocking in ``run``, awaiting in ``run_async``)
+        '''
         datas = sorted(self.datas,
                        key=lambda x: (x._timeframe, x._compression))
         datas1 = datas[1:]
@@ -1517,8 +1702,16 @@ class Cerebro(with_metaclass(MetaParams, object)):
         ldatas = len(datas)
         ldatas_noclones = ldatas - clonecount
         lastqcheck = False
+        wakeup = self._wakeup
+        aio = isinstance(wakeup, AsyncWakeup)  # sleeping in run_async
+        # run_async: the loads of regular live feeds may block until LIVE
+        backfills = [aio and d.islive() and
+                     not isinstance(d, bt.AsyncDataBase) for d in datas]
         dt0 = date2num(datetime.datetime.max) - 2  # default at max
         while d0ret or d0ret is None:
+            if wakeup is not None:
+                wakeup.clear()  # anything arriving from now on wakes up
+
             # if any has live data in the buffer, no data will wait anything
             newqcheck = not any(d.haslivedata() for d in datas)
             if not newqcheck:
@@ -1527,6 +1720,9 @@ class Cerebro(with_metaclass(MetaParams, object)):
                 livecount = sum(d._laststatus == d.LIVE for d in datas)
                 newqcheck = not livecount or livecount == ldatas_noclones
 
+            if wakeup is not None:
+                newqcheck = False  # the loop waits (below) and not the datas
+
             lastret = False
             # Notify anything from the store even before moving datas
             # because datas may not move due to an error reported by the store
@@ -1541,10 +1737,14 @@ class Cerebro(with_metaclass(MetaParams, object)):
             # from the qcheck value
             drets = []
             qstart = datetime.datetime.utcnow()
-            for d in datas:
+            for i, d in enumerate(datas):
                 qlapse = datetime.datetime.utcnow() - qstart
                 d.do_qcheck(newqcheck, qlapse.total_seconds())
-                drets.append(d.next(ticks=False))
+                if backfills[i] and d._laststatus != d.LIVE:
+                    drets.append((yield from self._blockcall(
+                        d, d.next, ticks=False)))
+                else:
+                    drets.append(d.next(ticks=False))
 
             d0ret = any((dret for dret in drets))
             if not d0ret and any((dret is None for dret in drets)):
@@ -1560,7 +1760,19 @@ class Cerebro(with_metaclass(MetaParams, object)):
                     dt0 = min((d for d in dts if d is not None))
                 else:
                     dt0 = min((d for i, d in enumerate(dts)
-                               if d is not None and i not in rsonly))
+                               if d is not None and i not in rsonly),
+                              default=None)
+                    if dt0 is None:  # only preloaded resampled bars left
+                        # delivered together as "_last" would do
+                        dt0 = min((d for d in dts if d is not None))
+                        dts = [d if d is None else dt0 for d in dts]
+                    else:
+                        for i in rsonly:  # see _runonce
+                            di = datas[i]
+                            if (dts[i] is not None and
+                                    di._rslast is not None and
+                                    len(di) > di._rslast):
+                                dts[i] = float('inf')  # rewound below
 
                 dmaster = datas[dts.index(dt0)]  # and timemaster
                 self._dtmaster = dmaster.num2date(dt0)
@@ -1575,7 +1787,13 @@ class Cerebro(with_metaclass(MetaParams, object)):
                     # try to get a data by checking with a master
                     d = datas[i]
                     d._check(forcedata=dmaster)  # check to force output
-                    if d.next(datamaster=dmaster, ticks=False):  # retry
+                    if backfills[i] and d._laststatus != d.LIVE:
+                        dret = yield from self._blockcall(
+                            d, d.next, datamaster=dmaster, ticks=False)
+                    else:
+                        dret = d.next(datamaster=dmaster, ticks=False)
+
+                    if dret:  # retry
                         dts[i] = d.datetime[0]  # good -> store
                         # self._plotfillers2[i].append(slen)  # mark as fill
                     else:
@@ -1638,6 +1856,14 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
                     self._next_writers(runstrats)
 
+                if aio:
+                    yield 0  # let the other tasks of the event loop run
+
+            elif d0ret is None and wakeup is not None:
+                # nothing delivered: sleep until something arrives
+                if not any(d.haslivedata() for d in datas):
+                    yield self._wakeup_tmout(datas)
+
         # Last notification chance before stopping
         self._datanotify()
         if self._event_stop:  # stop if requested
@@ -1646,6 +1872,21 @@ class Cerebro(with_metaclass(MetaParams, object)):
         if self._event_stop:  # stop if requested
             return
 
+    def _wakeup_tmout(self, datas):
+        '''Returns how long the live loop may sleep: the ``wakeup`` time, cut
+        short by the time boundaries at which resampled bars can be
+        delivered'''
+        tmout = self.p.wakeup or 0.5  # run_async sleeps even if disabled
+        for d in datas:
+            for ff, fargs, fkwargs in d._filters:
+                nextcheck = getattr(ff, 'nextcheck', None)
+                if nextcheck is not None:
+                    secs = nextcheck(d)
+                    if secs is not None:
+                        tmout = min(tmout, secs)
+
+        return tmout
+
     def _runonce(self, runstrats):
         '''
         Actual implementation of run in vector mode.
@@ -1664,17 +1905,37 @@ class Cerebro(with_metaclass(MetaParams, object)):
         datas = sorted(self.datas,
                        key=lambda x: (x._timeframe, x._compression))
 
+        # Batch resampled datas deliver their bars along with the next bar of
+        # the other datas (as in next mode): they do not set the clock. Their
+        # last bars wait for the other datas to be over
+        rsonly = [i for i, x in enumerate(datas) if x._rslast is not None]
+        rsclock = rsonly and len(rsonly) < len(datas)
+        inf = float('inf')
+
         while True:
             # Check next incoming date in the datas
             dts = [d.advance_peek() for d in datas]
-            dt0 = min(dts)
+            if rsclock:
+                dtks = dts[:]
+                for i in rsonly:
+                    if len(datas[i]) >= datas[i]._rslast:
+                        dtks[i] = inf  # delivered at the end
+
+                dt0 = min(d for i, d in enumerate(dtks) if i not in rsonly)
+                if dt0 == inf:  # other datas over, the resampled bars left
+                    dt0 = min(dts)  # delivered together as in next mode
+                    dtks = [inf if d == inf else dt0 for d in dts]
+            else:
+                dtks = dts
+                dt0 = min(dts)
+
             if dt0 == float('inf'):
                 break  # no data delivers anything
 
             # Timemaster if needed be
             # dmaster = datas[dts.index(dt0)]  # and timemaster
             slen = len(runstrats[0])
-            for i, dti in enumerate(dts):
+            for i, dti in enumerate(dtks):
                 if dti <= dt0:
                     datas[i].advance()
                     # self._plotfillers2[i].append(slen)  # mark as fill
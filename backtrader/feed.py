@@ -21,23 +21,85 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import asyncio
 import collections
 import datetime
 import inspect
 import io
 import os.path
+import threading
 
 import backtrader as bt
 from backtrader import (date2num, num2date, time2num, TimeFrame, dataseries,
                         metabase)
 
-from backtrader.utils.py3 import with_metaclass, zip, range, string_types
-from backtrader.utils import tzparse
+from backtrader.utils.py3 import (with_metaclass, zip, range, string_types,
+                                  queue)
+from backtrader.utils import tzparse, aioloop, aiospawn
 from .dataseries import SimpleFilterWrapper
 from .resamplerfilter import Resampler, Replayer
 from .tradingcal import PandasMarketCalendar
 
 
+class Prefetcher(object):
+    '''Consumes the iterable ``source`` in a background thread, keeping up to
+    ``qsize`` items ready in a bounded queue, so that the I/O needed to read
+    the source overlaps with the rest of the system
+
+    Exceptions raised by the source are re-raised in the consuming thread
+    '''
+    _END = object()  # marks the exhaustion of the source
+
+    def __init__(self, source, qsize=1):
+        self.q = queue.Queue(maxsize=max(1, qsize))
+        self._stop = threading.Event()
+        self._done = False
+        self.t = threading.Thread(target=self._run, args=(source,))
+        self.t.daemon = True
+        self.t.start()
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self.q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+
+        return False
+
+    def _run(self, source):
+        try:
+            for item in source:
+                if not self._put(item):
+                    return
+        except Exception as e:
+            self._put(e)
+
+        self._put(self._END)
+
+    def get(self):
+        '''Returns the next item of the source or ``None`` when exhausted'''
+        if self._done:
+            return None
+
+        item = self.q.get()
+        if item is self._END:
+            self._done = True
+            return None
+
+        if isinstance(item, Exception):
+            self._done = True
+            raise item
+
+        return item
+
+    def stop(self):
+        self._stop.set()
+        self._done = True
+        self.t.join()
+
+
 class MetaAbstractDataBase(dataseries.OHLCDateTime.__class__):
     _indcol = dict()
 
@@ -136,6 +198,7 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         ('tzinput', None),
         ('qcheck', 0.0),  # timeout in seconds (float) to check for events
         ('calendar', None),
+        ('prefetch', 0),  # size of the queue for background reading
     )
 
     (CONNECTED, DISCONNECTED, CONNBROKEN, DELAYED,
@@ -156,6 +219,17 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
     _clone = False
     _qcheck = 0.0
 
+    # Live mode: set by cerebro (if any) to be woken up when data arrives
+    _wakeup = None
+    # Live feeds which set ``_wakeup`` when data arrives. If any live feed
+    # does not, cerebro lets the feeds wait for data with ``qcheck``
+    _wakes = False
+
+    # Live feeds: latency stamps (wall clock, time.time) of the last bar
+    # delivered, as a dict with keys among: event (exchange time), queued
+    # (arrival to the feed queue) and loaded (moved into the lines)
+    stamps = None
+
     _tmoffset = datetime.timedelta()
 
     # Set to non 0 if resampling/replaying
@@ -163,6 +237,11 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
     replaying = 0
 
     _started = False
+    _prefetcher = None
+    _eoscache = None
+    _sessionends = None
+    _rowscache = None
+    _rslast = None  # index of the 1st bar delivered at the end by a batch
 
     def _start_finish(self):
         # A live feed (for example) may have learnt something about the
@@ -201,10 +280,40 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
 
     def _start(self):
         self.start()
+        self._prefetch_start()
 
         if not self._started:
             self._start_finish()
 
+    def _prefetch_start(self):
+        '''If requested with the ``prefetch`` parameter and supported by the
+        data feed, start reading the source in the background'''
+        if self.p.prefetch <= 0:
+            return
+
+        source = self._prefetchsource()
+        if source is not None:
+            self._prefetcher = Prefetcher(source, self.p.prefetch)
+
+    def _prefetchsource(self):
+        '''To be overriden by subclasses supporting the ``prefetch`` parameter.
+
+        Must return an iterable with the raw records (for example the tokens of
+        a CSV line) which ``_load`` will later get with ``_prefetched``. The
+        iterable is consumed in a background thread and must therefore not
+        touch the lines of the data feed
+        '''
+        return None
+
+    def _prefetched(self):
+        '''Returns the next record read in the background or ``None``'''
+        return self._prefetcher.get()
+
+    def _prefetch_stop(self):
+        if self._prefetcher is not None:
+            self._prefetcher.stop()
+            self._prefetcher = None
+
     def _timeoffset(self):
         return self._tmoffset
 
@@ -216,12 +325,29 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         if not len(self):
             return datetime.datetime.min, 0.0
 
-        dt = self.lines.datetime[0]
+        return self._calcnexteos(self.lines.datetime[0])
+
+    def _calcnexteos(self, dt):
+        '''Returns the next eos for the given (utc-like) datetime ``dt``'''
+        if self._clone:
+            return self.data._calcnexteos(dt)
+
+        # Memoized: several resamplers (on clones) ask for the same sessions
+        eoscache = self._eoscache
+        if eoscache is None:
+            eoscache = self._eoscache = dict()
+
+        try:
+            return eoscache[dt]
+        except KeyError:
+            pass
+
+        if len(eoscache) >= 1024:
+            eoscache.clear()
+
         dtime = num2date(dt)
         if self._calendar is None:
-            nexteos = datetime.datetime.combine(dtime, self.p.sessionend)
-            nextdteos = self.date2num(nexteos)  # locl'ed -> utc-like
-            nexteos = num2date(nextdteos)  # utc
+            nexteos = self._sessionend(dtime.date())  # utc
             while dtime > nexteos:
                 nexteos += datetime.timedelta(days=1)  # already utc-like
 
@@ -232,7 +358,35 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
             _, nexteos = self._calendar.schedule(dtime, self._tz)
             nextdteos = date2num(nexteos)  # nextos is already utc
 
-        return nexteos, nextdteos
+        eoscache[dt] = ret = (nexteos, nextdteos)
+        return ret
+
+    def _sessionend(self, day):
+        '''Returns the (utc) end of the session of ``day``, which is
+        calculated only once per day'''
+        sessionends = self._sessionends
+        if sessionends is None:
+            sessionends = self._sessionends = dict()
+
+        try:
+            return sessionends[day]
+        except KeyError:
+            pass
+
+        sessionend = datetime.datetime.combine(day, self.p.sessionend)
+        nextdteos = self.date2num(sessionend)  # locl'ed -> utc-like
+        sessionends[day] = nexteos = num2date(nextdteos)  # utc
+        return nexteos
+
+    def _getrows(self):
+        '''Returns the values of the preloaded bars as a list of tuples (one
+        per bar), which is shared by the batch resamplers of the clones'''
+        size = self.buflen()
+        if self._rowscache is None or self._rowscache[0] != size:
+            lines = (line.getzero(0, size) for line in self.itersize())
+            self._rowscache = (size, list(zip(*lines)))
+
+        return self._rowscache[1]
 
     def _gettzinput(self):
         '''Can be overriden by classes to return a timezone for input'''
@@ -245,15 +399,17 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
 
     def date2num(self, dt):
         if self._tz is not None:
-            return date2num(self._tz.localize(dt))
+            # memoized: localizing with pytz is costly and filters, timers
+            # and orders convert the same datetimes over and over
+            return self.lines.datetime._dtcache_get().date2num(dt, self._tz)
 
         return date2num(dt)
 
     def num2date(self, dt=None, tz=None, naive=True):
         if dt is None:
-            return num2date(self.lines.datetime[0], tz or self._tz, naive)
+            dt = self.lines.datetime[0]
 
-        return num2date(dt, tz or self._tz, naive)
+        return self.lines.datetime._num2date(dt, tz or self._tz, naive)
 
     def haslivedata(self):
         return False  # must be overriden for those that can
@@ -303,9 +459,11 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         self._barstack = collections.deque()
         self._barstash = collections.deque()
         self._laststatus = self.CONNECTED
+        self._rslast = None
+        self._eoscache = self._sessionends = None  # tz/session may change
 
     def stop(self):
-        pass
+        self._prefetch_stop()
 
     def clone(self, **kwargs):
         return DataClone(dataname=self, **kwargs)
@@ -436,12 +594,80 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         return True
 
     def preload(self):
+        # The last filter (a resampler) may take over preloading
+        if self._filters:
+            ff = self._filters[-1][0]
+            if hasattr(ff, 'preload') and ff.preload(self):
+                return
+
+            bars = self._transformbars()
+            if bars is not None:
+                for bar in bars:
+                    self._updatebar(bar, forward=True)
+
+                self.home()
+                return
+
         while self.load():
             pass
 
         self._last()
         self.home()
 
+    # Methods of a filter used bar by bar, which ``transform`` stands for
+    _FILTERCALLS = ('__call__', 'nextstart', 'next', 'last')
+
+    @classmethod
+    def _cantransform(cls, ff):
+        '''Returns whether the ``transform`` of the filter ``ff`` can be used.
+        It cannot if a subclass of the class defining it overrides one of the
+        methods used bar by bar'''
+        mro = type(ff).__mro__
+        tcls = next((c for c in mro if 'transform' in c.__dict__), None)
+        if tcls is None:
+            return False
+
+        for name in cls._FILTERCALLS:
+            owner = next((c for c in mro if name in c.__dict__), None)
+            if owner is not None and owner not in tcls.__mro__:
+                return False
+
+        return True
+
+    def _transformbars(self):
+        '''If all filters have a ``transform`` method, loads all the bars and
+        passes them (a list of bars, each a list with the values of the lines)
+        through the filters in order
+
+        Returns the resulting bars or None if a filter lacks ``transform``
+        (see ``_cantransform``) or if a filter which stashes bars (they go
+        again through all filters) is not the first one
+        '''
+        filters = self._filters[:]
+        if not all(self._cantransform(ff) for ff, _, _ in filters):
+            return None
+
+        if any(getattr(ff, '_stashes', False) for ff, _, _ in filters[1:]):
+            return None
+
+        self._filters[:] = []
+        try:
+            while self.load():
+                pass
+        finally:
+            self._filters[:] = filters
+
+        size = len(self)
+        bars = [list(bar)
+                for bar in zip(*(line.get(size=size)
+                                 for line in self.itersize()))]
+        self.backwards(size=size, force=True)
+
+        for ff, fargs, fkwargs in filters:
+            bars = ff.transform(self, bars, *fargs, **fkwargs)
+
+        return bars
+
     def _last(self, datamaster=None):
         # Last chance for filters to deliver something
         ret = 0
@@ -589,6 +815,17 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
 
         return False
 
+    def _resamplebatch(self):
+        '''Returns ``None`` if no resampler with ``batch`` has been added,
+        else whether it can resample the preloaded bars in a single pass (it
+        has to be the last filter)'''
+        batch = None
+        for ff, _, _ in self._filters:
+            if isinstance(ff, Resampler) and ff.p.batch:
+                batch = ff is self._filters[-1][0]
+
+        return batch
+
     def resample(self, **kwargs):
         self.addfilter(Resampler, **kwargs)
 
@@ -600,6 +837,97 @@ class DataBase(AbstractDataBase):
     pass
 
 
+class AsyncDataBase(DataBase):
+    '''Base class for live feeds produced by a coroutine
+
+    Subclasses implement the coroutine ``_astream``, which runs in the event
+    loop of ``Cerebro.run_async`` (or in a background event loop with
+    ``Cerebro.run``) and hands the bars over with ``_aput``. A bar is a dict
+    with the values of the lines by name. ``datetime`` can be given as a
+    ``datetime.datetime``
+
+    Feeds with a synchronous (blocking) client can instead implement the
+    generator ``_stream``, yielding the bars. It is run in the executor of
+    the loop
+
+    The feed is over when ``_astream`` returns. If it raises an exception,
+    the status ``CONNBROKEN`` is notified before
+    '''
+    _atask = None
+    _wakes = True
+
+    def islive(self):
+        return True
+
+    def start(self):
+        super(AsyncDataBase, self).start()
+        self._aq = collections.deque()
+        self._aended = False
+        self._atask = aiospawn(aioloop(), self._arun())
+
+    def stop(self):
+        super(AsyncDataBase, self).stop()
+        if self._atask is not None:
+            self._atask.cancel()
+            self._atask = None
+
+    async def _astream(self):
+        '''Coroutine producing the bars with ``_aput``. The default hands
+        over the bars of ``_stream``, each one fetched in the executor'''
+        loop = asyncio.get_running_loop()
+        bars = self._stream()
+        while True:
+            bar = await loop.run_in_executor(None, next, bars, None)
+            if bar is None:
+                break
+
+            self._aput(bar)
+
+    def _stream(self):
+        '''Generator yielding the bars from a blocking client (see
+        ``_astream``). The default yields nothing'''
+        return iter(())
+
+    async def _arun(self):
+        try:
+            await self._astream()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.put_notification(self.CONNBROKEN)
+
+        self._aput(None)  # signal the end of the feed
+
+    def _aput(self, bar):
+        self._aq.append(bar)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def haslivedata(self):
+        return bool(self._aq)
+
+    def _load(self):
+        if self._aended:
+            return False
+
+        try:
+            bar = self._aq.popleft()
+        except IndexError:
+            return None  # nothing yet
+
+        if bar is None:
+            self._aended = True
+            return False  # the stream is over
+
+        for name, value in bar.items():
+            if name == 'datetime' and isinstance(value, datetime.datetime):
+                value = self.date2num(value)
+
+            getattr(self.lines, name)[0] = value
+
+        return True
+
+
 class FeedBase(with_metaclass(metabase.MetaParams, object)):
     params = () + DataBase.params._gettuple()
 
@@ -659,6 +987,9 @@ class CSVDataBase(with_metaclass(MetaCSVDataBase, DataBase)):
 
     The return value of ``_loadline`` (True/False) will be the return value
     of ``_load`` which has been overriden by this base class
+
+    If the parameter ``prefetch`` is set (size of the queue), the lines are
+    read and tokenized in a background thread
     '''
 
     f = None
@@ -686,17 +1017,32 @@ class CSVDataBase(with_metaclass(MetaCSVDataBase, DataBase)):
             self.f = None
 
     def preload(self):
-        while self.load():
-            pass
-
-        self._last()
-        self.home()
+        super(CSVDataBase, self).preload()
 
         # preloaded - no need to keep the object around - breaks multip in 3.x
+        self._prefetch_stop()
         self.f.close()
         self.f = None
 
+    def _prefetchsource(self):
+        if self.f is None:
+            return None
+
+        return self._iterlines(self.f, self.separator)
+
+    @staticmethod
+    def _iterlines(f, separator):
+        for line in f:
+            yield line.rstrip('\n').split(separator)
+
     def _load(self):
+        if self._prefetcher is not None:
+            linetokens = self._prefetched()
+            if linetokens is None:
+                return False
+
+            return self._loadline(linetokens)
+
         if self.f is None:
             return False
 
@@ -711,6 +1057,9 @@ class CSVDataBase(with_metaclass(MetaCSVDataBase, DataBase)):
         return self._loadline(linetokens)
 
     def _getnextline(self):
+        if self._prefetcher is not None:
+            return self._prefetched()
+
         if self.f is None:
             return None
 
@@ -774,8 +1123,45 @@ class DataClone(AbstractDataBase):
         super(DataClone, self).start()
         self._dlen = 0
         self._preloading = False
+        self._shared = False
+
+    def _share(self):
+        '''If the clone has no filters of its own, its lines are bound to the
+        buffers of the data and only the index is kept by the clone
+
+        Returns True if the buffers are shared
+        '''
+        if self._filters:
+            return False
+
+        pairs = list(zip(self.lines, self.data.lines))
+        if any(line.mode != line.UnBounded for pair in pairs for line in pair):
+            return False  # memory saving buffers cannot be indexed alike
+
+        for line, dline in pairs:
+            line.array = dline.array
+            line.extension = dline.extension
+
+        return True
+
+    def next(self, datamaster=None, ticks=True):
+        if not self._shared:
+            self._shared = self._share()
+
+        return super(DataClone, self).next(datamaster=datamaster, ticks=ticks)
+
+    def load(self):
+        if self._shared:
+            return False  # bars are seen by advancing over the data buffers
+
+        return super(DataClone, self).load()
 
     def preload(self):
+        self._shared = self._share()
+        if self._shared:
+            self.home()
+            return
+
         self._preloading = True
         super(DataClone, self).preload()
         self.data.home()  # preloading data was pushed forward
@@ -23,6 +23,7 @@ from __future__ import (absolute_import, division, print_function,
 
 
 from .csvgeneric import *
+from .multisymbol import *
 from .btcsv import *
 from .vchartcsv import *
 from .vchart import *
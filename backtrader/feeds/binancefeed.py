@@ -1,14 +1,32 @@
+from array import array
+import bisect
 from collections import deque
-
-import pandas as pd
+import calendar
+import math
+import time
 
 from backtrader.feed import DataBase
-from backtrader.utils import date2num
+from backtrader.utils.dateintern import (EPOCH_ORDINAL, HOURS_PER_DAY, MINUTES_PER_DAY,
+                                         SECONDS_PER_DAY, MUSECONDS_PER_DAY)
 
 from backtrader import TimeFrame as tf
 
 
+def _ms2num(ms):
+    """date2num of the UTC datetime of a timestamp in milliseconds (same result) without creating
+    the datetime"""
+    days, ms = divmod(int(ms), 86400000)
+    secs, ms = divmod(ms, 1000)
+    minutes, secs = divmod(secs, 60)
+    hours, minutes = divmod(minutes, 60)
+    return math.fsum((float(days + EPOCH_ORDINAL), hours / HOURS_PER_DAY, minutes / MINUTES_PER_DAY,
+                      secs / SECONDS_PER_DAY, ms * 1000 / MUSECONDS_PER_DAY))
+
+
 class BinanceData(DataBase):
+    # the socket callback wakes the live loop up
+    _wakes = True
+
     params = (
         ('drop_newest', True),
     )
@@ -31,16 +49,21 @@ class BinanceData(DataBase):
         if 'LiveBars' in kwargs: self.LiveBars = kwargs['LiveBars']
 
         self._store = store
-        self._data = deque()
+        self._data = deque()  # closed klines (raw dicts, event and arrival times) from the websocket thread
+        self._bars = deque()  # parsed klines (and times) ready to be loaded
+        self._hist = None  # columns of the historical klines
+        self._histidx = 0
 
         # print("Ok", self.timeframe, self.compression, self.start_date, self._store, self.LiveBars, self.symbol)
 
     def _handle_kline_socket_message(self, msg):
         """https://binance-docs.github.io/apidocs/spot/en/#kline-candlestick-streams"""
+        # Runs in the websocket thread: queue the kline, parsing is done in _load
         if msg['e'] == 'kline':
             if msg['k']['x']:  # Is closed
-                kline = self._parser_to_kline(msg['k']['t'], msg['k'])
-                self._data.extend(kline.values.tolist())
+                self._data.append((msg['k'], msg['E'], time.time()))
+                if self._wakeup is not None:
+                    self._wakeup.set()
         elif msg['e'] == 'error':
             raise msg
 
@@ -50,44 +73,77 @@ class BinanceData(DataBase):
         elif self._state == self._ST_LIVE:
             return self._load_kline()
         elif self._state == self._ST_HISTORBACK:
-            if self._load_kline():
+            if self._load_hist():
                 return True
             else:
                 self._start_live()
 
-    def _load_kline(self):
-        try:
-            kline = self._data.popleft()
-        except IndexError:
+    def _load_hist(self):
+        i = self._histidx
+        if self._hist is None or i >= len(self._hist[0]):
             return None
 
-        timestamp, open_, high, low, close, volume = kline
+        self._histidx = i + 1
+        for line, col in zip(self._histlines(), self._hist):
+            line[0] = col[i]
+        return True
+
+    def _histlines(self):
+        lines = self.lines
+        return lines.datetime, lines.open, lines.high, lines.low, lines.close, lines.volume
+
+    def preload(self):
+        # Historical klines go straight from the columns into the lines
+        bulk = (self._state == self._ST_HISTORBACK and self._hist is not None and
+                not self._filters and not self._tzinput and
+                all(line.mode == line.UnBounded for line in self.lines))
+        if not bulk:
+            return super(BinanceData, self).preload()
+
+        dts = self._hist[0]
+        i = bisect.bisect_left(dts, self.fromdate, self._histidx)
+        j = bisect.bisect_right(dts, self.todate, i)
+        size = j - i
+
+        cols = {id(line): col[i:j] for line, col in zip(self._histlines(), self._hist)}
+        nans = array('d', [float('NaN')]) * size
+        for line in self.lines:
+            line.array.extend(cols.get(id(line), nans))
+            line.lencount += size
+            line.idx += size
+
+        self._histidx = len(dts)
+        self._start_live()
+        self.home()
+
+    def _load_kline(self):
+        if not self._bars:
+            # drain everything queued so far in one go
+            data, parse = self._data, self._parse_kline
+            while data:
+                k, event, queued = data.popleft()
+                self._bars.append((parse(k), event, queued))
+
+            if not self._bars:
+                return None
+
+        bar, event, queued = self._bars.popleft()
+        timestamp, open_, high, low, close, volume = bar
+        self.stamps = {'event': event / 1000.0, 'queued': queued, 'loaded': time.time()}
 
-        self.lines.datetime[0] = date2num(timestamp)
+        self.lines.datetime[0] = timestamp
         self.lines.open[0] = open_
         self.lines.high[0] = high
         self.lines.low[0] = low
         self.lines.close[0] = close
         self.lines.volume[0] = volume
         return True
-    
-    def _parser_dataframe(self, data):
-        df = data.copy()
-        df.columns = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
-        df['timestamp'] = df['timestamp'].values.astype(dtype='datetime64[ms]')
-        df['open'] = df['open'].values.astype(float)
-        df['high'] = df['high'].values.astype(float)
-        df['low'] = df['low'].values.astype(float)
-        df['close'] = df['close'].values.astype(float)
-        df['volume'] = df['volume'].values.astype(float)
-        # df.set_index('timestamp', inplace=True)
-        return df
-    
-    def _parser_to_kline(self, timestamp, kline):
-        df = pd.DataFrame([[timestamp, kline['o'], kline['h'],
-                            kline['l'], kline['c'], kline['v']]])
-        return self._parser_dataframe(df)
-    
+
+    @staticmethod
+    def _parse_kline(k):
+        return (_ms2num(k['t']), float(k['o']), float(k['h']),
+                float(k['l']), float(k['c']), float(k['v']))
+
     def _start_live(self):
         # if live mode
         if self.LiveBars:
@@ -96,18 +152,19 @@ class BinanceData(DataBase):
 
             print(f"Live started for ticker: {self.symbol}")
 
-            self._store.binance_socket.start_kline_socket(
-                self._handle_kline_socket_message,
+            self._store.subscribe_klines(
                 self.symbol_info['symbol'],
-                self.interval)
+                self.interval,
+                self._handle_kline_socket_message)
         else:
             self._state = self._ST_OVER
         
     def haslivedata(self):
-        return self._state == self._ST_LIVE and self._data
+        return self._state == self._ST_LIVE and bool(self._bars or self._data)
 
     def islive(self):
-        return True
+        # Only historical klines can be preloaded
+        return bool(self.LiveBars)
         
     def start(self):
         DataBase.start(self)
@@ -128,19 +185,19 @@ class BinanceData(DataBase):
             self._state = self._ST_HISTORBACK
             self.put_notification(self.DELAYED)
 
-            klines = self._store.binance.get_historical_klines(
-                self.symbol_info['symbol'],
-                self.interval,
-                self.start_date.strftime('%d %b %Y %H:%M:%S'))
+            # start_date is taken as UTC
+            start = calendar.timegm(self.start_date.timetuple()) * 1000
+            start += self.start_date.microsecond // 1000
 
             try:
-                if self.p.drop_newest:
-                    klines.pop()
-
-                df = pd.DataFrame(klines)
-                df.drop(df.columns[[6, 7, 8, 9, 10, 11]], axis=1, inplace=True)  # Remove unnecessary columns
-                df = self._parser_dataframe(df)
-                self._data.extend(df.values.tolist())
+                cols = self._store.get_kline_columns(
+                    self.symbol_info['symbol'],
+                    self.interval,
+                    start,
+                    drop_newest=self.p.drop_newest)
+
+                cols[0] = array('d', map(_ms2num, cols[0]))  # open time -> datetime
+                self._hist, self._histidx = cols, 0
             except Exception as e:
                 print("Exception (try set start_date in utc format):", e)
 
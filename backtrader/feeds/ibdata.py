@@ -22,6 +22,7 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 import datetime
+import time
 
 import backtrader as bt
 from backtrader.feed import DataBase
@@ -192,6 +193,9 @@ class IBData(with_metaclass(MetaIBData, DataBase)):
         which uses the default values (``STK`` and ``SMART``) and overrides
         the currency to be ``USD``
     '''
+    # bars arrive through a queue which wakes the live loop up
+    _wakes = True
+
     params = (
         ('sectype', 'STK'),  # usual industry value
         ('exchange', 'SMART'),  # usual industry value
@@ -419,6 +423,7 @@ class IBData(with_metaclass(MetaIBData, DataBase)):
         else:
             self.qlive = self.ib.reqRealTimeBars(self.contract)
 
+        self.qlive.wakeup = self._wakeup
         self._subcription_valid = True
         return self.qlive
 
@@ -701,4 +706,6 @@ class IBData(with_metaclass(MetaIBData, DataBase)):
         self.lines.volume[0] = rtvol.size
         self.lines.openinterest[0] = 0
 
+        self.stamps = {'event': rtvol.event, 'queued': rtvol.queued,
+                       'loaded': time.time()}
         return True
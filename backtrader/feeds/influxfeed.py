@@ -90,18 +90,35 @@ class InfluxDB(feed.DataBase):
                     vol_f=self.p.volume, oi_f=self.p.ointerest,
                     timeframe=tf, begin=st, dataname=self.p.dataname)
 
+        self._qstr = qstr
+        if self.p.prefetch > 0:
+            return  # query executed in the background by the prefetcher
+
+        self.biter = iter(self._query())
+
+    def _query(self):
         try:
-            dbars = list(self.ndb.query(qstr).get_points())
+            return list(self.ndb.query(self._qstr).get_points())
         except InfluxDBClientError as err:
             print('InfluxDB query failed: %s' % err)
 
-        self.biter = iter(dbars)
+        return []
+
+    def _prefetchsource(self):
+        # a generator: the query also runs in the background
+        for bar in self._query():
+            yield bar
 
     def _load(self):
-        try:
-            bar = next(self.biter)
-        except StopIteration:
-            return False
+        if self._prefetcher is not None:
+            bar = self._prefetched()
+            if bar is None:
+                return False
+        else:
+            try:
+                bar = next(self.biter)
+            except StopIteration:
+                return False
 
         self.l.datetime[0] = date2num(dt.datetime.strptime(bar['time'],
                                                            '%Y-%m-%dT%H:%M:%SZ'))
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import collections
+import io
+
+from .. import feed
+from .csvgeneric import GenericCSVData
+
+
+__all__ = ['MultiSymbolCSVData', 'MultiSymbolCSV']
+
+
+class _RowQueue(collections.deque):
+    '''Holds the pre-split rows of a symbol. Offers ``close`` to be usable as
+    the ``f`` attribute of a ``CSVDataBase``'''
+    def close(self):
+        self.clear()
+
+
+class MultiSymbolCSVData(GenericCSVData):
+    '''Data feed for a single symbol of a long-format source (one row per
+    symbol and timestamp) which is parsed by a ``MultiSymbolCSV`` feed.
+
+    Not meant to be instantiated directly. Use ``MultiSymbolCSV.getdata``
+
+    Specific parameters (or specific meaning):
+
+      - ``dataname``: the name of the symbol
+
+      - ``symbol`` (default: ``0``): index of the field holding the symbol
+
+    The rest of the parameters have the same meaning as in ``GenericCSVData``
+    and the field indices refer to the fields of the long-format rows
+    '''
+
+    params = (('symbol', 0),)
+
+    def start(self):
+        # The rows have already been split by the feed: take the queue as the
+        # "file" which will be read during start/_load
+        if self.f is None:
+            self.f = self._feed._getrows(self.p.dataname)
+
+        super(MultiSymbolCSVData, self).start()
+
+    def _prefetchsource(self):
+        return None  # rows already in memory, nothing to read in background
+
+    def _load(self):
+        if self.f is None:
+            return False
+
+        try:
+            linetokens = self.f.popleft()
+        except IndexError:
+            return False
+
+        return self._loadline(linetokens)
+
+
+class MultiSymbolCSV(feed.FeedBase):
+    '''Reads a long-format source (fields like ``symbol, datetime, open, high,
+    low, close, volume, openinterest``) in a single pass and fans the rows out
+    to the data feeds created with ``getdata(symbol)``.
+
+    This avoids opening and scanning a file per symbol when backtesting
+    large universes::
+
+      feed = bt.feeds.MultiSymbolCSV(dataname='universe.csv', symbol=0,
+                                     datetime=1, open=2, high=3, low=4,
+                                     close=5, volume=6, openinterest=-1)
+
+      for symbol in symbols:
+          cerebro.adddata(feed.getdata(symbol))
+
+    The source is read the first time one of the datas is started, keeping
+    the order of the rows (which should be sorted by time) for each symbol.
+
+    Specific parameters (or specific meaning):
+
+      - ``dataname``: the filename to parse or a file-like object. If the
+        filename ends with ``.parquet`` the file is read with ``pandas``
+        and the values are converted to strings (``dtformat`` must match how
+        ``pandas`` prints the timestamps, like the default does)
+
+    The rest of the parameters are those of ``MultiSymbolCSVData``
+    '''
+    DataCls = MultiSymbolCSVData
+
+    params = DataCls.params._gettuple()
+
+    def __init__(self):
+        super(MultiSymbolCSV, self).__init__()
+        self._rows = None
+
+    def getdata(self, dataname, name=None, **kwargs):
+        return super(MultiSymbolCSV, self).getdata(
+            dataname, name=name or dataname, **kwargs)
+
+    def _getdata(self, dataname, **kwargs):
+        for pname, pvalue in self.p._getitems():
+            kwargs.setdefault(pname, pvalue)
+
+        kwargs['dataname'] = dataname
+        kwargs['headers'] = False  # handled when reading the source
+        data = self.DataCls(**kwargs)
+        data._feed = self
+        return data
+
+    def _getrows(self, symbol):
+        if self._rows is None:
+            self._rows = self._readsource()
+
+        # a copy: datas can be started again (several runs/optimization)
+        return _RowQueue(self._rows.get(symbol, ()))
+
+    def _readsource(self):
+        rows = collections.defaultdict(_RowQueue)
+        symidx = self.p.symbol
+
+        dataname = self.p.dataname
+        if not hasattr(dataname, 'readline') and \
+           dataname.lower().endswith('.parquet'):
+            import pandas  # keep the import very local
+            df = pandas.read_parquet(dataname)
+            for tokens in df.astype(str).values.tolist():
+                rows[tokens[symidx]].append(tokens)
+
+            return rows
+
+        if hasattr(dataname, 'readline'):
+            f = dataname
+        else:
+            # Let an exception propagate to let the caller know
+            f = io.open(dataname, 'r')
+
+        try:
+            if self.p.headers:
+                f.readline()  # skip the headers
+
+            separator = self.p.separator
+            for line in f:
+                line = line.rstrip('\n')
+                if not line:
+                    continue
+
+                tokens = line.split(separator)
+                rows[tokens[symidx]].append(tokens)
+        finally:
+            f.close()
+
+        return rows
@@ -22,6 +22,7 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 from datetime import datetime, timedelta
+import time
 
 from backtrader.feed import DataBase
 from backtrader import TimeFrame, date2num, num2date
@@ -137,6 +138,9 @@ class OandaData(with_metaclass(MetaOandaData, DataBase)):
 
     Any other combination will be rejected
     '''
+    # bars arrive through a queue which wakes the live loop up
+    _wakes = True
+
     params = (
         ('qcheck', 0.5),
         ('historical', False),  # do backfilling at the start
@@ -235,6 +239,7 @@ class OandaData(with_metaclass(MetaOandaData, DataBase)):
             return True
 
         self.qlive = self.o.streaming_prices(self.p.dataname, tmout=tmout)
+        self.qlive.wakeup = self._wakeup
         if instart:
             self._statelivereconn = self.p.backfill_start
         else:
@@ -415,6 +420,9 @@ class OandaData(with_metaclass(MetaOandaData, DataBase)):
         self.lines.volume[0] = 0.0
         self.lines.openinterest[0] = 0.0
 
+        self.stamps = {'event': int(msg['time']) / 10 ** 6,
+                       'queued': msg.get('queued'),  # set by the streamer
+                       'loaded': time.time()}
         return True
 
     def _load_history(self, msg):
@@ -24,6 +24,7 @@ from __future__ import (absolute_import, division, print_function,
 from backtrader.utils.py3 import filter, string_types, integer_types
 
 from backtrader import date2num
+from backtrader.utils import dates2num
 import backtrader.feed as feed
 
 
@@ -231,6 +232,17 @@ class PandasData(feed.DataBase):
 
             self._colmapping[k] = v
 
+        # datetime conversion done in bulk for all rows
+        coldtime = self._colmapping['datetime']
+        if coldtime is None:
+            # standard index in the datetime
+            tstamps = self.p.dataname.index
+        else:
+            # it's in a different column ... use standard column index
+            tstamps = self.p.dataname.iloc[:, coldtime]
+
+        self._dtnums = dates2num(tstamp.to_pydatetime() for tstamp in tstamps)
+
     def _load(self):
         self._idx += 1
 
@@ -254,20 +266,8 @@ class PandasData(feed.DataBase):
             # indexing for pandas: 1st is colum, then row
             line[0] = self.p.dataname.iloc[self._idx, colindex]
 
-        # datetime conversion
-        coldtime = self._colmapping['datetime']
-
-        if coldtime is None:
-            # standard index in the datetime
-            tstamp = self.p.dataname.index[self._idx]
-        else:
-            # it's in a different column ... use standard column index
-            tstamp = self.p.dataname.iloc[self._idx, coldtime]
-
-        # convert to float via datetime and store it
-        dt = tstamp.to_pydatetime()
-        dtnum = date2num(dt)
-        self.lines.datetime[0] = dtnum
+        # datetime (converted in start)
+        self.lines.datetime[0] = self._dtnums[self._idx]
 
         # Done ... return
         return True
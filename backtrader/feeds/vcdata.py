@@ -93,6 +93,9 @@ class VCData(with_metaclass(MetaVCData, DataBase)):
         Disabling it will remove timezone usage (may help if the load is
         excesive)
     '''
+    # bars arrive through a queue which wakes the live loop up
+    _wakes = True
+
     params = (
         ('qcheck', 0.5),  # timeout in seconds (float) to check for events
         ('historical', False),  # usual industry value
@@ -356,6 +359,7 @@ class VCData(with_metaclass(MetaVCData, DataBase)):
                 self._tf, self._comp,
                 self.p.fromdate, self.p.todate,
                 self.p.historical)
+            self.q.wakeup = self._wakeup
 
             self._state = self._ST_FEEDING
 
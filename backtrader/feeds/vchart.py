@@ -21,13 +21,93 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import collections
 import datetime
+import math
 import struct
 import os.path
 
 from .. import feed
 from .. import TimeFrame
 from ..utils import date2num
+from ..utils.dateintern import (HOURS_PER_DAY, MINUTES_PER_DAY,
+                                SECONDS_PER_DAY, MUSECONDS_PER_DAY)
+
+
+def _unpackall(buf, barfmt):
+    '''Unpacks all the fixed-size records in ``buf`` into tuples. ``numpy`` is
+    used if available, else ``struct``'''
+    try:
+        import numpy as np  # keep the import very local
+    except ImportError:
+        np = None
+
+    if np is not None:
+        dtype = np.dtype(','.join('<u4' if x == 'I' else '<f4'
+                                  for x in barfmt))
+        return np.frombuffer(buf, dtype=dtype).tolist()
+
+    return list(struct.iter_unpack(str('<' + barfmt), buf))
+
+
+def vchartrecords(buf, barfmt, dtsize, tm=None):
+    '''Decodes the Visual Chart binary records contained in ``buf`` in a single
+    pass and returns a list of tuples ``(dtnum, o, h, l, c, v, oi)``
+
+    ``dtnum`` is what ``date2num`` returns for the datetime of the record. For
+    daily records (``dtsize == 1``) the time ``tm`` (if any) is added to the
+    date. Incomplete trailing records are discarded
+    '''
+    barsize = struct.calcsize(str('<' + barfmt))
+    buf = buf[:len(buf) - len(buf) % barsize]
+
+    if tm is not None:
+        tmparts = (tm.hour / HOURS_PER_DAY, tm.minute / MINUTES_PER_DAY,
+                   tm.second / SECONDS_PER_DAY,
+                   tm.microsecond / MUSECONDS_PER_DAY)
+
+    fsum = math.fsum
+    ordinals = dict()  # the date code is repeated across intraday bars
+    records = list()
+    for bdata in _unpackall(buf, barfmt):
+        dcode = bdata[0]
+        try:
+            base = ordinals[dcode]
+        except KeyError:
+            # Years are stored as if they had 500 days
+            y, md = divmod(dcode, 500)
+            # Months are stored as if they had 32 days
+            m, d = divmod(md, 32)
+            base = ordinals[dcode] = float(datetime.date(y, m, d).toordinal())
+
+        # same summation as date2num to keep the very same float values
+        if dtsize > 1:  # Minute Bars - Daily Time is stored in seconds
+            hhmm, ss = divmod(bdata[1], 60)
+            hh, mm = divmod(hhmm, 60)
+            dtnum = fsum((base, hh / HOURS_PER_DAY, mm / MINUTES_PER_DAY,
+                          ss / SECONDS_PER_DAY))
+        elif tm is not None:
+            dtnum = fsum((base,) + tmparts)
+        else:
+            dtnum = base
+
+        records.append((dtnum,) + tuple(bdata[dtsize:]))
+
+    return records
+
+
+def _loadrecord(data, record):
+    '''Fills the current bar of ``data`` with a decoded ``record`` (a tuple
+    ``(dtnum, o, h, l, c, v, oi)`` like those of ``vchartrecords``)'''
+    lines = data.lines
+    lines.datetime[0] = record[0]
+    o, h, l, c, v, oi = record[1:]
+    lines.open[0] = o
+    lines.high[0] = h
+    lines.low[0] = l
+    lines.close[0] = c
+    lines.volume[0] = v
+    lines.openinterest[0] = oi
 
 
 class VChartData(feed.DataBase):
@@ -44,7 +124,10 @@ class VChartData(feed.DataBase):
 
         Else the file extension (``.fd`` for daily and ``.min`` for intraday)
         will be used.
+
+    When preloading, the entire file is read and decoded in a single pass
     '''
+    _records = None
 
     def start(self):
         super(VChartData, self).start()
@@ -85,17 +168,34 @@ class VChartData(feed.DataBase):
             self.f = open(dataname, 'rb')
 
     def stop(self):
+        super(VChartData, self).stop()
+        self._records = None
         if self.f is not None:
             self.f.close()
             self.f = None
 
+    def preload(self):
+        if self.f is not None:
+            self._records = collections.deque(
+                vchartrecords(self.f.read(), self.barfmt, self.dtsize))
+
+        super(VChartData, self).preload()
+        self._records = None
+
     def _load(self):
+        if self._records is not None:  # decoded in bulk
+            if not self._records:
+                return False
+
+            _loadrecord(self, self._records.popleft())
+            return True
+
         if self.f is None:
             return False
 
         # Let an exception propagate to let the caller know
         bardata = self.f.read(self.barsize)
-        if not bardata:
+        if len(bardata) < self.barsize:  # end of file or incomplete record
             return False
 
         bdata = struct.unpack(self.barfmt, bardata)
@@ -112,16 +212,7 @@ class VChartData(feed.DataBase):
             hh, mm = divmod(hhmm, 60)
             dt = dt.replace(hour=hh, minute=mm, second=ss)
 
-        self.lines.datetime[0] = date2num(dt)
-
-        o, h, l, c, v, oi = bdata[self.dtsize:]
-        self.lines.open[0] = o
-        self.lines.high[0] = h
-        self.lines.low[0] = l
-        self.lines.close[0] = c
-        self.lines.volume[0] = v
-        self.lines.openinterest[0] = oi
-
+        _loadrecord(self, (date2num(dt),) + bdata[self.dtsize:])
         return True
 
 
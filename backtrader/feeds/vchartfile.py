@@ -21,12 +21,14 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import collections
 from datetime import datetime
 from struct import unpack
 import os.path
 
 import backtrader as bt
 from backtrader import date2num  # avoid dict lookups
+from .vchart import _loadrecord, vchartrecords
 
 
 class MetaVChartFile(bt.DataBase.__class__):
@@ -48,7 +50,14 @@ class VChartFile(bt.with_metaclass(MetaVChartFile, bt.DataBase)):
 
       - ``dataname``: Market code displayed by Visual Chart. Example: 015ES for
         EuroStoxx 50 continuous future
+
+      - ``prefetch``: if set, the records are read and unpacked in a
+        background thread
+
+    When preloading (and not prefetching), the entire file is read and decoded
+    in a single pass
     '''
+    _records = None
 
     def start(self):
         super(VChartFile, self).start()
@@ -89,29 +98,68 @@ class VChartFile(bt.with_metaclass(MetaVChartFile, bt.DataBase)):
             self.f = None
 
     def stop(self):
+        super(VChartFile, self).stop()
+        self._records = None
         if self.f is not None:
             self.f.close()
             self.f = None
 
-    def _load(self):
+    def _readbar(self):
+        '''Reads and unpacks the next record. Returns None if not possible'''
         if self.f is None:
-            return False  # cannot load more
+            return None  # cannot load more
 
         try:
             bardata = self.f.read(self._barsize)
         except IOError:
             self.f = None  # cannot return, nullify file
-            return False  # cannot load more
+            return None  # cannot load more
 
         if not bardata or len(bardata) < self._barsize:
             self.f = None  # cannot return, nullify file
-            return False  # cannot load more
+            return None  # cannot load more
 
         try:
-            bdata = unpack(self._barfmt, bardata)
+            return unpack(self._barfmt, bardata)
         except:
             self.f = None
-            return False
+            return None
+
+    def _prefetchsource(self):
+        if self.f is None:
+            return None
+
+        return iter(self._readbar, None)
+
+    def preload(self):
+        if self.f is not None and self._prefetcher is None:
+            try:
+                buf = self.f.read()
+            except IOError:
+                buf = b''
+
+            tm = self.p.sessionend if self._dtsize == 1 else None
+            self._records = collections.deque(
+                vchartrecords(buf, self._barfmt, self._dtsize, tm=tm))
+
+        super(VChartFile, self).preload()
+        self._records = None
+
+    def _load(self):
+        if self._records is not None:  # decoded in bulk
+            if not self._records:
+                return False
+
+            _loadrecord(self, self._records.popleft())
+            return True
+
+        if self._prefetcher is not None:
+            bdata = self._prefetched()
+        else:
+            bdata = self._readbar()
+
+        if bdata is None:
+            return False  # cannot load more
 
         # First Date
         y, md = divmod(bdata[0], 500)  # Years stored as if they had 500 days
@@ -127,15 +175,6 @@ class VChartFile(bt.with_metaclass(MetaVChartFile, bt.DataBase)):
         else:  # Daily Bars
             dt = datetime.combine(dt, self.p.sessionend)
 
-        self.lines.datetime[0] = date2num(dt)  # Store time
-
-        # Get the rest of the fields
-        o, h, l, c, v, oi = bdata[self._dtsize:]
-        self.lines.open[0] = o
-        self.lines.high[0] = h
-        self.lines.low[0] = l
-        self.lines.close[0] = c
-        self.lines.volume[0] = v
-        self.lines.openinterest[0] = oi
-
+        # Store time and the rest of the fields
+        _loadrecord(self, (date2num(dt),) + bdata[self._dtsize:])
         return True  # a bar has been successfully loaded
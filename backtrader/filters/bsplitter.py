@@ -59,6 +59,9 @@ class DaySplitter_Close(bt.with_metaclass(bt.MetaParams, object)):
         ('closevol', 0.5),  # 0 -> 1 amount of volume to keep for close
     )
 
+    # the close bar goes to the stash and from there again through all filters
+    _stashes = True
+
     # replaying = True
 
     def __init__(self, data):
@@ -75,6 +78,31 @@ class DaySplitter_Close(bt.with_metaclass(bt.MetaParams, object)):
 
         # Make a copy of current data for ohlbar
         ohlbar = [data.lines[i][0] for i in range(data.size())]
+        ohlbar, closebar = self._split(data, datadt, ohlbar)
+
+        # Update stream
+        data.backwards(force=True)  # remove the copied bar from stream
+        data._add2stack(ohlbar)  # add ohlbar to stack
+        # Add 2nd part to stash to delay processing to next round
+        data._add2stack(closebar, stash=True)
+
+        return False  # initial tick can be further processed from stack
+
+    def transform(self, data, bars):
+        '''Splits all the bars of a preloaded data in a single pass'''
+        out = list()
+        for bar in bars:
+            datadt = data.num2date(bar[data.DateTime]).date()
+            if self.lastdt == datadt:
+                out.append(bar)  # skip bars that come again in the filter
+                continue
+
+            self.lastdt = datadt  # keep ref to last seen bar
+            out.extend(self._split(data, datadt, bar))
+
+        return out
+
+    def _split(self, data, datadt, ohlbar):
         closebar = ohlbar[:]  # Make a copy for the close
 
         # replace close price with o-h-l average
@@ -101,11 +129,4 @@ class DaySplitter_Close(bt.with_metaclass(bt.MetaParams, object)):
         # Adjust times
         dt = datetime.datetime.combine(datadt, data.p.sessionend)
         closebar[data.DateTime] = data.date2num(dt)
-
-        # Update stream
-        data.backwards(force=True)  # remove the copied bar from stream
-        data._add2stack(ohlbar)  # add ohlbar to stack
-        # Add 2nd part to stash to delay processing to next round
-        data._add2stack(closebar, stash=True)
-
-        return False  # initial tick can be further processed from stack
+        return ohlbar, closebar
@@ -84,15 +84,49 @@ class CalendarDays(with_metaclass(metabase.MetaParams, object)):
         Invalidates the control dtime_prev if requested
         '''
         tm = data.datetime.time(0)  # get time part
+        price = self._fillprice(data.close[-1], data.high[-1], data.low[-1])
+        extra = [data.lines[i][0]
+                 for i in range(data.DateTime + 1, data.size())]
 
+        # Add the constructed bars to the stack of the stream
+        for bar in self._newbars(data, dt, lastdt, tm, price, extra):
+            data._add2stack(bar)
+
+        # Save to stack the bar that signaled the gap
+        data._save2stack(erase=True)
+
+    def transform(self, data, bars):
+        '''Adds the missing calendar days to all the bars of a preloaded
+        data in a single pass'''
+        out = list()
+        for bar in bars:
+            dtime = data.num2date(bar[data.DateTime])
+            dt = dtime.date()
+            if (dt - self.lastdt) > self.ONEDAY:  # gap in place
+                pbar = out[-1]
+                price = self._fillprice(pbar[data.Close], pbar[data.High],
+                                        pbar[data.Low])
+                out.extend(self._newbars(data, dt, self.lastdt, dtime.time(),
+                                         price, bar[data.DateTime + 1:]))
+
+            self.lastdt = dt
+            out.append(bar)
+
+        return out
+
+    def _fillprice(self, close, high, low):
         # Same price for all bars
-        if self.p.fill_price > 0:
+        if not self.p.fill_price:
+            price = close
+        elif self.p.fill_price > 0:
             price = self.p.fill_price
-        elif not self.p.fill_price:
-            price = data.close[-1]
         elif self.p.fill_price == -1:
-            price = (data.high[-1] + data.low[-1]) / 2.0
+            price = (high + low) / 2.0
 
+        return price
+
+    def _newbars(self, data, dt, lastdt, tm, price, extra):
+        bars = list()
         while lastdt < dt:
             lastdt += self.ONEDAY
 
@@ -110,11 +144,7 @@ class CalendarDays(with_metaclass(metabase.MetaParams, object)):
             bar[data.OpenInterest] = self.p.fill_oi
 
             # Fill extra lines the data feed may have defined beyond DateTime
-            for i in range(data.DateTime + 1, data.size()):
-                bar[i] = data.lines[i][0]
-
-            # Add this constructed bar to the stack of the stream
-            data._add2stack(bar)
+            bar[data.DateTime + 1:] = extra
+            bars.append(bar)
 
-        # Save to stack the bar that signaled the gap
-        data._save2stack(erase=True)
+        return bars
@@ -77,9 +77,9 @@ class DataFiller(AbstractDataBase):
         super(DataFiller, self).preload()
 
     def _copyfromdata(self):
-        # Data is allowed - Copy size which is "number of lines"
-        for i in range(self.p.dataname.size()):
-            self.lines[i][0] = self.p.dataname.lines[i][0]
+        # Data is allowed - Copy the lines (gaps prevent sharing the buffers)
+        for line, dline in zip(self.lines, self.p.dataname.lines):
+            line[0] = dline[0]
 
         self._dbar = False  # invalidate flag for read bar
 
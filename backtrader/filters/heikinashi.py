@@ -52,3 +52,23 @@ class HeikinAshi(object):
             data.open[0] = ha_open0 = (o + c) / 2.0
 
         return False  # length of data stream is unaltered
+
+    def transform(self, data, bars):
+        '''Remodels all the bars of a preloaded data in a single pass'''
+        ha_open0 = ha_close0 = None
+        for bar in bars:
+            o, h, l, c = (bar[data.Open], bar[data.High], bar[data.Low],
+                          bar[data.Close])
+
+            ha_close1 = ha_close0
+            bar[data.Close] = ha_close0 = (o + h + l + c) / 4.0
+
+            if ha_open0 is not None:
+                bar[data.Open] = ha_open0 = (ha_open0 + ha_close1) / 2.0
+                bar[data.High] = max(ha_open0, ha_close0, h)
+                bar[data.Low] = min(ha_open0, ha_close0, l)
+
+            else:  # 1st bar, no lookback is possible
+                bar[data.Open] = ha_open0 = (o + c) / 2.0
+
+        return bars
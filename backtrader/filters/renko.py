@@ -73,7 +73,9 @@ class Renko(Filter):
     )
 
     def nextstart(self, data):
-        o = data.open[0]
+        self._startbricks(data.open[0])
+
+    def _startbricks(self, o):
         o = round(o / self.p.align, 0) * self.p.align  # aligned
         self._size = self.p.size or float(o // self.p.autosize)
         if self.p.roundstart:
@@ -83,10 +85,38 @@ class Renko(Filter):
         self._bot = o - self._size
 
     def next(self, data):
-        c = data.close[0]
-        h = data.high[0]
-        l = data.low[0]
-
+        brick = self._brick(data.close[0], data.high[0], data.low[0])
+        if brick is None:
+            data.backwards()
+            return True  # length of stream was changed, get new bar
+
+        data.open[0], data.low[0], data.high[0], data.close[0] = brick
+        data.volume[0] = 0.0
+        data.openinterest[0] = 0.0
+        return False  # length of data stream is unaltered
+
+    def transform(self, data, bars):
+        '''Builds the bricks for all the bars of a preloaded data'''
+        bricks = list()
+        for bar in bars:
+            if self._firsttime:
+                self._startbricks(bar[data.Open])
+                self._firsttime = False
+
+            brick = self._brick(bar[data.Close], bar[data.High],
+                                bar[data.Low])
+            if brick is not None:
+                (bar[data.Open], bar[data.Low], bar[data.High],
+                 bar[data.Close]) = brick
+                bar[data.Volume] = 0.0
+                bar[data.OpenInterest] = 0.0
+                bricks.append(bar)
+
+        return bricks
+
+    def _brick(self, c, h, l):
+        '''Returns the open, low, high, close of the brick delivered for the
+        given prices or None if no brick is delivered'''
         if self.p.hilo:
             hiprice = h
             loprice = l
@@ -105,14 +135,7 @@ class Renko(Filter):
                 top = bot + self._size
 
             self._top = top
-
-            data.open[0] = bot
-            data.low[0] = bot
-            data.high[0] = top
-            data.close[0] = top
-            data.volume[0] = 0.0
-            data.openinterest[0] = 0.0
-            return False  # length of data stream is unaltered
+            return bot, bot, top, top
 
         elif loprice <= self._bot:
             # deliver a renko brick from bot -> bot - size
@@ -126,14 +149,6 @@ class Renko(Filter):
                 bot = top - self._size
 
             self._bot = bot
+            return top, top, bot, bot
 
-            data.open[0] = top
-            data.low[0] = top
-            data.high[0] = bot
-            data.close[0] = bot
-            data.volume[0] = 0.0
-            data.openinterest[0] = 0.0
-            return False  # length of data stream is unaltered
-
-        data.backwards()
-        return True  # length of stream was changed, get new bar
+        return None
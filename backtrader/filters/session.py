@@ -159,6 +159,16 @@ class SessionFiller(with_metaclass(metabase.MetaParams, object)):
         return bool(dirty) or not tostack
 
     def _fillbar(self, data, dtime):
+        extra = [data.lines[i][0]
+                 for i in range(data.DateTime + 1, data.size())]
+        bar = self._newbar(data, dtime, data.close[-1], extra)
+
+        # Add tot he stack of bars to save
+        data._add2stack(bar)
+
+        return True
+
+    def _newbar(self, data, dtime, close, extra):
         # Prepare an array of the needed size
         bar = [float('Nan')] * data.size()
 
@@ -166,7 +176,7 @@ class SessionFiller(with_metaclass(metabase.MetaParams, object)):
         bar[data.DateTime] = data.date2num(dtime)
 
         # Fill the prices
-        price = self.p.fill_price or data.close[-1]
+        price = self.p.fill_price or close
         for pricetype in [data.Open, data.High, data.Low, data.Close]:
             bar[pricetype] = price
 
@@ -175,13 +185,63 @@ class SessionFiller(with_metaclass(metabase.MetaParams, object)):
         bar[data.OpenInterest] = self.p.fill_oi
 
         # Fill extra lines the data feed may have defined beyond DateTime
-        for i in range(data.DateTime + 1, data.size()):
-            bar[i] = data.lines[i][0]
-
-        # Add tot he stack of bars to save
-        data._add2stack(bar)
+        bar[data.DateTime + 1:] = extra
+        return bar
+
+    def transform(self, data, bars):
+        '''Fills all the bars of a preloaded data in a single pass, with the
+        same logic as ``__call__``'''
+        out = list()
+        for bar in bars:
+            dtime_cur = data.num2date(bar[data.DateTime])
+            close = out[-1][data.Close] if out else bar[data.Close]
+            extra = bar[data.DateTime + 1:]
+
+            pending, fills = [], []
+            if dtime_cur > self.sessend:
+                # over session end - filled bars go after the current bar
+                pending = self._newbars(data, self.dtime_prev,
+                                        self.sessend + self._tdframe,
+                                        close, extra)
+                self.sessend = self.MAXDATE
+
+            if self.sessend == self.MAXDATE:
+                ddate = dtime_cur.date()
+                sessstart = datetime.combine(ddate, data.p.sessionstart)
+                self.sessend = sessend = datetime.combine(ddate,
+                                                          data.p.sessionend)
+
+                if sessstart <= dtime_cur <= sessend:
+                    if self.seenbar or not self.p.skip_first_fill:
+                        fills = self._newbars(data, sessstart - self._tdunit,
+                                              dtime_cur, close, extra)
+
+                self.seenbar = True
+                self.dtime_prev = dtime_cur
+
+            else:
+                fills = self._newbars(data, self.dtime_prev, dtime_cur,
+                                      close, extra)
+                self.dtime_prev = dtime_cur
+
+            if fills:  # current bar goes after all filled bars
+                out.extend(pending)
+                out.extend(fills)
+                out.append(bar)
+            else:
+                out.append(bar)
+                out.extend(pending)
+
+        return out
+
+    def _newbars(self, data, time_start, time_end, close, extra):
+        bars = list()
+        time_start += self._tdunit
+        while time_start < time_end:
+            bars.append(self._newbar(data, time_start, close, extra))
+            time_start += self._tdunit
 
-        return True
+        return bars
 
 
 class SessionFilterSimple(with_metaclass(metabase.MetaParams, object)):
@@ -242,3 +302,10 @@ class SessionFilter(with_metaclass(metabase.MetaParams, object)):
         # bar outside of the regular session times
         data.backwards()  # remove bar from data stack
         return True  # signal the data was manipulated
+
+    def transform(self, data, bars):
+        '''Removes all the bars of a preloaded data outside of the session'''
+        sessionstart, sessionend = data.p.sessionstart, data.p.sessionend
+        return [bar for bar in bars
+                if sessionstart <= data.num2date(bar[data.DateTime]).time()
+                <= sessionend]
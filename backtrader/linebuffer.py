@@ -41,7 +41,7 @@ from .utils.py3 import range, with_metaclass, string_types
 
 from .lineroot import LineRoot, LineSingle, LineMultiple
 from . import metabase
-from .utils import num2date, time2num
+from .utils import num2date, num2dates, time2num, DateCache
 
 
 NAN = float('NaN')
@@ -78,6 +78,7 @@ class LineBuffer(LineSingle):
         self.bindings = list()
         self.reset()
         self._tz = None
+        self._dtcache = None
 
     def get_idx(self):
         return self._idx
@@ -382,18 +383,39 @@ class LineBuffer(LineSingle):
 
     def _settz(self, tz):
         self._tz = tz
+        if self._dtcache is not None:
+            self._dtcache.clear()
+
+    def _dtcache_get(self):
+        # strategies, analyzers and observers convert the same bar several
+        # times: keep a memo of the conversions (created only on demand)
+        dtcache = self._dtcache
+        if dtcache is None:
+            dtcache = self._dtcache = DateCache()
+
+        return dtcache
+
+    def _num2date(self, x, tz=None, naive=True):
+        return self._dtcache_get().num2date(x, tz=tz, naive=naive)
 
     def datetime(self, ago=0, tz=None, naive=True):
-        return num2date(self.array[self.idx + ago],
-                        tz=tz or self._tz, naive=naive)
+        return self._num2date(self.array[self.idx + ago],
+                              tz=tz or self._tz, naive=naive)
 
     def date(self, ago=0, tz=None, naive=True):
-        return num2date(self.array[self.idx + ago],
-                        tz=tz or self._tz, naive=naive).date()
+        return self._num2date(self.array[self.idx + ago],
+                              tz=tz or self._tz, naive=naive).date()
 
     def time(self, ago=0, tz=None, naive=True):
-        return num2date(self.array[self.idx + ago],
-                        tz=tz or self._tz, naive=naive).time()
+        return self._num2date(self.array[self.idx + ago],
+                              tz=tz or self._tz, naive=naive).time()
+
+    def datetimes(self, ago=0, size=1, tz=None, naive=True):
+        ''' Returns a list of datetime instances for a slice of the array
+        relative to *ago* (see ``get`` for the meaning of *ago* and *size*)
+        '''
+        return num2dates(self.get(ago=ago, size=size),
+                         tz=tz or self._tz, naive=naive)
 
     def dt(self, ago=0):
         '''
@@ -417,7 +439,7 @@ class LineBuffer(LineSingle):
         # To avoid precision errors, this returns the fractional part after
         # having converted it to a datetime.time object to avoid precision
         # errors in comparisons
-        return time2num(num2date(self.array[self.idx + ago]).time())
+        return time2num(self._num2date(self.array[self.idx + ago]).time())
 
     def tm_lt(self, other, ago=0):
         '''
@@ -779,8 +801,9 @@ class LinesOperation(LineActions):
         op = self.operation
         tz = self._tz
 
-        for i in range(start, end):
-            dst[i] = op(num2date(srca[i], tz=tz).time(), srcb)
+        dts = num2dates(srca[start:end], tz=tz)
+        for i, dt in zip(range(start, end), dts):
+            dst[i] = op(dt.time(), srcb)
 
     def _once_val_op(self, start, end):
         # cache python dictionary lookups
@@ -304,6 +304,9 @@ class OrderBase(with_metaclass(MetaParams, object)):
         self.ref = next(self.refbasis)
         self.broker = None
         self.info = AutoOrderedDict()
+        # latency stamps (wall clock) set by live brokers: submit, sent, ack
+        # and fill. Shared with the notified clones
+        self.stamps = dict()
         self.comminfo = None
         self.triggered = False
 
@@ -23,6 +23,7 @@ from __future__ import (absolute_import, division, print_function,
 
 
 from datetime import datetime, date, timedelta
+import time
 
 from .dataseries import TimeFrame, _Bar
 from .utils.py3 import with_metaclass
@@ -93,6 +94,78 @@ class DTFaker(object):
         return self.data._getnexteos()
 
 
+class _BatchLine(object):
+    # Line-like view over the rows handled by _BatchData: index 0 is the
+    # current source row and negative indices are the bars already delivered
+
+    def __init__(self, bdata, idx):
+        self.bdata = bdata
+        self.idx = idx
+
+    def __getitem__(self, ago):
+        if not ago:
+            return self.bdata.row[self.idx]
+
+        return self.bdata.out[ago][self.idx]
+
+    def datetime(self, ago=0):
+        return self.bdata.data.num2date(self[ago])
+
+    def date(self, ago=0):
+        return self.datetime(ago).date()
+
+    def time(self, ago=0):
+        return self.datetime(ago).time()
+
+
+class _BatchData(object):
+    # Stands in for a data feed when already loaded source bars are resampled
+    # in a single pass. The resampler logic is applied unchanged to each row
+    # (tuples with the values of the lines) but no data line is moved
+    # forward/backwards and no filter is dispatched. Delivered bars are
+    # collected in ``out``
+    #
+    # The current row is at index 0 and the delivered bars precede it, just
+    # like in the data feed during bar by bar resampling
+
+    def __init__(self, data):
+        self.data = data
+        self.p = data.p
+        self._calendar = data._calendar
+        self.row = None
+        self.out = list()
+
+        # Line views like in a data feed (order of DataBase lines)
+        self.close = _BatchLine(self, 0)
+        self.low = _BatchLine(self, 1)
+        self.high = _BatchLine(self, 2)
+        self.open = _BatchLine(self, 3)
+        self.volume = _BatchLine(self, 4)
+        self.openinterest = _BatchLine(self, 5)
+        self.datetime = _BatchLine(self, 6)
+
+    def __len__(self):
+        return len(self.out) + (self.row is not None)
+
+    def num2date(self, *args, **kwargs):
+        return self.data.num2date(*args, **kwargs)
+
+    def date2num(self, *args, **kwargs):
+        return self.data.date2num(*args, **kwargs)
+
+    def _getnexteos(self):
+        if self.row is None:
+            return datetime.min, 0.0
+
+        return self.data._calcnexteos(self.row[6])
+
+    def backwards(self, size=1, force=False):
+        self.row = None  # the row has been consumed
+
+    def _add2stack(self, bar, stash=False):
+        self.out.append(bar)
+
+
 class _BaseResampler(with_metaclass(metabase.MetaParams, object)):
     params = (
         ('bar2edge', True),
@@ -309,6 +382,28 @@ class _BaseResampler(with_metaclass(metabase.MetaParams, object)):
 
         return self(data, fromcheck=True, forcedata=_forcedata)
 
+    _TFSECONDS = {
+        TimeFrame.MicroSeconds: 1e-6,
+        TimeFrame.Seconds: 1.0,
+        TimeFrame.Minutes: 60.0,
+    }
+
+    def nextcheck(self, data):
+        '''Returns the seconds (wall clock) until the next time boundary at
+        which ``check`` could deliver the stored bar or ``None`` if there is
+        no such boundary. Lets a live loop sleep until then'''
+        if not self.bar.isopen() or not self.p.bar2edge:
+            return None
+
+        period = self._TFSECONDS.get(self.p.timeframe)
+        if period is None:
+            return None
+
+        # boundaries are aligned to the start of the day (and the epoch)
+        period *= self.p.compression
+        now = time.time() + data._timeoffset().total_seconds()
+        return period - now % period
+
     def _dataonedge(self, data):
         if not self.subweeks:
             if data._calendar is None:
@@ -466,15 +561,116 @@ class Resampler(_BaseResampler):
 
         If True the used boundary for the time will be hh:mm:05 (the ending
         boundary)
+
+      - batch (default: False)
+
+        When the data is preloaded, load first all source bars and resample
+        them afterwards in a single pass over the values, instead of moving
+        the lines of the data backwards and forwards for each source bar. The
+        resulting bars are the same. Only used if the resampler is the last
+        filter added to the data
     '''
     params = (
         ('bar2edge', True),
         ('adjbartime', True),
         ('rightedge', True),
+        ('batch', False),
     )
 
     replaying = False
 
+    def preload(self, data):
+        '''Called by ``data`` to let the filter take over preloading.
+
+        Returns ``False`` if the data has to be preloaded bar by bar
+        '''
+        if not self.p.batch:
+            return False
+
+        fanout = data._clone and len(data._filters) == 1
+        if fanout and data.data.buflen():
+            # Fan-out: the source is preloaded, take the bars directly from
+            # it and share them with the resamplers of the other clones
+            rows = self._clonerows(data)
+        else:
+            fanout = False
+            rows = self._loadrows(data)
+
+        bdata = _BatchData(data)
+        self.data = bdata  # eos calculations will be done on the rows
+        try:
+            for row in rows:
+                bdata.row = row
+                self(bdata)
+
+            bdata.row = None
+            nrows = len(bdata.out)
+            self.last(bdata)
+        finally:
+            self.data = data
+
+        # The bars are now delivered as if produced by the filter
+        for bar in bdata.out:
+            data._add2stack(bar)
+
+        # A fan-out clone must not copy the bars of the source when loading
+        if fanout:
+            state = data._preloading, data._dlen
+            data._preloading, data._dlen = False, len(data.data)
+        try:
+            while data.load():
+                pass
+        finally:
+            if fanout:
+                data._preloading, data._dlen = state
+
+        # Bars produced by "last" are only known when the source is over
+        # and the system must not deliver them before (see cerebro)
+        data._rslast = len(data) - (len(bdata.out) - nrows)
+
+        data._last()
+        data.home()
+        return True
+
+    def _clonerows(self, data):
+        src = data.data
+        rows = list()
+        fromdate, todate = data.fromdate, data.todate
+        for row in src._getrows():
+            dt = row[6]
+            if dt < fromdate:
+                continue
+            if dt > todate:
+                break
+
+            rows.append(row)
+
+        return rows
+
+    def _loadrows(self, data):
+        # Load all source bars with the other filters but not with self
+        fentry = data._filters.pop()
+        ffentries = data._ffilters[:]
+        data._ffilters[:] = [x for x in ffentries if x[0] is not self]
+        try:
+            rows = data._transformbars()  # the other filters may be arrays
+            if rows is None:
+                while data.load():
+                    pass
+
+                data._last()
+        finally:
+            data._filters.append(fentry)
+            data._ffilters[:] = ffentries
+
+        if rows is not None:
+            return rows
+
+        size = len(data)
+        rows = list(zip(*(line.get(size=size) for line in data.itersize())))
+        data.backwards(size=size, force=True)
+        return rows
+
     def last(self, data):
         '''Called when the data is no longer producing bars
 
@@ -22,9 +22,11 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 import collections
+import functools
 
 from backtrader.metabase import MetaParams
 from backtrader.utils.py3 import with_metaclass
+from backtrader.utils import aioloop, aiospawn
 
 
 class MetaSingleton(MetaParams):
@@ -92,3 +94,42 @@ class Store(with_metaclass(MetaSingleton, object)):
         '''Return the pending "store" notifications'''
         self.notifs.append(None)  # put a mark / threads could still append
         return [x for x in iter(self.notifs.popleft, None)]
+
+
+class AsyncStore(Store):
+    '''Base class for Stores talking to the server with asyncio coroutines
+
+    The coroutines run in the event loop of ``Cerebro.run_async`` (or in a
+    background event loop with ``Cerebro.run``), available as ``loop`` once
+    the store has been started. Blocking calls of a synchronous client can
+    be awaited with ``call``, which runs them in the executor of the loop
+    '''
+    loop = None
+
+    def start(self, data=None, broker=None):
+        if not self._started:
+            self.loop = aioloop()
+            self._tasks = set()
+
+        super(AsyncStore, self).start(data=data, broker=broker)
+
+    def stop(self):
+        super(AsyncStore, self).stop()
+        for task in list(self._tasks):
+            task.cancel()
+
+        self._tasks.clear()
+
+    def spawn(self, coro):
+        '''Runs the coroutine ``coro`` in the loop. It is cancelled (if still
+        running) when the store stops'''
+        task = aiospawn(self.loop, coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def call(self, func, *args, **kwargs):
+        '''Awaits the blocking ``func(*args, **kwargs)`` run in the executor
+        of the loop'''
+        return await self.loop.run_in_executor(
+            None, functools.partial(func, *args, **kwargs))
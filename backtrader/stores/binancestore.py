@@ -1,3 +1,6 @@
+import bisect
+from concurrent.futures import ThreadPoolExecutor
+import threading
 import time
 from functools import wraps
 from math import floor
@@ -5,9 +8,13 @@ from math import floor
 from binance import Client, ThreadedWebsocketManager
 from binance.enums import *
 from binance.exceptions import BinanceAPIException
+from binance.helpers import interval_to_milliseconds
 from requests.exceptions import ConnectTimeout, ConnectionError
 
 from backtrader.dataseries import TimeFrame
+from backtrader.stores.klinecache import KlineCache
+from backtrader.stores.ratelimit import RateLimiter
+from backtrader.stores.streammux import StreamMultiplexer, CombinedStreams
 
 
 class BinanceStore(object):
@@ -29,11 +36,47 @@ class BinanceStore(object):
         (TimeFrame.Months, 1): KLINE_INTERVAL_1MONTH,
     }
 
-    def __init__(self, api_key, api_secret, coin_target, testnet=False, retries=5, tld='com'):  # coin_refer, coin_target
+    # Spot API budgets (per IP for the weight, per account for the orders)
+    _LIMITS = {
+        'weight-1m': (6000, 60),
+        'orders-10s': (100, 10),
+        'orders-1d': (200000, 86400),
+    }
+
+    # Headers reporting the used budgets, like x-mbx-used-weight-1m
+    _LIMIT_HEADERS = {
+        'x-mbx-used-weight-': 'weight-',
+        'x-mbx-order-count-': 'orders-',
+    }
+
+    # Klines per request (max allowed by the API)
+    _KLINES_PAGE = 1000
+
+    # Combined market streams
+    _STREAM_URL = 'wss://stream.binance.%s:9443'
+    _STREAM_TESTNET = 'wss://stream.testnet.binance.vision'
+
+    def __init__(self, api_key, api_secret, coin_target, testnet=False, retries=5, tld='com',
+                 limiter=None, cachedir=None, workers=8):  # coin_refer, coin_target
+        # shared by every request to the API (store, datas and broker)
+        self.limiter = limiter or RateLimiter(self._LIMITS, headers=self._LIMIT_HEADERS)
+        # historical klines: local cache (if any) and concurrent downloads
+        self.cache = KlineCache(cachedir) if cachedir else None
+        self.workers = workers
+
         self.binance = Client(api_key, api_secret, testnet=testnet, tld=tld)
+        # the client is shared by several threads: keep the response headers
+        # (used budgets) of the last request of each thread
+        self._local = threading.local()
+        self.binance.session.hooks['response'].append(self._keep_headers)
         self.binance_socket = ThreadedWebsocketManager(api_key, api_secret, testnet=testnet)
         self.binance_socket.daemon = True
         self.binance_socket.start()
+        # kline streams of all datas share a few combined stream sockets, new
+        # streams are subscribed over the open connection
+        self._wsstreams = CombinedStreams(self._STREAM_TESTNET if testnet else self._STREAM_URL % tld)
+        self._streams = StreamMultiplexer(self._wsstreams.start, self._wsstreams.stop,
+                                          subscribe=self._wsstreams.subscribe)
         # self.coin_refer = coin_refer
         self.coin_target = coin_target  # USDT
         # self.symbol = coin_refer + coin_target
@@ -56,30 +99,52 @@ class BinanceStore(object):
             return '{:0.0{}f}'.format(float(value), precision)
         return floor(value)
         
-    def retry(func):
-        @wraps(func)
-        def wrapper(self, *args, **kwargs):
-            for attempt in range(1, self.retries + 1):
-                time.sleep(60 / 1200) # API Rate Limit
-                try:
-                    return func(self, *args, **kwargs)
-                except (BinanceAPIException, ConnectTimeout, ConnectionError) as err:
-                    if isinstance(err, BinanceAPIException) and err.code == -1021:
-                        # Recalculate timestamp offset between local and Binance's server
-                        res = self.binance.get_server_time()
-                        self.binance.timestamp_offset = res['serverTime'] - int(time.time() * 1000)
-                    
-                    if attempt == self.retries:
-                        raise
-        return wrapper
-
-    @retry
+    def retry(weight=1, orders=0):
+        # weight/orders: budgets taken by a call. Waits only if exhausted
+        def decorator(func):
+            @wraps(func)
+            def wrapper(self, *args, **kwargs):
+                for attempt in range(1, self.retries + 1):
+                    self.limiter.acquire(**{'weight-1m': weight,
+                                            'orders-10s': orders,
+                                            'orders-1d': orders})
+                    self._local.headers = None
+                    try:
+                        ret = func(self, *args, **kwargs)
+                        self.limiter.update(self._last_headers())
+                        return ret
+                    except (BinanceAPIException, ConnectTimeout, ConnectionError) as err:
+                        if isinstance(err, BinanceAPIException):
+                            headers = getattr(err.response, 'headers', None)
+                            self.limiter.update(headers)
+                            if err.status_code in (418, 429):  # limits exceeded / banned
+                                retry_after = (headers or {}).get('Retry-After')
+                                self.limiter.backoff(attempt, retry_after)
+
+                            elif err.code == -1021:
+                                # Recalculate timestamp offset between local and Binance's server
+                                res = self.binance.get_server_time()
+                                self.binance.timestamp_offset = res['serverTime'] - int(time.time() * 1000)
+
+                        if attempt == self.retries:
+                            raise
+            return wrapper
+        return decorator
+
+    def _keep_headers(self, response, *args, **kwargs):
+        self._local.headers = response.headers  # runs in the calling thread
+
+    def _last_headers(self):
+        # of the last request made by this thread (not by any other)
+        return getattr(self._local, 'headers', None)
+
+    @retry(weight=7)  # open orders (6) + delete (1)
     def cancel_open_orders(self, symbol):
         orders = self.binance.get_open_orders(symbol=symbol)
         if len(orders) > 0:
             self.binance._request_api('delete', 'openOrders', signed=True, data={ 'symbol': symbol })
 
-    @retry
+    @retry()
     def cancel_order(self, symbol, order_id):
         try:
             self.binance.cancel_order(symbol=symbol, orderId=order_id)
@@ -91,7 +156,7 @@ class BinanceStore(object):
         except Exception as err:
             raise err
     
-    @retry
+    @retry(orders=1)
     def create_order(self, symbol, side, type, size, price, **params):
         if type == None: type = ORDER_TYPE_MARKET
 
@@ -125,7 +190,7 @@ class BinanceStore(object):
     def format_quantity(self, symbol, size):
         return self._format_value(size, self._asset_filters[symbol]['stepSize'])
 
-    @retry
+    @retry(weight=20)  # account information
     def get_asset_balance(self, asset):
         balance = self.binance.get_asset_balance(asset)
         return float(balance['free']), float(balance['locked'])
@@ -173,13 +238,79 @@ class BinanceStore(object):
 
         return filters
 
+    @retry(weight=2)
+    def get_klines(self, symbol, interval, start, end):
+        return self.binance.get_klines(symbol=symbol, interval=interval, startTime=start, endTime=end,
+                                       limit=self._KLINES_PAGE)
+
+    def _get_klines_serial(self, symbol, interval, start, end):
+        """Klines downloaded page after page, each page taken from the budget (for intervals without
+        a fixed length, where the next page starts after the last kline received)"""
+        klines = []
+        while start <= end:
+            page = self.get_klines(symbol, interval, start, end)
+            klines.extend(page)
+            if len(page) < self._KLINES_PAGE:
+                break
+
+            start = page[-1][0] + 1
+
+        return klines
+
+    def get_historical_klines(self, symbol, interval, start, end):
+        """Klines with an opening time between start and end (ms since the epoch). The range is split
+        in pages which are downloaded concurrently (within the budget of the rate limiter)"""
+        span = interval_to_milliseconds(interval)
+        if not span:  # months have no fixed length: let the client paginate
+            return self._get_klines_serial(symbol, interval, start, end)
+
+        span *= self._KLINES_PAGE
+        pages = [(t, min(t + span - 1, end)) for t in range(start, end + 1, span)]
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as pool:
+            results = list(pool.map(lambda page: self.get_klines(symbol, interval, *page), pages))
+
+        return [kline for klines in results for kline in klines]
+
+    def get_kline_columns(self, symbol, interval, start, drop_newest=True):
+        """Columns (time in ms, open, high, low, close, volume as array('d')) of the klines from start (ms
+        since the epoch) until now. With a cache only the klines after the last cached one are downloaded
+        and the closed ones are added to the cache"""
+        now = int(time.time() * 1000)
+
+        cols = self.cache.read(symbol, interval) if self.cache is not None else None
+        if cols and cols[0] and cols[0][0] <= start:
+            fetchfrom = int(cols[0][-1]) + 1  # only the missing tail
+        else:
+            fetchfrom, cols = start, None
+
+        klines = self.get_historical_klines(symbol, interval, fetchfrom, now)
+        if self.cache is not None:
+            nclosed = len(klines)
+            while nclosed and klines[nclosed - 1][6] >= now:  # closing time not yet reached
+                nclosed -= 1
+
+            self.cache.append(symbol, interval, KlineCache.columns(klines[:nclosed]))
+
+        new = KlineCache.columns(klines)
+        cols = new if cols is None else [col + n for col, n in zip(cols, new)]
+        if drop_newest and cols[0]:
+            cols = [col[:-1] for col in cols]  # the newest is usually still open
+
+        idx = bisect.bisect_left(cols[0], start)
+        return [col[idx:] for col in cols]
+
     def get_interval(self, timeframe, compression):
         return self._GRANULARITIES.get((timeframe, compression))
 
-    @retry
+    @retry(weight=20)  # exchange information
     def get_symbol_info(self, symbol):
         return self.binance.get_symbol_info(symbol)
 
+    def subscribe_klines(self, symbol, interval, callback):
+        """Routes the kline messages of symbol/interval to callback (through a shared combined stream)"""
+        self._streams.subscribe('%s@kline_%s' % (symbol.lower(), interval), callback)
+
     def stop_socket(self):
+        self._streams.stop()
         self.binance_socket.stop()
         self.binance_socket.join(5)
\ No newline at end of file
@@ -36,7 +36,7 @@ import ib.opt as ibopt
 from backtrader import TimeFrame, Position
 from backtrader.metabase import MetaParams
 from backtrader.utils.py3 import bytes, bstr, queue, with_metaclass, long
-from backtrader.utils import AutoDict, UTC
+from backtrader.utils import AutoDict, UTC, WakeupQueue
 
 bytes = bstr  # py2/3 need for ibpy
 
@@ -81,6 +81,11 @@ class RTVolume(object):
         if tmoffset is not None:
             self.datetime += tmoffset
 
+        # latency stamps: exchange time (if given) and arrival time
+        tstamp = rtvol.split(';')[2] if rtvol else ''
+        self.event = long(tstamp) / 1000.0 if tstamp else None
+        self.queued = time.time()
+
 
 class MetaSingleton(MetaParams):
     '''Metaclass to make a metaclassed class a singleton'''
@@ -601,7 +606,7 @@ class IBStore(with_metaclass(MetaSingleton, object)):
 
     def getTickerQueue(self, start=False):
         '''Creates ticker/Queue for data delivery to a data feed'''
-        q = queue.Queue()
+        q = WakeupQueue()
         if start:
             q.put(None)
             return q
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from array import array
+import os
+
+__all__ = ['KlineCache']
+
+
+class KlineCache(object):
+    '''Append-only columnar cache of klines (candles) on disk
+
+    Each symbol/interval pair has one file per column in ``COLUMNS`` holding
+    the values as native doubles (``time`` is the opening time in
+    milliseconds since the epoch). New klines are only appended, so a later
+    run reads the columns straight into arrays and only has to download the
+    klines after the last one in the cache
+
+    Params:
+
+      - ``path``: directory for the files (created if needed)
+    '''
+    COLUMNS = ('time', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, path):
+        self.path = path
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+    def _files(self, symbol, interval):
+        # 1m (minute) and 1M (month) would clash in case insensitive systems
+        interval = interval.replace('M', 'mon')
+        base = os.path.join(self.path, '%s-%s.' % (symbol, interval))
+        return [base + col for col in self.COLUMNS]
+
+    @classmethod
+    def columns(cls, klines):
+        '''Returns the columns (array of doubles) of a list of klines as
+        delivered by the API (values may be strings)'''
+        return [array(str('d'), (float(k[i]) for k in klines))
+                for i in range(len(cls.COLUMNS))]
+
+    def read(self, symbol, interval):
+        '''Returns the cached columns (empty if nothing is cached)'''
+        cols = list()
+        for fname in self._files(symbol, interval):
+            col = array(str('d'))
+            if os.path.exists(fname):
+                with open(fname, 'rb') as f:
+                    col.frombytes(f.read())
+            cols.append(col)
+
+        # an interrupted append may have left columns of different lengths
+        size = min(len(col) for col in cols)
+        for col in cols:
+            del col[size:]
+
+        return cols
+
+    def append(self, symbol, interval, cols):
+        '''Appends the given columns to the cache. If the 1st new time is
+        not after the last cached one, the cache is rewritten'''
+        if not len(cols[0]):
+            return
+
+        cached = self.read(symbol, interval)
+        size = len(cached[0])
+        if size and cols[0][0] <= cached[0][-1]:
+            size = 0  # overlapping/older data: start over
+
+        itemsize = cols[0].itemsize
+        for fname, col in zip(self._files(symbol, interval), cols):
+            with open(fname, 'ab') as f:
+                f.truncate(size * itemsize)  # drop any partial append
+                f.seek(size * itemsize)
+                col.tofile(f)
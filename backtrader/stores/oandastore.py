@@ -22,7 +22,9 @@ from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
 import collections
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import functools
 import time as _time
 import json
 import threading
@@ -32,8 +34,9 @@ import requests  # oandapy depdendency
 
 import backtrader as bt
 from backtrader.metabase import MetaParams
+from backtrader.stores.orderpipe import OrderPipeline
 from backtrader.utils.py3 import queue, with_metaclass
-from backtrader.utils import AutoDict
+from backtrader.utils import AutoDict, WakeupQueue
 
 
 # Extend the exceptions to support extra cases
@@ -63,6 +66,15 @@ class OandaNetworkError(oandapy.OandaError):
 
 
 class API(oandapy.API):
+    def __init__(self, pool=10, **kwargs):
+        super(API, self).__init__(**kwargs)
+        # Keep-alive connections shared by all the threads using the api.
+        # Requests beyond ``pool`` wait for a connection to be free
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool, pool_block=True)
+        self.client.mount('https://', adapter)
+        self.client.mount('http://', adapter)
+
     def request(self, endpoint, method='GET', params=None):
         # Overriden to make something sensible out of a
         # request.RequestException rather than simply issuing a print(str(e))
@@ -151,6 +163,7 @@ class Streamer(oandapy.Streamer):
 
     def on_success(self, data):
         if 'tick' in data:
+            data['tick']['queued'] = _time.time()  # latency stamp
             self.q.put(data['tick'])
         elif 'transaction' in data:
             self.q.put(data['transaction'])
@@ -187,6 +200,21 @@ class OandaStore(with_metaclass(MetaSingleton, object)):
 
       - ``account_tmout`` (default: ``10.0``): refresh period for account
         value/cash refresh
+
+      - ``order_workers`` (default: ``4``): maximum number of order creation
+        requests in flight at the same time
+
+      - ``rest_pool`` (default: ``10``): keep-alive connections kept open to
+        the REST server, shared by orders, account polling and historical
+        downloads. It is also the maximum of requests in flight: any other
+        waits for a free connection
+
+      - ``rest_workers`` (default: ``4``): worker threads (reused across
+        calls) downloading historical data. Long date ranges are split in
+        pages fetched concurrently
+
+      - ``candles_count`` (default: ``5000``): maximum number of candles
+        requested per page (5000 is the limit of the server)
     '''
 
     BrokerCls = None  # broker class will autoregister
@@ -197,6 +225,10 @@ class OandaStore(with_metaclass(MetaSingleton, object)):
         ('account', ''),
         ('practice', False),
         ('account_tmout', 10.0),  # account balance refresh timeout
+        ('order_workers', 4),  # concurrent order creation requests
+        ('rest_pool', 10),  # keep-alive connections to the REST server
+        ('rest_workers', 4),  # concurrent historical page downloads
+        ('candles_count', 5000),  # candles per historical page
     )
 
     _DTEPOCH = datetime(1970, 1, 1)
@@ -225,11 +257,17 @@ class OandaStore(with_metaclass(MetaSingleton, object)):
         self._orders = collections.OrderedDict()  # map order.ref to oid
         self._ordersrev = collections.OrderedDict()  # map oid to order.ref
         self._transpend = collections.defaultdict(collections.deque)
+        self._cancelpend = set()  # order.ref cancelled while being created
+        self._orderslock = threading.Lock()  # _orders vs _cancelpend
 
         self._oenv = self._ENVPRACTICE if self.p.practice else self._ENVLIVE
         self.oapi = API(environment=self._oenv,
                         access_token=self.p.token,
-                        headers={'X-Accept-Datetime-Format': 'UNIX'})
+                        headers={'X-Accept-Datetime-Format': 'UNIX'},
+                        pool=self.p.rest_pool)
+        self._restpool = None  # workers for historical downloads
+        self._restpages = set()  # page futures not yet done
+        self._restlock = threading.Lock()
 
         self._cash = 0.0
         self._value = 0.0
@@ -257,10 +295,21 @@ class OandaStore(with_metaclass(MetaSingleton, object)):
     def stop(self):
         # signal end of thread
         if self.broker is not None:
-            self.q_ordercreate.put(None)
+            self._orderpipe.stop(wait=False)
             self.q_orderclose.put(None)
             self.q_account.put(None)
 
+        if self._restpool is not None:
+            # cancel the pages not yet started (cancel_futures is py3.9+)
+            with self._restlock:
+                pages, self._restpages = self._restpages, set()
+
+            for future in pages:
+                future.cancel()
+
+            self._restpool.shutdown(wait=False)
+            self._restpool = None
+
     def put_notification(self, msg, *args, **kwargs):
         self.notifs.append((msg, args, kwargs))
 
@@ -306,6 +355,14 @@ class OandaStore(with_metaclass(MetaSingleton, object)):
     def get_granularity(self, timeframe, compression):
         return self._GRANULARITIES.get((timeframe, compression), None)
 
+    _GRANUNITS = {'S': 1, 'M': 60, 'H': 3600, 'D': 86400, 'W': 604800}
+
+    def get_granularity_seconds(self, granularity):
+        if granularity == 'M':  # months: the longest one
+            return 31 * self._GRANUNITS['D']
+
+        return int(granularity[1:] or 1) * self._GRANUNITS[granularity[0]]
+
     def get_instrument(self, dataname):
         try:
             insts = self.oapi.get_instruments(self.p.account,
@@ -351,9 +408,12 @@ class OandaStore(with_metaclass(MetaSingleton, object)):
         kwargs = locals().copy()
         kwargs.pop('self')
         kwargs['q'] = q = queue.Queue()
-        t = threading.Thread(target=self._t_candles, kwargs=kwargs)
-        t.daemon = True
-        t.start()
+        if self._restpool is None:
+            self._restpool = ThreadPoolExecutor(
+                max_workers=self.p.rest_workers,
+                thread_name_prefix='oandarest')
+
+        self._restpool.submit(self._t_candles, **kwargs)
         return q
 
     def _t_candles(self, dataname, dtbegin, dtend, timeframe, compression,
@@ -361,10 +421,81 @@ class OandaStore(with_metaclass(MetaSingleton, object)):
 
         granularity = self.get_granularity(timeframe, compression)
         if granularity is None:
-            e = OandaTimeFrameError()
+            e = OandaTimeFrameError(granularity)
             q.put(e.error_response)
             return
 
+        if dtbegin is None:  # a single request for the latest candles
+            pages = [(dtbegin, dtend)]
+        else:  # pages of at most candles_count candles up to the end
+            if dtend is None:
+                dtend = datetime.utcnow()
+
+            secs = self.get_granularity_seconds(granularity)
+            step = timedelta(seconds=secs * self.p.candles_count)
+            pages = list()
+            while True:
+                pend = min(dtbegin + step, dtend)
+                pages.append((dtbegin, pend))
+                if pend >= dtend:
+                    break
+                dtbegin = pend
+
+        # The pages are fetched concurrently and delivered in order as soon
+        # as all pages before them are done
+        lock = threading.Lock()
+        done = dict()
+        futures = list()
+        state = dict(page=0, last=None)
+
+        def page_done(idx, future):
+            with self._restlock:
+                self._restpages.discard(future)
+
+            if future.cancelled():  # store stopped or an error happened
+                return
+
+            with lock:
+                done[idx] = future
+                while state['page'] in done:
+                    fpage = done.pop(state['page'])
+                    state['page'] += 1
+                    exc = fpage.exception()
+                    if exc is not None:  # unexpected failure: stop too
+                        self.put_notification(exc)
+                        response = OandaRequestError().error_response
+                    else:
+                        response = fpage.result()
+
+                    if 'code' in response:  # error: stop delivering
+                        q.put(response)
+                        q.put(None)
+                        state['page'] = -1
+                        for f in futures:
+                            f.cancel()
+                        return
+
+                    for candle in response.get('candles', []):
+                        # pages overlap at the boundaries
+                        ctime = float(candle['time'])
+                        if state['last'] is None or ctime > state['last']:
+                            state['last'] = ctime
+                            q.put(candle)
+
+                    if state['page'] == len(pages):
+                        q.put({})  # end of transmission
+
+        for idx, (pbegin, pend) in enumerate(pages):
+            future = self._restpool.submit(
+                self._candles_page, dataname, granularity, candleFormat,
+                pbegin, pend)
+            futures.append(future)
+            with self._restlock:
+                self._restpages.add(future)
+            future.add_done_callback(functools.partial(page_done, idx))
+
+    def _candles_page(self, dataname, granularity, candleFormat,
+                      dtbegin, dtend):
         dtkwargs = {}
         if dtbegin is not None:
             dtkwargs['start'] = int((dtbegin - self._DTEPOCH).total_seconds())
@@ -373,23 +504,16 @@ class OandaStore(with_metaclass(MetaSingleton, object)):
             dtkwargs['end'] = int((dtend - self._DTEPOCH).total_seconds())
 
         try:
-            response = self.oapi.get_history(instrument=dataname,
-                                             granularity=granularity,
-                                             candleFormat=candleFormat,
-                                             **dtkwargs)
+            return self.oapi.get_history(instrument=dataname,
+                                         granularity=granularity,
+                                         candleFormat=candleFormat,
+                                         **dtkwargs)
 
         except oandapy.OandaError as e:
-            q.put(e.error_response)
-            q.put(None)
-            return
-
-        for candle in response.get('candles', []):
-            q.put(candle)
-
-        q.put({})  # end of transmission
+            return e.error_response
 
     def streaming_prices(self, dataname, tmout=None):
-        q = queue.Queue()
+        q = WakeupQueue()
         kwargs = {'q': q, 'dataname': dataname, 'tmout': tmout}
         t = threading.Thread(target=self._t_streaming_prices, kwargs=kwargs)
         t.daemon = True
@@ -426,10 +550,8 @@ class OandaStore(with_metaclass(MetaSingleton, object)):
         t.daemon = True
         t.start()
 
-        self.q_ordercreate = queue.Queue()
-        t = threading.Thread(target=self._t_order_create)
-        t.daemon = True
-        t.start()
+        self._orderpipe = OrderPipeline(workers=self.p.order_workers,
+                                        callback=self._order_done)
 
         self.q_orderclose = queue.Queue()
         t = threading.Thread(target=self._t_order_cancel)
@@ -493,58 +615,70 @@ class OandaStore(with_metaclass(MetaSingleton, object)):
 
         okwargs.update(**kwargs)  # anything from the user
 
-        self.q_ordercreate.put((order.ref, okwargs,))
+        self._orderpipe.put(order.ref, self._order_create, order.ref, okwargs)
         return order
 
     _OIDSINGLE = ['orderOpened', 'tradeOpened', 'tradeReduced']
     _OIDMULTIPLE = ['tradesClosed']
 
-    def _t_order_create(self):
-        while True:
-            msg = self.q_ordercreate.get()
-            if msg is None:
-                break
+    def _order_create(self, oref, okwargs):
+        stamps = self.broker.orders[oref].stamps
+        stamps['sent'] = _time.time()
+        try:
+            o = self.oapi.create_order(self.p.account, **okwargs)
+        except Exception as e:
+            self.put_notification(e)
+            self.broker._reject(oref)
+            return
 
-            oref, okwargs = msg
-            try:
-                o = self.oapi.create_order(self.p.account, **okwargs)
-            except Exception as e:
-                self.put_notification(e)
-                self.broker._reject(oref)
-                return
+        stamps['ack'] = _time.time()
 
-            # Ids are delivered in different fields and all must be fetched to
-            # match them (as executions) to the order generated here
-            oids = list()
-            for oidfield in self._OIDSINGLE:
-                if oidfield in o and 'id' in o[oidfield]:
-                    oids.append(o[oidfield]['id'])
+        # Ids are delivered in different fields and all must be fetched to
+        # match them (as executions) to the order generated here
+        oids = list()
+        for oidfield in self._OIDSINGLE:
+            if oidfield in o and 'id' in o[oidfield]:
+                oids.append(o[oidfield]['id'])
 
-            for oidfield in self._OIDMULTIPLE:
-                if oidfield in o:
-                    for suboidfield in o[oidfield]:
-                        oids.append(suboidfield['id'])
+        for oidfield in self._OIDMULTIPLE:
+            if oidfield in o:
+                for suboidfield in o[oidfield]:
+                    oids.append(suboidfield['id'])
 
-            if not oids:
-                self.broker._reject(oref)
-                return
+        if not oids:
+            self.broker._reject(oref)
+            return
 
+        with self._orderslock:
             self._orders[oref] = oids[0]
-            self.broker._submit(oref)
-            if okwargs['type'] == 'market':
-                self.broker._accept(oref)  # taken immediately
-
-            for oid in oids:
-                self._ordersrev[oid] = oref  # maps ids to backtrader order
-
-                # An transaction may have happened and was stored
-                tpending = self._transpend[oid]
-                tpending.append(None)  # eom marker
-                while True:
-                    trans = tpending.popleft()
-                    if trans is None:
-                        break
-                    self._process_transaction(oid, trans)
+            cancel = oref in self._cancelpend
+            self._cancelpend.discard(oref)
+
+        self.broker._submit(oref)
+        if okwargs['type'] == 'market':
+            self.broker._accept(oref)  # taken immediately
+
+        for oid in oids:
+            self._ordersrev[oid] = oref  # maps ids to backtrader order
+
+            # An transaction may have happened and was stored
+            tpending = self._transpend[oid]
+            tpending.append(None)  # eom marker
+            while True:
+                trans = tpending.popleft()
+                if trans is None:
+                    break
+                self._process_transaction(oid, trans)
+
+        if cancel:  # cancelled while the request was in flight
+            self.q_orderclose.put(oref)
+
+    def _order_done(self, oref, ret, exc):
+        with self._orderslock:
+            self._cancelpend.discard(oref)  # rejected: nothing to cancel
+
+        if exc is not None:  # unexpected failure processing the answer
+            self.put_notification(exc)
 
     def order_cancel(self, order):
         self.q_orderclose.put(order.ref)
@@ -556,9 +690,12 @@ class OandaStore(with_metaclass(MetaSingleton, object)):
             if oref is None:
                 break
 
-            oid = self._orders.get(oref, None)
-            if oid is None:
-                continue  # the order is no longer there
+            with self._orderslock:
+                oid = self._orders.get(oref, None)
+                if oid is None:
+                    if self._orderpipe.inflight(oref):
+                        self._cancelpend.add(oref)  # cancel once created
+                    continue  # the order is not (or no longer) there
             try:
                 o = self.oapi.close_order(self.p.account, oid)
             except Exception as e:
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import asyncio
+import collections
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import threading
+
+from backtrader.utils import aioloop, aiospawn
+
+__all__ = ['OrderPipeline', 'AsyncOrderPipeline']
+
+
+class OrderPipeline(object):
+    '''Sends order requests (create, cancel ...) to a server from a pool of
+    worker threads, so that the caller (the strategy placing orders from
+    ``next``) does not wait for the round trips
+
+    Params:
+
+      - ``workers``: maximum number of requests in flight at the same time.
+        Any other request waits in the queue until a worker is free
+
+      - ``callback``: ``callback(key, result, exc)`` invoked from the worker
+        thread when a request is done (``exc`` is the exception raised by
+        the request or ``None``). If not given, the outcomes are kept and
+        can be retrieved from the thread owning the orders with ``get``
+
+    Requests are identified by a ``key`` (like the ``ref`` of the order)
+    '''
+    def __init__(self, workers=4, callback=None):
+        self._pool = ThreadPoolExecutor(max_workers=workers,
+                                        thread_name_prefix='orderpipe')
+        self._callback = callback
+        self._done = collections.deque()
+        self._inflight = set()  # keys of requests not yet done
+        self._lock = threading.Lock()
+
+    def put(self, key, func, *args, **kwargs):
+        '''Queues the request ``func(*args, **kwargs)`` and returns at once'''
+        with self._lock:
+            self._inflight.add(key)
+
+        future = self._pool.submit(func, *args, **kwargs)
+        future.add_done_callback(functools.partial(self._finish, key))
+
+    def _finish(self, key, future):
+        exc = future.exception()
+        ret = future.result() if exc is None else None
+        if self._callback is not None:
+            self._callback(key, ret, exc)
+        else:
+            self._done.append((key, ret, exc))
+
+        with self._lock:
+            self._inflight.discard(key)
+
+    def get(self):
+        '''Returns the outcome ``(key, result, exc)`` of the next request
+        which is done or ``None`` if there is none'''
+        try:
+            return self._done.popleft()
+        except IndexError:
+            return None
+
+    def inflight(self, key=None):
+        '''Returns whether the request for ``key`` is not yet done or (with no
+        key) the number of requests not yet done'''
+        with self._lock:
+            if key is None:
+                return len(self._inflight)
+
+            return key in self._inflight
+
+    def stop(self, wait=True):
+        '''Waits (if ``wait``) for the queued requests and stops the workers'''
+        self._pool.shutdown(wait=wait)
+
+
+class AsyncOrderPipeline(OrderPipeline):
+    '''``OrderPipeline`` sending the requests from an asyncio event loop
+
+    The requests are coroutine functions, run as tasks of the loop with no
+    thread per request. Regular (blocking) functions are run in the executor
+    of the loop, to adapt synchronous clients
+
+    Params:
+
+      - ``workers``: maximum number of requests in flight at the same time
+
+      - ``callback``: as in ``OrderPipeline``, invoked from the loop
+
+      - ``loop``: the event loop. If not given, the running loop or else a
+        background loop (see ``aioloop``)
+    '''
+    def __init__(self, workers=4, callback=None, loop=None):
+        self._loop = loop or aioloop()
+        self._workers = workers
+        self._sem = None  # created in the loop
+        self._tasks = set()
+        self._callback = callback
+        self._done = collections.deque()
+        self._inflight = set()
+        self._lock = threading.Condition()  # notified when a request ends
+
+    def put(self, key, func, *args, **kwargs):
+        '''Queues the request ``func(*args, **kwargs)`` and returns at once'''
+        with self._lock:
+            self._inflight.add(key)
+
+        task = aiospawn(self._loop, self._arequest(key, func, args, kwargs))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _arequest(self, key, func, args, kwargs):
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self._workers)
+
+        ret = exc = None
+        try:
+            async with self._sem:
+                try:
+                    if asyncio.iscoroutinefunction(func):
+                        ret = await func(*args, **kwargs)
+                    else:
+                        ret = await self._loop.run_in_executor(
+                            None, functools.partial(func, *args, **kwargs))
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    exc = e
+
+            if self._callback is not None:
+                self._callback(key, ret, exc)
+            else:
+                self._done.append((key, ret, exc))
+        finally:
+            with self._lock:
+                self._inflight.discard(key)
+                self._lock.notify_all()
+
+    def _inloop(self):
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def _cancelall(self):
+        for task in list(self._tasks):
+            task.cancel()
+
+    def stop(self, wait=True):
+        '''Waits (if ``wait``) for the queued requests or else cancels them.
+        The loop itself cannot wait: if called from it, the requests are
+        left to finish in the loop'''
+        if not wait:
+            self._loop.call_soon_threadsafe(self._cancelall)
+        elif self._loop.is_running() and not self._inloop():
+            with self._lock:
+                self._lock.wait_for(lambda: not self._inflight)
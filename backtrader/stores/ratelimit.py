@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import random
+import threading
+import time
+
+__all__ = ['RateLimiter']
+
+
+class _Bucket(object):
+    '''Token bucket with ``capacity`` tokens refilled over ``interval``
+    seconds'''
+    def __init__(self, capacity, interval, now):
+        self.capacity = capacity
+        self.rate = capacity / float(interval)
+        self.tokens = float(capacity)
+        self.stamp = now
+
+    def refill(self, now):
+        elapsed = now - self.stamp
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.stamp = now
+
+    def wait(self, amount):
+        '''Seconds to wait until ``amount`` tokens are available'''
+        return max(0.0, min(amount, self.capacity) - self.tokens) / self.rate
+
+
+class RateLimiter(object):
+    '''Request scheduler which keeps several budgets (request weight, order
+    counts ...) as token buckets and only makes the caller wait when one of
+    the budgets is exhausted. It is thread safe and meant to be shared by all
+    the objects talking to the same server (store, datas, broker)
+
+      - ``limits``: dict of ``name -> (amount, seconds)``, like
+        ``{'weight-1m': (6000, 60), 'orders-10s': (100, 10)}``
+
+      - ``headers``: dict of ``header prefix -> bucket prefix``. Response
+        headers starting with the prefix report the amount already used of
+        a budget (the rest of the header name is the interval, which is
+        appended to the bucket prefix to get the name of the bucket). For
+        example ``x-mbx-used-weight-1m: 120`` updates ``weight-1m``
+
+      - ``backoff``: base of the exponential backoff (seconds) when the server
+        signals that the limits have been exceeded without giving a
+        ``Retry-After`` value
+
+      - ``jitter``: fraction of the backoff added randomly, to avoid that all
+        clients come back at once
+
+      - ``clock`` and ``sleep``: time functions (can be replaced for testing)
+    '''
+    def __init__(self, limits, headers=None, backoff=1.0, jitter=0.1,
+                 clock=time.monotonic, sleep=time.sleep):
+        self._clock = clock
+        self._sleep = sleep
+        self._backoff = backoff
+        self._jitter = jitter
+        self._headers = dict((k.lower(), v) for k, v in (headers or {}).items())
+
+        now = clock()
+        self._buckets = dict((name, _Bucket(amount, seconds, now))
+                             for name, (amount, seconds) in limits.items())
+        self._until = now  # no request until this time (after a backoff)
+        self._lock = threading.Lock()
+
+    def acquire(self, **costs):
+        '''Blocks until all budgets given in ``costs`` (``name=amount``) are
+        available and takes them. Budgets not managed are ignored. Returns
+        the time spent waiting'''
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                wait = self._until - now
+                if wait <= 0:
+                    buckets = [(self._buckets[name], amount)
+                               for name, amount in costs.items()
+                               if amount and name in self._buckets]
+                    for bucket, amount in buckets:
+                        bucket.refill(now)
+
+                    wait = max([b.wait(a) for b, a in buckets] or [0.0])
+                    if wait <= 0:
+                        for bucket, amount in buckets:
+                            bucket.tokens -= amount
+                        return waited
+
+            self._sleep(wait)
+            waited += wait
+
+    def update(self, headers):
+        '''Synchronizes the budgets with the usage reported by the server in
+        the response ``headers``'''
+        if not headers or not self._headers:
+            return
+
+        with self._lock:
+            now = self._clock()
+            for key, value in headers.items():
+                key = key.lower()
+                for prefix, name in self._headers.items():
+                    if key.startswith(prefix):
+                        bucket = self._buckets.get(name + key[len(prefix):])
+                        if bucket is not None:
+                            try:
+                                used = float(value)
+                            except ValueError:
+                                break
+
+                            bucket.refill(now)
+                            bucket.tokens = min(bucket.tokens,
+                                                bucket.capacity - used)
+                        break
+
+    def backoff(self, attempt=1, retry_after=None):
+        '''Stops all requests after the server has rejected one for exceeding
+        the limits. ``retry_after`` (seconds) is the value given by the server
+        if any. Else an exponential backoff based on ``attempt`` is used.
+        Returns the backoff time'''
+        if retry_after is None:
+            wait = self._backoff * 2 ** (attempt - 1)
+        else:
+            wait = float(retry_after)
+
+        wait += random.uniform(0, self._jitter * wait)
+        with self._lock:
+            self._until = max(self._until, self._clock() + wait)
+
+        return wait
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import asyncio
+import itertools
+import json
+import threading
+
+from backtrader.utils import aioloop
+
+__all__ = ['StreamMultiplexer', 'CombinedStreams']
+
+
+class StreamMultiplexer(object):
+    '''Shares a few combined (multiplexed) stream sockets among many
+    subscribers
+
+    Streams are identified by name (like ``btcusdt@kline_1m``) and the
+    messages of a combined stream come as ``{'stream': name, 'data': msg}``.
+    Each ``data`` is routed to the callbacks subscribed to the stream.
+
+    Params:
+
+      - ``start``: ``start(callback, streams)`` opens a socket for the list of
+        stream names and returns a key for it (like
+        ``ThreadedWebsocketManager.start_multiplex_socket``)
+
+      - ``stop``: ``stop(key)`` closes the socket
+
+      - ``maxstreams``: streams per socket. A new subscription is added to
+        the last socket until it is full and then a new socket is opened
+
+      - ``subscribe``: ``subscribe(key, streams)`` subscribes more streams
+        over the open socket (like ``CombinedStreams.subscribe``). If not
+        given, the socket is opened again with the new list of streams
+
+    The sockets are expected to reconnect on their own. If a socket gives up
+    (it delivers a message with ``'e': 'error'``) it is opened again with the
+    same streams
+    '''
+    def __init__(self, start, stop, maxstreams=200, subscribe=None):
+        self._start = start
+        self._stop = stop
+        self._subscribe = subscribe
+        self._maxstreams = maxstreams
+        self._routes = dict()  # stream -> list of callbacks
+        self._sockets = list()  # [key, streams, generation] per socket
+        self._lock = threading.RLock()
+
+    def subscribe(self, stream, callback):
+        with self._lock:
+            callbacks = self._routes.setdefault(stream, list())
+            callbacks.append(callback)
+            if len(callbacks) > 1:
+                return  # already in a socket
+
+            if self._sockets and len(self._sockets[-1][1]) < self._maxstreams:
+                idx = len(self._sockets) - 1
+                self._sockets[idx][1].append(stream)
+                if self._subscribe is not None:
+                    self._subscribe(self._sockets[idx][0], [stream])
+                else:
+                    self._reopen(idx)
+            else:
+                self._sockets.append([None, [stream], 0])
+                self._open(len(self._sockets) - 1)
+
+    def _open(self, idx):
+        sock = self._sockets[idx]
+        sock[2] += 1
+        gen = sock[2]
+
+        def callback(msg):
+            self._dispatch(idx, gen, msg)
+
+        sock[0] = self._start(callback, list(sock[1]))
+
+    def _reopen(self, idx):
+        key = self._sockets[idx][0]
+        if key is not None:
+            self._stop(key)
+        self._open(idx)
+
+    def _dispatch(self, idx, gen, msg):
+        if msg.get('e') == 'error':  # the socket gave up reconnecting
+            with self._lock:
+                # unless it is an already replaced socket
+                if idx < len(self._sockets) and self._sockets[idx][2] == gen:
+                    self._reopen(idx)
+            return
+
+        data = msg.get('data')
+        for callback in self._routes.get(msg.get('stream'), ()):
+            callback(data)
+
+    def stop(self):
+        with self._lock:
+            for key, streams, gen in self._sockets:
+                if key is not None:
+                    self._stop(key)
+
+            self._sockets = list()
+            self._routes = dict()
+
+
+class _Socket(object):
+    # state of a socket of CombinedStreams (only touched from the loop)
+    def __init__(self, streams):
+        self.streams = streams  # all the streams of the socket
+        self.queued = list()  # streams to request over the connection
+        self.ws = None  # the connection when open
+        self.task = None  # running the socket
+        self.sender = None  # sending the queued subscriptions
+        self.closed = False
+
+
+class CombinedStreams(object):
+    '''Combined stream sockets (``url/stream?streams=a/b/c``) of a websocket
+    server like the one of Binance, providing the ``start``, ``stop`` and
+    ``subscribe`` calls of the ``StreamMultiplexer``
+
+    Streams added to an open socket are asked for with a ``SUBSCRIBE``
+    request over the connection. A reconnection asks in the url for all the
+    streams of the socket. The messages (``{'stream': name, 'data': msg}``)
+    are delivered to the callback of the socket
+
+    The sockets are coroutines running in the event loop of ``aioloop`` (the
+    one of ``Cerebro.run_async`` or else a background one) and the callbacks
+    are invoked from it. It needs the ``websockets`` package
+
+    Params:
+
+      - ``url``: of the server, like ``wss://stream.binance.com:9443``
+
+      - ``retries``: reconnections tried in a row (``retrywait`` seconds
+        apart) before giving up. The callback then gets a message with
+        ``'e': 'error'``
+
+      - ``msgwait``: seconds between requests over a connection (the server
+        limits the incoming messages). Subscriptions arriving in between go
+        together in the next request
+    '''
+    def __init__(self, url, retries=5, retrywait=1.0, msgwait=0.25,
+                 loop=None):
+        self.url = url.rstrip('/')
+        self.retries = retries
+        self.retrywait = retrywait
+        self.msgwait = msgwait
+        self._loop = loop or aioloop()
+        self._sockets = dict()  # key -> _Socket
+        self._keys = itertools.count(1)
+        self._ids = itertools.count(1)
+
+    def start(self, callback, streams):
+        '''Opens a socket for the list of stream names and returns its key'''
+        key = next(self._keys)
+        self._loop.call_soon_threadsafe(self._open, key, callback,
+                                        list(streams))
+        return key
+
+    def stop(self, key):
+        '''Closes the socket'''
+        self._loop.call_soon_threadsafe(self._close, key)
+
+    def subscribe(self, key, streams):
+        '''Adds the streams to the open socket'''
+        self._loop.call_soon_threadsafe(self._add, key, list(streams))
+
+    def _open(self, key, callback, streams):
+        sock = self._sockets[key] = _Socket(streams)
+        sock.task = self._loop.create_task(self._run(sock, callback))
+
+    def _close(self, key):
+        sock = self._sockets.pop(key, None)
+        if sock is None:
+            return
+
+        sock.closed = True
+        if sock.ws is not None:
+            self._loop.create_task(sock.ws.close())  # ends _run
+        else:
+            sock.task.cancel()
+
+    def _add(self, key, streams):
+        sock = self._sockets.get(key)
+        if sock is None:
+            return
+
+        sock.streams.extend(streams)
+        if sock.ws is not None:  # else asked for when connecting
+            self._queue(sock, streams)
+
+    def _queue(self, sock, streams):
+        sock.queued.extend(streams)
+        if sock.sender is None:
+            sock.sender = self._loop.create_task(self._send(sock))
+
+    async def _send(self, sock):
+        try:
+            while sock.queued and sock.ws is not None:
+                streams, sock.queued = sock.queued, list()
+                msg = dict(method='SUBSCRIBE', params=streams,
+                           id=next(self._ids))
+                await sock.ws.send(json.dumps(msg))
+                await asyncio.sleep(self.msgwait)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass  # connection lost: the reconnection asks for all streams
+        finally:
+            sock.sender = None
+
+    async def _run(self, sock, callback):
+        import websockets
+
+        retries = 0
+        try:
+            while True:
+                asked = len(sock.streams)
+                url = '%s/stream?streams=%s' % (self.url,
+                                                '/'.join(sock.streams))
+                try:
+                    async with websockets.connect(url) as ws:
+                        retries = 0
+                        sock.ws = ws
+                        if len(sock.streams) > asked:  # added meanwhile
+                            self._queue(sock, sock.streams[asked:])
+
+                        async for msg in ws:
+                            msg = json.loads(msg)
+                            if 'stream' in msg:  # not a request reply
+                                callback(msg)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    pass
+
+                sock.ws = None
+                sock.queued = list()
+                if sock.closed:
+                    return
+
+                retries += 1
+                if retries > self.retries:
+                    callback({'e': 'error', 'm': 'max reconnections'})
+                    return
+
+                await asyncio.sleep(self.retrywait)
+        finally:
+            sock.ws = None
+            if sock.sender is not None:
+                sock.sender.cancel()
@@ -33,9 +33,9 @@ import ctypes
 from backtrader import TimeFrame, Position
 from backtrader.feed import DataBase
 from backtrader.metabase import MetaParams
-from backtrader.utils.py3 import (MAXINT, range, queue, string_types,
+from backtrader.utils.py3 import (MAXINT, range, string_types,
                                   with_metaclass)
-from backtrader.utils import AutoDict
+from backtrader.utils import AutoDict, WakeupQueue
 
 
 class _SymInfo(object):
@@ -436,7 +436,7 @@ class VCStore(with_metaclass(MetaSingleton, object)):
         return vctimeframe == self.vcdsmod.CT_Ticks
 
     def _getq(self, data):
-        q = queue.Queue()
+        q = WakeupQueue()
         self._dqs.append(q)
         self._qdatas[q] = data
         return q
@@ -24,6 +24,7 @@ from __future__ import (absolute_import, division, print_function,
 import collections
 import copy
 import datetime
+from decimal import Decimal
 import inspect
 import itertools
 import operator
@@ -1375,6 +1376,58 @@ class Strategy(with_metaclass(MetaStrategy, StrategyBase)):
 
         return self.order_target_value(data=data, target=target, **kwargs)
 
+    def rebalance(self, targets, **kwargs):
+        '''
+        Place the orders to rebalance several positions at once to have final
+        values of ``target`` percentages of the current portfolio ``value``
+
+          - ``targets``: a ``dict`` (or iterable of pairs) with datas (or
+            their names) as keys and the ``target`` percentages as values,
+            expressed in decimal: ``0.05`` -> ``5%``
+
+        The portfolio is valued once and the sizes are calculated as in
+        ``order_target_percent`` for all targets. The orders are handed over
+        to the broker in a single batch (see ``submit_batch`` in the broker),
+        in the iteration order of ``targets`` (put the reductions first to
+        free cash for the increases)
+
+        ``kwargs`` are passed to the created orders
+
+        It returns the list of generated orders. Positions already at the
+        target generate no order
+        '''
+        broker = self.broker
+        value = broker.getvalue()
+
+        if hasattr(targets, 'items'):
+            targets = targets.items()
+
+        batch = list()
+        for data, target in targets:
+            if isinstance(data, string_types):
+                data = self.getdatabyname(data)
+
+            target = Decimal(str(target)) * value
+            possize = broker.getposition(data).size
+            if not target and possize:  # closing a position
+                batch.append((data, -possize, kwargs))
+                continue
+
+            dvalue = broker.getvalue(datas=[data])
+            comminfo = broker.getcommissioninfo(data)
+            price = data.close[0]
+
+            if target > dvalue:
+                size = comminfo.getsize(price, target - dvalue)
+            elif target < dvalue:
+                size = -comminfo.getsize(price, dvalue - target)
+            else:
+                continue  # no execution
+
+            batch.append((data, size, dict(kwargs, price=price)))
+
+        return broker.submit_batch(self, batch)
+
     def getposition(self, data=None, broker=None):
         '''
         Returns the current position for a given data in a given broker.
@@ -24,7 +24,7 @@ from __future__ import (absolute_import, division, print_function,
 
 import bisect
 import collections
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, time, timedelta
 from itertools import islice
 
 from .feed import AbstractDataBase
@@ -80,6 +80,7 @@ class Timer(with_metaclass(MetaParams, object)):
 
         self._nexteos = datetime.min
         self._curdate = date.min
+        self._dtnext = float('-inf')  # earliest time for a full check
 
         self._curmonth = -1  # non-existent month
         self._monthmask = collections.deque()
@@ -148,8 +149,28 @@ class Timer(with_metaclass(MetaParams, object)):
         return daycarry or curday
 
     def check(self, dt):
+        if dt < self._dtnext:
+            return False  # nothing can happen before the precomputed time
+
         d = num2date(dt)
         ddate = d.date()
+        ret = self._check(dt, d, ddate)
+        self._dtnext = self._nextcheck(ddate)
+        return ret
+
+    def _nextcheck(self, ddate):
+        '''Returns the earliest timestamp at which a check can make a change:
+        the next day, the end of session or the next "when"'''
+        dtnext = date2num(datetime.combine(ddate + timedelta(days=1),
+                                           time.min))
+        if self._lastcall != ddate:  # else awaiting date change
+            dtnext = min(dtnext, date2num(self._nexteos))
+            if self._dtwhen is not None:
+                dtnext = min(dtnext, self._dtwhen)
+
+        return dtnext
+
+    def _check(self, dt, d, ddate):
         if self._lastcall == ddate:  # not repeating, awaiting date change
             return False
 
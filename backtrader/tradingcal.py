@@ -145,6 +145,8 @@ class TradingCalendar(TradingCalendarBase):
 
     def __init__(self):
         self._earlydays = [x[0] for x in self.p.earlydays]  # speed up searches
+        self._nextdays = dict()  # day -> (nextday, isocal)
+        self._sessions = dict()  # (date, tz) -> (opening, closing) in utc
 
     def _nextday(self, day):
         '''
@@ -153,13 +155,20 @@ class TradingCalendar(TradingCalendarBase):
 
         The return value is a tuple with 2 components: (nextday, (y, w, d))
         '''
+        try:
+            return self._nextdays[day]
+        except KeyError:
+            pass
+
+        nday = day
         while True:
-            day += ONEDAY
-            isocal = day.isocalendar()
-            if isocal[2] in self.p.offdays or day in self.p.holidays:
+            nday += ONEDAY
+            isocal = nday.isocalendar()
+            if isocal[2] in self.p.offdays or nday in self.p.holidays:
                 continue
 
-            return day, isocal
+            self._nextdays[day] = ret = (nday, isocal)
+            return ret
 
     def schedule(self, day, tz=None):
         '''
@@ -170,29 +179,37 @@ class TradingCalendar(TradingCalendarBase):
         The return value is a tuple with 2 components: opentime, closetime
         '''
         while True:
-            dt = day.date()
-            try:
-                i = self._earlydays.index(dt)
-                o, c = self.p.earlydays[i][1:]
-            except ValueError:  # not found
-                o, c = self.p.open, self.p.close
-
-            closing = datetime.combine(dt, c)
-            if tz is not None:
-                closing = tz.localize(closing).astimezone(UTC)
-                closing = closing.replace(tzinfo=None)
-
-            if day > closing:  # current time over eos
-                day += ONEDAY
+            opening, closing = self._session(day.date(), tz)
+            if day > closing:  # current time over eos: next trading day
+                day = datetime.combine(self._nextday(day.date())[0], time.min)
                 continue
 
-            opening = datetime.combine(dt, o)
-            if tz is not None:
-                opening = tz.localize(opening).astimezone(UTC)
-                opening = opening.replace(tzinfo=None)
-
             return opening, closing
 
+    def _session(self, dt, tz):
+        '''Returns the opening and closing times (utc) of the date ``dt``,
+        which are calculated only once per date'''
+        try:
+            return self._sessions[dt, tz]
+        except KeyError:
+            pass
+
+        try:
+            i = self._earlydays.index(dt)
+            o, c = self.p.earlydays[i][1:]
+        except ValueError:  # not found
+            o, c = self.p.open, self.p.close
+
+        opening, closing = datetime.combine(dt, o), datetime.combine(dt, c)
+        if tz is not None:
+            opening = tz.localize(opening).astimezone(UTC)
+            opening = opening.replace(tzinfo=None)
+            closing = tz.localize(closing).astimezone(UTC)
+            closing = closing.replace(tzinfo=None)
+
+        self._sessions[dt, tz] = ret = (opening, closing)
+        return ret
+
 
 class PandasMarketCalendar(TradingCalendarBase):
     '''
@@ -235,8 +252,9 @@ class PandasMarketCalendar(TradingCalendarBase):
 
         import pandas as pd  # guaranteed because of pandas_market_calendars
         self.dcache = pd.DatetimeIndex([0.0])
-        self.idcache = pd.DataFrame(index=pd.DatetimeIndex([0.0]))
         self.csize = timedelta(days=self.p.cachesize)
+        self._nextdays = dict()  # day -> (nextday, isocal)
+        self._sessions = dict()  # date -> (opening, closing) in utc
 
     def _nextday(self, day):
         '''
@@ -245,16 +263,23 @@ class PandasMarketCalendar(TradingCalendarBase):
 
         The return value is a tuple with 2 components: (nextday, (y, w, d))
         '''
-        day += ONEDAY
+        try:
+            return self._nextdays[day]
+        except KeyError:
+            pass
+
+        nday = day + ONEDAY
         while True:
-            i = self.dcache.searchsorted(day)
+            i = self.dcache.searchsorted(nday)
             if i == len(self.dcache):
                 # keep a cache of 1 year to speed up searching
-                self.dcache = self._calendar.valid_days(day, day + self.csize)
+                self.dcache = self._calendar.valid_days(nday,
+                                                        nday + self.csize)
                 continue
 
             d = self.dcache[i].to_pydatetime()
-            return d, d.isocalendar()
+            self._nextdays[day] = ret = (d, d.isocalendar())
+            return ret
 
     def schedule(self, day, tz=None):
         '''
@@ -265,16 +290,31 @@ class PandasMarketCalendar(TradingCalendarBase):
         The return value is a tuple with 2 components: opentime, closetime
         '''
         while True:
-            i = self.idcache.index.searchsorted(day.date())
-            if i == len(self.idcache):
-                # keep a cache of 1 year to speed up searching
-                self.idcache = self._calendar.schedule(day, day + self.csize)
+            try:
+                opening, closing = self._sessions[day.date()]
+            except KeyError:
+                self._loadsessions(day)
                 continue
 
-            st = (x.tz_localize(None) for x in self.idcache.iloc[i, 0:2])
-            opening, closing = st  # Get utc naive times
             if day > closing:  # passed time is over the sessionend
-                day += ONEDAY  # wrap over to next day
+                # wrap over to the start of next day (mapped to its session)
+                day = datetime.combine(day.date() + ONEDAY, time.min)
                 continue
 
-            return opening.to_pydatetime(), closing.to_pydatetime()
+            return opening, closing
+
+    def _loadsessions(self, day):
+        '''Loads in bulk the sessions for the next ``cachesize`` days,
+        mapping each date to the 1st session on or after it'''
+        sched = self._calendar.schedule(day, day + self.csize)
+
+        dt = day.date()
+        for sday, o, c in zip(sched.index, sched.iloc[:, 0], sched.iloc[:, 1]):
+            # Get utc naive times
+            session = (o.tz_localize(None).to_pydatetime(),
+                       c.tz_localize(None).to_pydatetime())
+
+            sday = sday.date()
+            while dt <= sday:
+                self._sessions[dt] = session
+                dt += ONEDAY
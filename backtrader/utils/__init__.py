@@ -27,3 +27,5 @@ import sys
 from .date import *
 from .ordereddefaultdict import *
 from .autodict import *
+from .wakeup import *
+from .aio import *
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import asyncio
+import threading
+
+
+__all__ = ['aioloop', 'aiospawn']
+
+_bgloop = None
+_bglock = threading.Lock()
+
+
+def aioloop():
+    '''Returns the event loop in which the coroutines of async stores, feeds
+    and brokers run
+
+    It is the running loop if called from inside one (``Cerebro.run_async``)
+    or else (``Cerebro.run``) a loop running in a background daemon thread,
+    shared by all of them
+    '''
+    global _bgloop
+
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+
+    with _bglock:
+        if _bgloop is None:
+            _bgloop = asyncio.new_event_loop()
+            t = threading.Thread(target=_bgloop.run_forever, name='bt-aioloop')
+            t.daemon = True
+            t.start()
+
+    return _bgloop
+
+
+def aiospawn(loop, coro):
+    '''Schedules ``coro`` in ``loop`` from any thread and returns the task
+    (or a future if called from another thread), which can be cancelled'''
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+
+    if running is loop:
+        return loop.create_task(coro)
+
+    return asyncio.run_coroutine_threadsafe(coro, loop)
@@ -145,6 +145,9 @@ MINUTES_PER_DAY = MINUTES_PER_HOUR * HOURS_PER_DAY
 SECONDS_PER_DAY = SECONDS_PER_MINUTE * MINUTES_PER_DAY
 MUSECONDS_PER_DAY = MUSECONDS_PER_SECOND * SECONDS_PER_DAY
 
+# Day number of the Unix epoch (1970-01-01)
+EPOCH_ORDINAL = datetime.datetime(1970, 1, 1).toordinal()
+
 
 def num2date(x, tz=None, naive=True):
     # Same as matplotlib except if tz is None a naive datetime object
@@ -227,6 +230,165 @@ def date2num(dt, tz=None):
     return base
 
 
+def _utchour(tz, dt):
+    '''Returns how the UTC hour starting at the naive *dt* is taken to *tz* as
+    (offset, tzinfo, fold) if it is the same for the whole hour, else ``None``
+    (timezone changes do not always happen at a full hour)'''
+    convs = list()
+    for udt in (dt, dt + datetime.timedelta(hours=1, microseconds=-1)):
+        ldt = udt.replace(tzinfo=UTC).astimezone(tz)
+        convs.append((ldt.replace(tzinfo=None) - udt, ldt.tzinfo,
+                      getattr(ldt, 'fold', 0), ldt.utcoffset()))
+
+    return convs[0][:3] if convs[0] == convs[1] else None
+
+
+def num2dates(xs, tz=None, naive=True):
+    '''
+    Array version of :func:`num2date`. *xs* is an iterable of float day
+    numbers and a list of :class:`datetime` instances is returned.
+
+    The values are the same as the ones of :func:`num2date`, but each day is
+    taken from its ordinal only once and the conversion to *tz* is done once
+    per UTC hour and then applied as an offset (unless the timezone changes
+    within the hour)
+    '''
+    days = dict()  # ordinal -> (year, month, day)
+    hours = dict()  # (ordinal, utc hour) -> _utchour
+    ret = list()
+    for x in xs:
+        ix = int(x)
+        try:
+            ymd = days[ix]
+        except KeyError:
+            d = datetime.date.fromordinal(ix)
+            ymd = days[ix] = (d.year, d.month, d.day)
+
+        # same calculation as in num2date
+        remainder = float(x) - ix
+        hour, remainder = divmod(HOURS_PER_DAY * remainder, 1)
+        minute, remainder = divmod(MINUTES_PER_HOUR * remainder, 1)
+        second, remainder = divmod(SECONDS_PER_MINUTE * remainder, 1)
+        microsecond = int(MUSECONDS_PER_SECOND * remainder)
+        if microsecond < 10:
+            microsecond = 0  # compensate for rounding errors
+
+        hour = int(hour)
+        dt = datetime.datetime(ymd[0], ymd[1], ymd[2], hour, int(minute),
+                               int(second), microsecond)
+
+        if tz is not None:
+            key = (ix, hour)
+            try:
+                conv = hours[key]
+            except KeyError:
+                conv = hours[key] = _utchour(
+                    tz, dt.replace(minute=0, second=0, microsecond=0))
+
+            if conv is None:  # the timezone changes within the hour
+                dt = dt.replace(tzinfo=UTC).astimezone(tz)
+                if naive:
+                    dt = dt.replace(tzinfo=None)
+            else:
+                dt += conv[0]
+                if not naive:
+                    dt = dt.replace(tzinfo=conv[1])
+                    if conv[2]:
+                        dt = dt.replace(fold=conv[2])
+
+        if microsecond > 999990:  # compensate for rounding errors
+            dt += datetime.timedelta(microseconds=1e6 - microsecond)
+
+        ret.append(dt)
+
+    return ret
+
+
+def _localhour(tz, dt):
+    '''Returns the UTC offset of the local (naive) hour starting at *dt* in
+    *tz* if the same for the whole hour, else ``None``'''
+    d0 = tz.localize(dt)
+    d1 = tz.localize(dt + datetime.timedelta(hours=1, microseconds=-1))
+    delta = d0.tzinfo.utcoffset(d0)
+    return delta if delta == d1.tzinfo.utcoffset(d1) else None
+
+
+def dates2num(dts, tz=None):
+    '''
+    Array version of :func:`date2num`. *dts* is an iterable of
+    :class:`datetime` instances and a list of floats is returned.
+
+    If *tz* is given the naive datetimes are localized with it. The UTC
+    offset is looked up once per local hour and reused for the datetimes in
+    the hour, unless it changes within the hour (the datetime is then
+    localized on its own)
+    '''
+    offsets = dict()  # local hour -> _localhour
+    ret = list()
+    for dt in dts:
+        if tz is not None and getattr(dt, 'tzinfo', None) is None:
+            hour = dt.replace(minute=0, second=0, microsecond=0)
+            try:
+                delta = offsets[hour]
+            except KeyError:
+                delta = offsets[hour] = _localhour(tz, hour)
+
+            if delta is None:  # changes within the hour
+                ldt = tz.localize(dt)
+                delta = ldt.tzinfo.utcoffset(ldt)
+
+            if delta is not None:
+                dt -= delta
+
+        ret.append(date2num(dt))
+
+    return ret
+
+
+class DateCache(object):
+    '''
+    Bounded memo for conversions of float day numbers to datetime (and back)
+
+    It is meant to be held per data feed/line, so that repeated conversions
+    of the same bar by strategies, analyzers and observers are done only
+    once. The memo is simply dropped when *maxsize* entries are reached
+    '''
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._n2d = dict()
+        self._d2n = dict()
+
+    def clear(self):
+        self._n2d.clear()
+        self._d2n.clear()
+
+    def num2date(self, x, tz=None, naive=True):
+        key = (x, tz, naive)
+        try:
+            return self._n2d[key]
+        except KeyError:
+            pass
+
+        if len(self._n2d) >= self.maxsize:
+            self._n2d.clear()
+
+        dt = self._n2d[key] = num2date(x, tz=tz, naive=naive)
+        return dt
+
+    def date2num(self, dt, tz=None):
+        key = (dt, tz)
+        try:
+            return self._d2n[key]
+        except KeyError:
+            pass
+
+        if len(self._d2n) >= self.maxsize:
+            self._d2n.clear()
+
+        x = self._d2n[key] = date2num(dt, tz=tz)
+        return x
+
+
 def time2num(tm):
     """
     Converts the hour/minute/second/microsecond part of tm (datetime.datetime
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import asyncio
+import threading
+
+from .py3 import queue
+
+
+__all__ = ['Wakeup', 'AsyncWakeup', 'WakeupQueue']
+
+
+class Wakeup(object):
+    '''Wakes up the live loop of cerebro, which sleeps until something arrives
+
+    The threads producing live data or notifications (feeds, stores, brokers)
+    call ``set`` after having queued something. The loop calls ``clear``
+    before looking at the sources and ``wait`` if nothing was found. A
+    ``set`` in between makes the ``wait`` return at once, so nothing is lost
+    '''
+    def __init__(self):
+        self._event = threading.Event()
+
+    def set(self):
+        self._event.set()
+
+    def clear(self):
+        self._event.clear()
+
+    def wait(self, timeout=None):
+        '''Returns ``True`` if woken up and ``False`` if timed out'''
+        return self._event.wait(timeout)
+
+
+class AsyncWakeup(Wakeup):
+    '''Wakeup for the loop of ``Cerebro.run_async``, which sleeps awaiting
+    ``wait_async`` inside an asyncio event loop
+
+    ``set`` can be called from any thread: from the event loop itself (async
+    feeds and stores) or from the threads of regular feeds and stores
+    '''
+    def __init__(self, loop):
+        super(AsyncWakeup, self).__init__()
+        self.loop = loop
+        self._aevent = asyncio.Event()
+
+    def _inloop(self):
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def set(self):
+        self._event.set()
+        if self._inloop():
+            self._aevent.set()
+        else:
+            self.loop.call_soon_threadsafe(self._aevent.set)
+
+    def clear(self):
+        self._event.clear()
+        self._aevent.clear()
+
+    async def wait_async(self, timeout=None):
+        '''Returns ``True`` if woken up and ``False`` if timed out. A
+        ``timeout`` of ``0`` only lets the other tasks of the loop run'''
+        if timeout is not None and timeout <= 0:
+            await asyncio.sleep(0)
+            return self._aevent.is_set()
+
+        try:
+            await asyncio.wait_for(self._aevent.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+
+        return True
+
+
+class WakeupQueue(queue.Queue):
+    '''Queue which sets ``wakeup`` (if any) each time an item is put. The
+    consumer sets the attribute'''
+    wakeup = None
+
+    def _put(self, item):
+        queue.Queue._put(self, item)
+        wakeup = self.wakeup
+        if wakeup is not None:
+            wakeup.set()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import io
+import json
+import os.path
+import time
+
+import testcommon
+
+import backtrader as bt
+
+
+class StampedData(testcommon.DATAFEED):
+    '''Stamps each bar as a live feed would'''
+    def _load(self):
+        ret = super(StampedData, self)._load()
+        if ret:
+            now = time.time()
+            self.stamps = {'event': now - 0.0045, 'queued': now - 0.0015,
+                           'loaded': now}
+        return ret
+
+
+class StampedBroker(bt.brokers.BackBroker):
+    '''Stamps the orders as a live broker would'''
+    def transmit(self, order, check=True):
+        now = time.time()
+        order.stamps.update(submit=now - 0.03, sent=now - 0.0003, ack=now)
+        return super(StampedBroker, self).transmit(order, check)
+
+    def _execute(self, order, *args, **kwargs):
+        if kwargs.get('ago', args[0] if args else None) is not None:
+            order.stamps.setdefault('fill', order.stamps['sent'] + 0.7)
+        return super(StampedBroker, self)._execute(order, *args, **kwargs)
+
+
+class RunStrategy(bt.Strategy):
+    def next(self):
+        if len(self) % 50 == 0:
+            self.buy(size=1)
+
+
+def run(stamped, logfile=None):
+    cerebro = bt.Cerebro()
+    if stamped:
+        cerebro.broker = StampedBroker()
+        path = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            testcommon.datafiles[0])
+        data = StampedData(dataname=path, fromdate=testcommon.FROMDATE,
+                           todate=testcommon.TODATE)
+    else:
+        data = testcommon.getdata(0)
+
+    cerebro.adddata(data, name='data0')
+    cerebro.addstrategy(RunStrategy)
+    cerebro.addanalyzer(bt.analyzers.Latency, logfile=logfile)
+    return cerebro.run(preload=False)[0].analyzers.latency.get_analysis()
+
+
+def test_run(main=False):
+    # a backtest has no stamps: nothing is measured
+    assert not run(stamped=False)
+
+    log = io.StringIO()
+    rets = run(stamped=True, logfile=log)
+    if main:
+        for stage, r in rets.items():
+            print(stage, r.count, r.mean, r.p50, r.p99, r.hist)
+
+    assert list(rets) == ['feed', 'queue', 'strategy', 'submit', 'ack',
+                          'fill']
+    bars = rets.feed.count
+    assert bars == rets.queue.count == rets.strategy.count == 255
+    assert rets.feed.hist == [[0.005, bars]] and rets.feed.p99 < 0.005
+    assert rets.queue.hist == [[0.002, bars]]
+    assert rets.strategy.min >= 0.0
+
+    orders = rets.submit.count
+    assert orders == rets.ack.count == rets.fill.count == 5
+    assert rets.submit.hist == [[0.05, orders]]
+    assert rets.ack.hist == [[0.0005, orders]]
+    assert rets.fill.hist == [[1.0, orders]]
+    assert abs(rets.fill.mean - 0.7) < 1e-6
+
+    # every measurement is in the structured log
+    lines = [json.loads(line) for line in log.getvalue().splitlines()]
+    assert len(lines) == sum(r.count for r in rets.values())
+    assert set(l['source'] for l in lines if l['stage'] == 'feed') == \
+        set(['data0'])
+
+
+if __name__ == '__main__':
+    test_run(main=True)
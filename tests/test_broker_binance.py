@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from decimal import Decimal
+import itertools
+import time
+
+import testcommon
+
+import backtrader as bt
+
+try:
+    from backtrader.brokers.binancebroker import BinanceBroker
+except ImportError:
+    BinanceBroker = None  # python-binance is not installed
+
+
+class Socket(object):
+    '''Stand-in for the user data stream'''
+    def start_user_socket(self, callback):
+        self.callback = callback
+
+
+class Store(object):
+    '''Stand-in for BinanceStore which reports the fill of each order on the
+    user socket before the REST call placing it returns'''
+    symbols = ['ETHUSDT']
+
+    def __init__(self, early=True):
+        self.early = early
+        self.binance_socket = Socket()
+        self.ids = itertools.count(1000)
+        self.reports = list()
+        self.cancelled = list()
+
+    def report(self, oid, size, price):
+        self.binance_socket.callback({
+            'e': 'executionReport', 's': 'ETHUSDT', 'X': 'FILLED', 'i': oid,
+            'l': str(size), 'L': str(price), 'n': '0', 'N': 'ETH',
+        })
+
+    def create_order(self, symbol, side, exectype, size, price, **kwargs):
+        oid = next(self.ids)
+        if self.early:
+            self.report(oid, size, price)
+        else:
+            self.reports.append((oid, size, price))
+
+        return {'orderId': oid, 'status': 'NEW', 'executedQty': '0',
+                'fills': []}
+
+    def cancel_order(self, symbol, order_id):
+        self.cancelled.append(order_id)
+
+
+class St(bt.Strategy):
+    params = (
+        ('cancel', False),  # cancel the order while its request is in flight
+    )
+
+    def __init__(self):
+        self.notified = list()
+
+    def notify_order(self, order):
+        self.notified.append((len(self), order.getstatusname()))
+
+    def next(self):
+        if len(self) == 1:
+            order = self.buy(size=1, price=self.data.close[0],
+                             exectype=bt.Order.Limit)
+            if self.p.cancel:  # queued until the order is in the exchange
+                self.cancelled = self.broker.cancel(order)
+
+        elif len(self) == 2 and self.p.cancel:
+            while self.broker._pipe.inflight():  # collected in the next bar
+                time.sleep(0.01)
+
+
+def runbroker(store, cancel=False, **kwargs):
+    data = testcommon.getdata(0)
+    data.symbol = 'ETHUSDT'
+    data._store = store
+
+    cerebro = bt.Cerebro()
+    cerebro.adddata(data)
+    cerebro.setbroker(BinanceBroker(store, **kwargs))
+    cerebro.addstrategy(St, cancel=cancel)
+    return cerebro.run()[0]
+
+
+def test_run(main=False):
+    if BinanceBroker is None:
+        return
+
+    # the fill is reported before the orderId is known: it must be kept
+    st = runbroker(Store(early=True), asyncsubmit=False,
+                   cash=Decimal('100000'))
+    if main:
+        print(st.notified)
+
+    assert st.notified[-1] == (2, 'Completed')
+    assert st.position.size == 1
+
+    # cancelled in flight: cancelled once the outcome is checked and accepted
+    store = Store(early=False)
+    st = runbroker(store, cancel=True, cash=Decimal('100000'))
+    if main:
+        print(st.notified, store.cancelled)
+
+    assert [status for _, status in st.notified] == \
+        ['Submitted', 'Accepted', 'Canceled']
+    assert store.cancelled == [1000]
+    assert st.cancelled is True
+
+    # reports of unknown ids (not ours) are kept only up to a bound
+    store = Store(early=False)
+    broker = BinanceBroker(store)
+    for oid in range(broker._EARLYFILLS + 10):
+        store.report(oid, 1, 10.0)
+
+    assert len(broker._early) == broker._EARLYFILLS
+    assert 0 not in broker._early and oid in broker._early
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+from decimal import Decimal
+
+import testcommon
+
+import backtrader as bt
+
+
+class GridStrategy(bt.Strategy):
+    '''Leaves a grid of resting orders (and some of the other types) every
+    few bars and records the notifications'''
+    params = (('levels', 5),)
+
+    def __init__(self):
+        self.events = list()
+
+    def notify_order(self, order):
+        self.events.append((len(self), order.ref, order.getstatusname(),
+                            str(order.executed.price),
+                            str(order.executed.size)))
+
+    def next(self):
+        if len(self) % 20 != 1:
+            return
+
+        c = self.data.close[0]
+        for i in range(1, self.p.levels + 1):
+            d = c * 0.004 * i
+            valid = self.data.datetime.date() + datetime.timedelta(days=i)
+            self.buy(exectype=bt.Order.Limit, price=c - d, valid=valid)
+            self.buy(exectype=bt.Order.Stop, price=c + d)
+            self.buy(exectype=bt.Order.StopLimit, price=c + d,
+                     plimit=c + 2 * d)
+
+        o = self.buy(exectype=bt.Order.Limit, price=c * 0.99)
+        self.buy(exectype=bt.Order.Stop, price=c * 1.01, oco=o)
+
+        # the order which executes is in the middle of the group: the other
+        # ones are canceled in the order of the full scan
+        o = self.buy(exectype=bt.Order.Limit, price=c * 0.95)
+        self.buy(exectype=bt.Order.Limit, price=c * 0.90, oco=o)
+        self.buy(exectype=bt.Order.Stop, price=c * 1.001, oco=o)
+        self.buy(exectype=bt.Order.Stop, price=c * 1.10, oco=o)
+        self.buy(exectype=bt.Order.Limit, price=c * 0.80, oco=o)
+        self.buy_bracket(price=c * 0.995, stopprice=c * 0.98,
+                         limitprice=c * 1.02)
+        self.buy()
+        self.buy(exectype=bt.Order.StopTrail, trailpercent=0.02)
+        self.buy(exectype=bt.Order.Close)
+
+
+def run_grid(orderbook, replay=False, cash=Decimal('1e9')):
+    cerebro = bt.Cerebro()
+    cerebro.broker = bt.brokers.BackBroker(orderbook=orderbook, cash=cash)
+    if replay:
+        cerebro.replaydata(testcommon.getdata(0),
+                           timeframe=bt.TimeFrame.Weeks)
+    else:
+        cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(GridStrategy)
+    strat = cerebro.run()[0]
+
+    # order references are global, make them relative to the 1st order
+    ref0 = strat.events[0][1]
+    events = [(e[0], e[1] - ref0) + e[2:] for e in strat.events]
+    return events, str(strat.broker.getvalue())
+
+
+def test_run(main=False):
+    for kwargs in [dict(), dict(replay=True), dict(cash=Decimal('10000'))]:
+        events, value = run_grid(True, **kwargs)
+        if main:
+            print(kwargs, len(events), value)
+        else:
+            assert any(e[2] == 'Completed' for e in events)
+            assert any(e[2] == 'Canceled' for e in events)
+            assert (events, value) == run_grid(False, **kwargs)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from decimal import Decimal
+
+import testcommon
+
+import backtrader as bt
+
+
+class FullValueBroker(bt.brokers.BackBroker):
+    '''Values all positions from scratch on each call'''
+    def _get_value(self, datas=None, lever=False):
+        self._posvalues.clear()
+        return super(FullValueBroker, self)._get_value(datas, lever)
+
+
+class ValueStrategy(bt.Strategy):
+    def __init__(self):
+        self.values = list()
+
+    def next(self):
+        for i, d in enumerate(self.datas):
+            if (len(self) + i) % 7 == 0:
+                self.buy(data=d, size=i + 1)
+            elif (len(self) + i) % 11 == 0:
+                self.close(data=d)
+
+        broker = self.broker
+        self.values.append((str(broker.getvalue()),
+                            str(broker.getvalue(lever=True)),
+                            [str(broker.get_value([d])) for d in self.datas]))
+
+
+def run_values(brokercls):
+    cerebro = bt.Cerebro()
+    cerebro.broker = brokercls(cash=Decimal('1e7'))
+    for i in range(4):
+        data = testcommon.getdata(i % 2)
+        if i < 2:
+            cerebro.adddata(data)
+        else:  # positions whose price does not change on every bar
+            cerebro.resampledata(data, timeframe=bt.TimeFrame.Weeks)
+
+    cerebro.addstrategy(ValueStrategy)
+    return cerebro.run()[0].values
+
+
+def test_run(main=False):
+    values = run_values(bt.brokers.BackBroker)
+    if main:
+        print(len(values), values[-1])
+    else:
+        assert values
+        assert values == run_values(FullValueBroker)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import asyncio
+import datetime
+import json
+import threading
+import time
+
+import testcommon
+
+import backtrader as bt
+from backtrader.stores.orderpipe import AsyncOrderPipeline
+
+from test_cerebro_wakeup import LiveData
+
+NBARS = 5
+NSTREAMS = 50
+
+
+async def stub_stream(reader, writer):
+    '''Stub server streaming ``NBARS`` bars (a json line each) for the
+    symbol requested in the first line'''
+    symbol = (await reader.readline()).decode().strip()
+    dt = datetime.datetime(2024, 1, 1)
+    for i in range(NBARS):
+        await asyncio.sleep(0.01)
+        dt += datetime.timedelta(minutes=1)
+        bar = dict(symbol=symbol, dt=dt.isoformat(), close=float(i))
+        writer.write(json.dumps(bar).encode() + b'\n')
+        await writer.drain()
+
+    writer.close()
+
+
+async def stub_rest(reader, writer):
+    '''Stub server answering each request line with an ack line'''
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        await asyncio.sleep(0.01)
+        writer.write(b'ack ' + line)
+        await writer.drain()
+
+    writer.close()
+
+
+class StreamData(bt.AsyncDataBase):
+    params = (('port', None),)
+
+    async def _astream(self):
+        reader, writer = await asyncio.open_connection('127.0.0.1',
+                                                       self.p.port)
+        writer.write(self.p.dataname.encode() + b'\n')
+        self.put_notification(self.LIVE)
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+
+            bar = json.loads(line)
+            dt = datetime.datetime.strptime(bar['dt'], '%Y-%m-%dT%H:%M:%S')
+            self._aput(dict(datetime=dt, open=bar['close'],
+                            high=bar['close'], low=bar['close'],
+                            close=bar['close']))
+
+        writer.close()
+
+
+class RestStore(bt.AsyncStore):
+    params = (('port', None),)
+
+    def start(self, data=None, broker=None):
+        super(RestStore, self).start(data=data, broker=broker)
+        self.conn = None
+
+    async def request(self, msg):
+        if self.conn is None:
+            self.conn = await asyncio.open_connection('127.0.0.1',
+                                                      self.p.port)
+        reader, writer = self.conn
+        writer.write(msg.encode() + b'\n')
+        return (await reader.readline()).decode().strip()
+
+    def stop(self):
+        super(RestStore, self).stop()
+        if self.conn is not None:
+            self.conn[1].close()
+
+
+class BackfillData(LiveData):
+    '''Live feed with a blocking client: it connects in ``start`` and
+    backfills with blocking requests before going live'''
+    params = (('backfill', 4), ('delay', 0.1))
+
+    def start(self):
+        time.sleep(self.p.delay)  # connecting
+        super(BackfillData, self).start()
+        self.put_notification(self.DELAYED)
+        self.backfill = self.p.backfill
+        self.threads = set()
+
+    def _load(self):
+        if not self.backfill:
+            return super(BackfillData, self)._load()
+
+        self.threads.add(threading.get_ident())
+        time.sleep(self.p.delay)  # historical request
+        self.backfill -= 1
+        if not self.backfill:
+            self.put_notification(self.LIVE)
+
+        dt = datetime.datetime(2023, 12, 31, 23, 59 - self.backfill)
+        self.queued = time.time()
+        self.lines.datetime[0] = bt.date2num(dt)
+        for line in (self.lines.open, self.lines.high, self.lines.low,
+                     self.lines.close):
+            line[0] = -1.0
+        return True
+
+
+class SyncStreamData(bt.AsyncDataBase):
+    '''Async feed adapting a blocking client with ``_stream``'''
+    def _stream(self):
+        self.put_notification(self.LIVE)
+        dt = datetime.datetime(2024, 1, 1)
+        for i in range(NBARS):
+            time.sleep(0.01)  # blocking read
+            dt += datetime.timedelta(minutes=1)
+            yield dict(datetime=dt, open=i, high=i, low=i, close=i)
+
+
+async def ticker(gaps):
+    '''Records the time between the ticks of the loop'''
+    t0 = time.time()
+    while True:
+        await asyncio.sleep(0.005)
+        t1 = time.time()
+        gaps.append(t1 - t0)
+        t0 = t1
+
+
+def nthreads():
+    '''Threads alive, not counting the (bounded) executor of the loop which
+    runs the blocking calls of regular feeds, stores and brokers'''
+    return sum(not t.name.startswith('asyncio_')
+               for t in threading.enumerate())
+
+
+class CountStrategy(bt.Strategy):
+    params = (('store', None),)
+
+    def start(self):
+        self.threads = nthreads()
+        self.acks = list()
+        self.pipe = None
+        if self.p.store is not None:
+            self.pipe = AsyncOrderPipeline(workers=1, callback=self._ack)
+
+    def _ack(self, key, result, exc):
+        self.acks.append((key, result, exc))
+
+    def next(self):
+        self.threads = max(self.threads, nthreads())
+        if self.pipe is not None and len(self) == 1:
+            self.pipe.put(len(self), self.p.store.request, 'order 1')
+
+    def stop(self):
+        self.lens = [len(d) for d in self.datas]
+
+
+def cerebro_streams(port, nstreams, **kwargs):
+    cerebro = bt.Cerebro()
+    for i in range(nstreams):
+        cerebro.adddata(StreamData(dataname='SYM%d' % i, port=port))
+    cerebro.addstrategy(CountStrategy, **kwargs)
+    return cerebro
+
+
+async def run_async(main=False):
+    server = await asyncio.start_server(stub_stream, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    rest = await asyncio.start_server(stub_rest, '127.0.0.1', 0)
+    store = RestStore(port=rest.sockets[0].getsockname()[1])
+
+    threads = nthreads()
+    cerebro = cerebro_streams(port, NSTREAMS, store=store)
+    cerebro.addstore(store)
+    strat = (await cerebro.run_async())[0]
+    if main:
+        print('lens', set(strat.lens), 'threads', threads, strat.threads,
+              'acks', len(strat.acks))
+
+    # all streams delivered in full by a single event loop
+    assert strat.lens == [NBARS] * NSTREAMS
+    assert strat.threads == threads  # no thread per stream
+    # the request went out while the streams went on
+    assert strat.acks == [(1, 'ack order 1', None)]
+
+    # regular thread fed datas in the event loop
+    cerebro = bt.Cerebro()
+    cerebro.adddata(LiveData(bars=5, interval=0.01))
+    cerebro.adddata(StreamData(dataname='SYM', port=port))
+    cerebro.addstrategy(CountStrategy)
+    strat = (await cerebro.run_async())[0]
+    assert strat.lens == [5, NBARS]
+
+    # blocking start and backfill of a regular feed run in the executor:
+    # the loop keeps on serving the streams
+    gaps = list()
+    tick = asyncio.ensure_future(ticker(gaps))
+    cerebro = bt.Cerebro()
+    data = BackfillData(bars=3, interval=0.01)
+    cerebro.adddata(data)
+    cerebro.adddata(SyncStreamData())
+    cerebro.addstrategy(CountStrategy)
+    strat = (await cerebro.run_async())[0]
+    tick.cancel()
+    if main:
+        print('max gap', max(gaps))
+
+    assert strat.lens == [4 + 3, NBARS]
+    assert threading.get_ident() not in data.threads
+    assert max(gaps) < 0.05  # the 0.1 secs calls did not block the loop
+
+    # outstanding requests of the pipeline can be awaited from other threads
+    loop = asyncio.get_running_loop()
+    acks = list()
+    pipe = AsyncOrderPipeline(workers=2, loop=loop,
+                              callback=lambda *args: acks.append(args))
+    for i in range(4):
+        pipe.put(i, time.sleep, 0.02)
+
+    await loop.run_in_executor(None, pipe.stop)
+    assert sorted(acks) == [(i, None, None) for i in range(4)]
+    assert not pipe.inflight()
+
+    # backtesting gives the same results as run
+    for runonce in [True, False]:
+        cerebro = bt.Cerebro(runonce=runonce)
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.addstrategy(CountStrategy)
+        alens = (await cerebro.run_async())[0].lens
+        assert alens == cerebro.run()[0].lens
+
+    # async feeds with the synchronous run (in a background loop). Run in
+    # a thread to keep on serving the streams from this loop
+    cerebro = cerebro_streams(port, 3)
+    loop = asyncio.get_running_loop()
+    strat = (await loop.run_in_executor(None, cerebro.run))[0]
+    assert strat.lens == [NBARS] * 3
+
+    server.close()
+    rest.close()
+
+
+def test_run(main=False):
+    asyncio.run(run_async(main=main))
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import collections
+import datetime
+import threading
+import time
+
+import testcommon
+
+import backtrader as bt
+
+
+class LiveData(bt.feed.DataBase):
+    '''Live feed receiving bars from a thread, as websocket feeds do'''
+    _wakes = True
+
+    params = (('bars', 10), ('interval', 0.05))
+
+    def start(self):
+        super(LiveData, self).start()
+        self.q = collections.deque()
+        self.loads = 0
+        self.ended = False
+        self.put_notification(self.LIVE)
+        t = threading.Thread(target=self._t_produce)
+        t.daemon = True
+        t.start()
+
+    def _t_produce(self):
+        dt = datetime.datetime(2024, 1, 1)
+        for i in range(self.p.bars):
+            time.sleep(self.p.interval)
+            dt += datetime.timedelta(minutes=1)
+            self.q.append((dt, float(i), time.time()))
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+        self.q.append(None)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def islive(self):
+        return True
+
+    def haslivedata(self):
+        return bool(self.q)
+
+    def _load(self):
+        self.loads += 1
+        if self.ended:
+            return False
+
+        if not self.q:
+            return None
+
+        bar = self.q.popleft()
+        if bar is None:
+            self.ended = True
+            return False
+
+        dt, price, self.queued = bar
+        self.lines.datetime[0] = bt.date2num(dt)
+        for line in (self.lines.open, self.lines.high, self.lines.low,
+                     self.lines.close):
+            line[0] = price
+        return True
+
+
+class SilentData(LiveData):
+    '''Live feed which does not wake the loop up (like user feeds written
+    for the ``qcheck`` polling)'''
+    _wakes = False
+
+    def _t_produce(self):
+        self._wakeup = None  # would be ignored by a feed unaware of it
+        super(SilentData, self)._t_produce()
+
+
+class DelayStrategy(bt.Strategy):
+    def start(self):
+        self.delays = list()
+
+    def next(self):
+        self.delays.append(time.time() - self.data.queued)
+
+
+def run(datacls=LiveData, **kwargs):
+    cerebro = bt.Cerebro(**kwargs)
+    data = datacls()
+    cerebro.adddata(data)
+    cerebro.addstrategy(DelayStrategy)
+    t0 = time.time()
+    strat = cerebro.run()[0]
+    return strat, data, time.time() - t0
+
+
+def test_run(main=False):
+    # the loop sleeps much longer than the time between bars: bars arriving
+    # wake it up and are delivered at once
+    strat, data, elapsed = run(wakeup=5.0)
+    if main:
+        print('bars', len(strat.delays), 'loads', data.loads,
+              'max delay', max(strat.delays), 'elapsed', elapsed)
+
+    assert len(strat.delays) == 10
+    assert max(strat.delays) < 0.04  # not waiting for the 5 secs timeout
+    assert elapsed < 2.0
+    assert data.loads < 60  # the loop does not spin while idle
+
+    # a feed which does not wake the loop up: the default wakeup is not used
+    # and the bars are not delayed by the sleeping loop
+    strat, data, elapsed = run(datacls=SilentData, wakeup=5.0)
+    assert len(strat.delays) == 10
+    assert max(strat.delays) < 0.04
+    assert elapsed < 2.0
+
+    # resampled bars: the loop sleeps at most until the next boundary
+    cerebro = bt.Cerebro()
+    data = LiveData()
+    cerebro.resampledata(data, timeframe=bt.TimeFrame.Seconds,
+                         compression=2)
+    resampler = data._filters[0][0]
+    assert resampler.nextcheck(data) is None  # no bar to deliver
+
+    resampler.bar.open = 1.0  # a bar has been started
+    secs = resampler.nextcheck(data)
+    edge = (time.time() + secs) % 2.0  # seconds past an even second
+    assert 0.0 < secs <= 2.0 and min(edge, 2.0 - edge) < 0.01
+    cerebro.p.wakeup = 5.0
+    assert cerebro._wakeup_tmout([data]) <= secs
+
+
+if __name__ == '__main__':
+    test_run(main=True)
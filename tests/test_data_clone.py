@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+
+class CloneStrategy(bt.Strategy):
+    def __init__(self):
+        self.sma0 = btind.SMA(self.data0, period=15)
+        self.sma1 = btind.SMA(self.data1, period=15)
+        self.nexts = 0
+
+    def next(self):
+        self.nexts += 1
+        assert len(self.data0) == len(self.data1)
+        assert self.data0.datetime[0] == self.data1.datetime[0]
+        assert self.data0.close[0] == self.data1.close[0]
+        assert self.sma0[0] == self.sma1[0]
+
+
+def test_run(main=False):
+    for preload, runonce in [(True, True), (True, False), (False, False)]:
+        data = testcommon.getdata(0)
+        cerebro = bt.Cerebro(preload=preload, runonce=runonce)
+        cerebro.adddata(data)
+        clone = cerebro.adddata(data.clone())
+        cerebro.addstrategy(CloneStrategy)
+        strat = cerebro.run()[0]
+
+        if main:
+            print(preload, runonce, strat.nexts, len(clone))
+        else:
+            assert strat.nexts == len(data) - 14
+            assert len(clone) == len(data)
+            # no filters in the clone: the buffers of the data are shared
+            assert clone.lines.close.array is data.lines.close.array
+
+
+if __name__ == '__main__':
+    test_run(main=True)
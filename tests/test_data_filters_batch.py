@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import os.path
+
+import testcommon
+
+import backtrader as bt
+import backtrader.filters as btfilters
+
+
+class BarByBar(object):
+    '''Hides the ``transform`` of a filter to force bar by bar filtering'''
+    def __init__(self, ff):
+        self.ff = ff
+
+    def __call__(self, data):
+        return self.ff(data)
+
+
+def getdata(minutes):
+    if not minutes:
+        return testcommon.getdata(0)
+
+    path = os.path.join(testcommon.modpath, testcommon.dataspath,
+                        '2006-min-005.txt')
+    return bt.feeds.BacktraderCSVData(dataname=path,
+                                      timeframe=bt.TimeFrame.Minutes,
+                                      compression=5,
+                                      sessionstart=datetime.time(10, 0),
+                                      sessionend=datetime.time(16, 0))
+
+
+class HeikinAshiDouble(btfilters.HeikinAshi):
+    '''Overrides ``__call__``, which ``transform`` must not bypass'''
+    def __call__(self, data):
+        ret = super(HeikinAshiDouble, self).__call__(data)
+        data.close[0] *= 2.0
+        return ret
+
+
+class RenkoHalf(btfilters.Renko):
+    '''Overrides ``next``, which ``transform`` must not bypass'''
+    def next(self, data):
+        ret = super(RenkoHalf, self).next(data)
+        data.volume[0] /= 2.0
+        return ret
+
+
+def filtered_bars(fchain, minutes, barbybar):
+    data = getdata(minutes)
+    for fcls, fkwargs in fchain:
+        if barbybar:
+            data.addfilter(BarByBar(fcls(data, **fkwargs)))
+        else:
+            data.addfilter(fcls, **fkwargs)
+
+    cerebro = bt.Cerebro()
+    cerebro.adddata(data)
+    cerebro.addstrategy(bt.Strategy)
+    cerebro.run()
+    return [tuple(line.array) for line in data.lines]
+
+
+filters = [
+    (btfilters.HeikinAshi, dict(), False),
+    (btfilters.Renko, dict(size=10), False),
+    (btfilters.Renko, dict(hilo=True, size=5), True),
+    (btfilters.SessionFilter, dict(), True),
+    (btfilters.SessionFiller, dict(), True),
+    (btfilters.CalendarDays, dict(fill_price=-1), False),
+    (btfilters.DaySplitter_Close, dict(), False),
+    (HeikinAshiDouble, dict(), False),
+    (RenkoHalf, dict(size=10), False),
+]
+
+# stashed bars go again through the filters which precede the stashing one
+chains = [
+    ([(btfilters.DaySplitter_Close, dict()), (btfilters.HeikinAshi, dict())],
+     True),
+    ([(btfilters.HeikinAshi, dict()), (btfilters.DaySplitter_Close, dict())],
+     True),
+]
+
+
+def test_run(main=False):
+    # preloaded transforms must produce exactly the bar by bar results
+    fchains = [([(fcls, fkwargs)], minutes)
+               for fcls, fkwargs, minutes in filters]
+    for fchain, minutes in fchains + chains:
+        bars = filtered_bars(fchain, minutes, barbybar=False)
+        if main:
+            print([fcls.__name__ for fcls, _ in fchain], len(bars[0]))
+        else:
+            assert repr(bars) == repr(
+                filtered_bars(fchain, minutes, barbybar=True))
+
+    # overriding a bar by bar method in a subclass disables ``transform``
+    data = getdata(False)
+    assert data._cantransform(btfilters.HeikinAshi(data))
+    assert data._cantransform(btfilters.Renko(data))
+    assert not data._cantransform(HeikinAshiDouble(data))
+    assert not data._cantransform(RenkoHalf(data))
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import io
+import os.path
+
+import testcommon
+
+import backtrader as bt
+
+symbols = ['001', '002']
+
+
+def getlongsource():
+    # build a long format source (symbol first) out of the sample files
+    rows = []
+    for symbol in symbols:
+        fname = '2006-day-{}.txt'.format(symbol)
+        path = os.path.join(testcommon.modpath, testcommon.dataspath, fname)
+        with io.open(path, 'r') as f:
+            f.readline()  # skip headers
+            rows.extend(symbol + ',' + line.rstrip('\n') for line in f)
+
+    rows.sort(key=lambda x: x.split(',')[1])  # long format sorted by time
+    return io.StringIO('Symbol,Date,O,H,L,C,V,OI\n' + '\n'.join(rows))
+
+
+class TestStrategy(bt.Strategy):
+    def start(self):
+        self.lens = [0] * len(self.datas)
+
+    def next(self):
+        for i, d in enumerate(self.datas):
+            self.lens[i] = len(d)
+
+
+def test_run(main=False):
+    for preload in [True, False]:
+        expected = []
+        for symbol in symbols:
+            cerebro = bt.Cerebro(preload=preload)
+            fname = '2006-day-{}.txt'.format(symbol)
+            path = os.path.join(testcommon.modpath, testcommon.dataspath, fname)
+            cerebro.adddata(bt.feeds.BacktraderCSVData(dataname=path))
+            cerebro.addstrategy(TestStrategy)
+            strat = cerebro.run()[0]
+            expected.append((strat.lens[0], strat.data0.close[0]))
+
+        cerebro = bt.Cerebro(preload=preload)
+        feed = bt.feeds.MultiSymbolCSV(
+            dataname=getlongsource(), dtformat='%Y-%m-%d', symbol=0,
+            datetime=1, open=2, high=3, low=4, close=5, volume=6,
+            openinterest=7)
+
+        for symbol in symbols:
+            cerebro.adddata(feed.getdata(symbol))
+
+        cerebro.addstrategy(TestStrategy)
+        strat = cerebro.run()[0]
+
+        if main:
+            print(expected)
+            print(list(zip(strat.lens, (d.close[0] for d in strat.datas))))
+        else:
+            assert strat.datas[0]._name == symbols[0]
+            for i, d in enumerate(strat.datas):
+                assert (strat.lens[i], d.close[0]) == expected[i]
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import os.path
+import shutil
+import struct
+import tempfile
+
+import testcommon
+
+import backtrader as bt
+
+
+class TestStrategy(bt.Strategy):
+    def start(self):
+        self.bars = []
+
+    def next(self):
+        d = self.data
+        self.bars.append((d.datetime[0], d.open[0], d.high[0], d.low[0],
+                          d.close[0], d.volume[0], d.openinterest[0]))
+
+
+def runbars(preload, prefetch):
+    path = os.path.join(testcommon.modpath, testcommon.dataspath,
+                        testcommon.datafiles[0])
+    cerebro = bt.Cerebro(preload=preload)
+    cerebro.adddata(bt.feeds.BacktraderCSVData(dataname=path,
+                                               prefetch=prefetch))
+    cerebro.addstrategy(TestStrategy)
+    strat = cerebro.run()[0]
+    return strat.bars
+
+
+def writevchart(path):
+    # Visual Chart files of market 015ES (daily and intraday) in their layout
+    mktdir = os.path.join(path, '0015')
+    os.makedirs(mktdir)
+    for ext in ['.fd', '.min']:
+        recs = []
+        dt = datetime.datetime(2006, 1, 2, 9, 0, 17)
+        for i in range(200):
+            dcode = dt.year * 500 + dt.month * 32 + dt.day
+            price = 3000.0 + i * 0.25
+            values = (price, price + 1.5, price - 1.25, price + 0.5, 100 + i,
+                      7)
+            if ext == '.min':
+                secs = dt.hour * 3600 + dt.minute * 60 + dt.second
+                recs.append(struct.pack('<IIffffII', dcode, secs, *values))
+                dt += datetime.timedelta(minutes=7)
+            else:
+                recs.append(struct.pack('<IffffII', dcode, *values))
+                dt += datetime.timedelta(days=1)
+
+        with open(os.path.join(mktdir, '010015ES' + ext), 'wb') as f:
+            f.write(b''.join(recs))
+
+
+def runvchart(path, timeframe, preload, prefetch):
+    store = bt.stores.VChartFile(path=path)
+    cerebro = bt.Cerebro(preload=preload)
+    cerebro.adddata(store.getdata(dataname='015ES', timeframe=timeframe,
+                                  prefetch=prefetch))
+    cerebro.addstrategy(TestStrategy)
+    return cerebro.run()[0].bars
+
+
+def test_run(main=False):
+    for preload in [True, False]:
+        bars = runbars(preload, prefetch=0)
+        for prefetch in [1, 16]:
+            pbars = runbars(preload, prefetch=prefetch)
+            if main:
+                print(preload, prefetch, len(bars), len(pbars))
+            else:
+                assert pbars == bars
+
+    # the records of a VChart file are read and unpacked by the prefetcher
+    path = tempfile.mkdtemp()
+    try:
+        writevchart(path)
+        for tframe in [bt.TimeFrame.Days, bt.TimeFrame.Minutes]:
+            for preload in [True, False]:
+                bars = runvchart(path, tframe, preload, prefetch=0)
+                pbars = runvchart(path, tframe, preload, prefetch=16)
+                if main:
+                    print('vchart', tframe, preload, len(bars), len(pbars))
+                else:
+                    assert len(bars) == 200 and pbars == bars
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os.path
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+chkdatas = 1
+chkvals = [
+    ['3836.453333', '3703.962333', '3741.802000']
+]
+
+chkmin = 30  # period will be in weeks
+chkind = [btind.SMA]
+chkargs = dict()
+
+
+class BarsStrategy(bt.Strategy):
+    def stop(self):
+        self.bars = [tuple(line.array) for line in self.data.lines]
+
+
+def resampled_bars(batch, **kwargs):
+    path = os.path.join(testcommon.modpath, testcommon.dataspath,
+                        '2006-min-005.txt')
+    data = bt.feeds.BacktraderCSVData(dataname=path,
+                                      timeframe=bt.TimeFrame.Minutes,
+                                      compression=5)
+    cerebro = bt.Cerebro()
+    cerebro.resampledata(data, batch=batch, **kwargs)
+    cerebro.addstrategy(BarsStrategy)
+    return cerebro.run()[0].bars
+
+
+class NextStrategy(bt.Strategy):
+    def start(self):
+        self.rows = list()
+
+    def next(self):
+        self.rows.append(tuple((d.datetime[0], d.close[0], len(d))
+                               for d in self.datas))
+
+
+def next_rows(batch, kwargs, **runkwargs):
+    # the resampled data runs next to its source
+    path = os.path.join(testcommon.modpath, testcommon.dataspath,
+                        '2006-min-005.txt')
+    data = bt.feeds.BacktraderCSVData(dataname=path,
+                                      timeframe=bt.TimeFrame.Minutes,
+                                      compression=5)
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(data)
+    cerebro.resampledata(data, batch=batch, **kwargs)
+    cerebro.addstrategy(NextStrategy)
+    return cerebro.run(**runkwargs)[0].rows
+
+
+def test_run(main=False):
+    for runonce in [True, False]:
+        data = testcommon.getdata(0)
+        data.resample(timeframe=bt.TimeFrame.Weeks, compression=1,
+                      batch=True)
+
+        datas = [data]
+        testcommon.runtest(datas,
+                           testcommon.TestStrategy,
+                           main=main,
+                           runonce=runonce,
+                           plot=main,
+                           chkind=chkind,
+                           chkmin=chkmin,
+                           chkvals=chkvals,
+                           chkargs=chkargs)
+
+    # batch resampling must produce exactly the same bars
+    for kwargs in [dict(timeframe=bt.TimeFrame.Minutes, compression=15),
+                   dict(timeframe=bt.TimeFrame.Minutes, compression=60,
+                        rightedge=False),
+                   dict(timeframe=bt.TimeFrame.Days)]:
+        bars = resampled_bars(True, **kwargs)
+        if main:
+            print(kwargs, len(bars[0]))
+        else:
+            assert repr(bars) == repr(resampled_bars(False, **kwargs))
+
+    # next to the source the strategy sees the same steps. If exactbars
+    # prevents preloading, the resampling is done bar by bar
+    for kwargs in [dict(timeframe=bt.TimeFrame.Minutes, compression=60,
+                        rightedge=False),
+                   dict(timeframe=bt.TimeFrame.Days)]:
+        for runonce in [True, False]:
+            for exactbars in [0, 1, -1]:
+                runkwargs = dict(runonce=runonce, exactbars=exactbars)
+                rows = next_rows(True, kwargs, **runkwargs)
+                if main:
+                    print(kwargs, runkwargs, len(rows))
+                else:
+                    assert rows == next_rows(False, kwargs, **runkwargs)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
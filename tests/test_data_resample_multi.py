@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os.path
+
+import testcommon
+
+import backtrader as bt
+
+targets = [dict(timeframe=bt.TimeFrame.Minutes, compression=15),
+           dict(timeframe=bt.TimeFrame.Minutes, compression=60),
+           dict(timeframe=bt.TimeFrame.Days)]
+
+
+class BarsStrategy(bt.Strategy):
+    def start(self):
+        self.rows = list()
+
+    def next(self):
+        self.rows.append(tuple((d.datetime[0], d.close[0], len(d))
+                               for d in self.datas))
+
+    def stop(self):
+        self.bars = [[tuple(line.array) for line in data.lines]
+                     for data in self.datas]
+
+
+def getdata():
+    path = os.path.join(testcommon.modpath, testcommon.dataspath,
+                        '2006-min-005.txt')
+    return bt.feeds.BacktraderCSVData(dataname=path,
+                                      timeframe=bt.TimeFrame.Minutes,
+                                      compression=5)
+
+
+def runtargets(multi, **kwargs):
+    cerebro = bt.Cerebro(stdstats=False)
+    data = getdata()
+    cerebro.adddata(data)
+    if multi:
+        datas = cerebro.resampledatas(data, targets)
+        assert len(datas) == len(targets)
+    else:  # one by one and with no batch
+        for target in targets:
+            cerebro.resampledata(data, **target)
+
+    cerebro.addstrategy(BarsStrategy)
+    return cerebro.run(**kwargs)[0]
+
+
+def test_run(main=False):
+    for runonce in [True, False]:
+        strat = runtargets(True, runonce=runonce)
+        rstrat = runtargets(False, runonce=runonce)
+        if main:
+            print('runonce', runonce, len(strat.rows), len(rstrat.rows))
+            continue
+
+        assert len(strat.bars) == len(targets) + 1  # source also there
+        # the strategy sees the same steps and the same bars, those of the
+        # source included
+        assert strat.rows == rstrat.rows
+        assert repr(strat.bars) == repr(rstrat.bars)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
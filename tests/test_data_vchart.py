@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import io
+import struct
+
+import testcommon
+
+import backtrader as bt
+
+
+def vchartbuffer(intraday):
+    # Visual Chart binary records: date (and seconds) + o, h, l, c, v, oi
+    recs = []
+    dt = datetime.datetime(2006, 1, 2, 9, 0, 17)
+    for i in range(300):
+        dcode = dt.year * 500 + dt.month * 32 + dt.day
+        price = 3000.0 + i * 0.25
+        values = (price, price + 1.5, price - 1.25, price + 0.5, 100 + i, 7)
+        if intraday:
+            secs = dt.hour * 3600 + dt.minute * 60 + dt.second
+            recs.append(struct.pack('<IIffffII', dcode, secs, *values))
+            dt += datetime.timedelta(minutes=7)
+        else:
+            recs.append(struct.pack('<IffffII', dcode, *values))
+            dt += datetime.timedelta(days=1)
+
+    return b''.join(recs) + b'\x01\x02'  # add incomplete trailing record
+
+
+class TestStrategy(bt.Strategy):
+    def start(self):
+        self.bars = []
+
+    def next(self):
+        d = self.data
+        self.bars.append((d.datetime[0], d.open[0], d.high[0], d.low[0],
+                          d.close[0], d.volume[0], d.openinterest[0]))
+
+
+def runbars(preload, intraday):
+    tframe = bt.TimeFrame.Minutes if intraday else bt.TimeFrame.Days
+    data = bt.feeds.VChartData(dataname=io.BytesIO(vchartbuffer(intraday)),
+                               timeframe=tframe)
+    cerebro = bt.Cerebro(preload=preload)
+    cerebro.adddata(data)
+    cerebro.addstrategy(TestStrategy)
+    return cerebro.run()[0].bars
+
+
+def test_run(main=False):
+    for intraday in [True, False]:
+        bars = runbars(preload=True, intraday=intraday)
+        if main:
+            print(intraday, len(bars), bars[0], bars[-1])
+        else:
+            assert len(bars) == 300
+            assert bars[0][0] == bt.date2num(
+                datetime.datetime(2006, 1, 2, 9, 0, 17) if intraday else
+                datetime.datetime(2006, 1, 2))
+            # decoding in bulk must deliver exactly the same values
+            assert bars == runbars(preload=False, intraday=intraday)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
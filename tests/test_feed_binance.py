@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import random
+
+import testcommon
+
+from backtrader.utils import date2num, num2date
+
+try:
+    from backtrader.feeds.binancefeed import BinanceData, _ms2num
+except ImportError:
+    BinanceData = None  # python-binance is not installed
+
+
+def stamps():
+    rnd = random.Random(1707120960761)
+    yield 0
+    yield 1707120960761  # from an actual kline
+    yield 1707177599999  # last ms of a day
+    yield 1707177600000  # first ms of the next one
+    yield -1  # before the epoch
+    for i in range(2000):
+        yield rnd.randrange(-10 ** 12, 4 * 10 ** 12)
+
+
+def test_run(main=False):
+    if BinanceData is None:
+        return
+
+    # same float as going through the datetime
+    for ms in stamps():
+        dt = datetime.datetime.utcfromtimestamp(ms / 1000)
+        assert _ms2num(ms) == date2num(dt), ms
+
+    # a kline from the socket gives back its open time and values
+    kline = {'t': 1707120960000, 'o': '2319.53', 'h': '2320.1',
+             'l': '2318.0', 'c': '2319.8', 'v': '12.5'}
+    bar = BinanceData._parse_kline(kline)
+    if main:
+        print(bar, num2date(bar[0]))
+
+    assert num2date(bar[0]) == datetime.datetime(2024, 2, 5, 8, 16)
+    assert bar[1:] == (2319.53, 2320.1, 2318.0, 2319.8, 12.5)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import shutil
+import tempfile
+import threading
+import time
+
+import testcommon
+
+from backtrader.stores.klinecache import KlineCache
+from backtrader.stores.ratelimit import RateLimiter
+
+try:
+    from binance.exceptions import BinanceAPIException
+    from backtrader.stores.binancestore import BinanceStore
+except ImportError:
+    BinanceStore = None  # python-binance is not installed
+
+
+class FakeTime(object):
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = list()
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, secs):
+        self.sleeps.append(secs)
+        self.now += secs
+
+
+class Response(object):
+    def __init__(self, headers):
+        self.headers = headers
+        self.text = ''
+
+
+class Session(object):
+    def __init__(self):
+        self.hooks = {'response': list()}
+
+
+class Client(object):
+    '''Stand-in for the binance client: klines every ``step`` ms until
+    ``now`` and the weight used reported in the headers of the response.
+    Like the actual client, the last response is kept in ``response`` and
+    the response hooks of the session are called'''
+    def __init__(self, step=60000, now=10 ** 13):
+        self.step = step
+        self.now = now
+        self.used = 0
+        self.calls = list()
+        self.fail = list()  # status codes of the next (rejected) calls
+        self.response = None
+        self.session = Session()
+        self.sent = dict()  # thread name -> used weight in its response
+        self.barrier = None  # to hold concurrent calls after the response
+
+    def respond(self, headers):
+        self.response = response = Response(headers)
+        self.sent[threading.current_thread().name] = \
+            headers['x-mbx-used-weight-1m']
+        for hook in self.session.hooks['response']:
+            hook(response)
+
+        if self.barrier is not None:
+            self.barrier.wait(5.0)
+
+        return response
+
+    def kline(self, t):
+        return [t, '1.0', '2.0', '0.5', '1.5', '10.0', t + self.step - 1]
+
+    def get_klines(self, symbol, interval, startTime, endTime, limit):
+        self.calls.append((startTime, endTime))
+        self.used += 2
+        headers = {'x-mbx-used-weight-1m': str(self.used)}
+        if self.fail:
+            headers['Retry-After'] = '3'
+            raise BinanceAPIException(
+                self.respond(headers), self.fail.pop(0),
+                '{"code": -1003, "msg": "Too many requests"}')
+
+        self.respond(headers)
+        first = -(-startTime // self.step) * self.step
+        last = min(endTime, self.now)
+        times = range(first, last + 1, self.step)
+        return [self.kline(t) for t in times][:limit]
+
+
+def getstore(client, limiter, cache=None):
+    # the api is not contacted: only the attributes used by the calls
+    store = BinanceStore.__new__(BinanceStore)
+    store.binance = client
+    store.limiter = limiter
+    store.retries = 3
+    store.workers = 2
+    store.cache = cache
+    store._local = threading.local()
+    client.session.hooks['response'].append(store._keep_headers)
+    return store
+
+
+class Limiter(RateLimiter):
+    '''Records the used weight each thread updates the budget with'''
+    def __init__(self, *args, **kwargs):
+        super(Limiter, self).__init__(*args, **kwargs)
+        self.seen = dict()
+
+    def update(self, headers):
+        self.seen[threading.current_thread().name] = \
+            headers['x-mbx-used-weight-1m']
+        super(Limiter, self).update(headers)
+
+
+def test_run(main=False):
+    if BinanceStore is None:
+        return
+
+    ftime = FakeTime()
+    limiter = RateLimiter(BinanceStore._LIMITS,
+                          headers=BinanceStore._LIMIT_HEADERS,
+                          clock=ftime.clock, sleep=ftime.sleep)
+    client = Client()
+    store = getstore(client, limiter)
+
+    # the server reports the weight used by others: the budget follows it
+    client.used = 5997  # 5999 after the call
+    store.get_klines('ETHUSDT', '1m', 0, 60000)
+    assert not ftime.sleeps
+    store.get_klines('ETHUSDT', '1m', 0, 60000)  # takes 2, 1 available
+    assert len(ftime.sleeps) == 1 and abs(ftime.sleeps[0] - 0.01) < 1e-6
+
+    # rejected with 418/429: wait what the server says and try again
+    ftime.now += 60  # budget refilled
+    ftime.sleeps, client.used, client.calls = list(), 0, list()
+    client.fail = [418, 429]
+    klines = store.get_klines('ETHUSDT', '1m', 0, 60000)
+    if main:
+        print('sleeps after 418/429:', ftime.sleeps)
+
+    assert len(klines) == 2 and len(client.calls) == 3
+    assert len(ftime.sleeps) == 2
+    assert all(3.0 <= s <= 3.3 for s in ftime.sleeps)
+
+    # intervals without fixed length are paginated serially and each page
+    # takes its weight: 4 pages of 3 klines (10 klines) use all 8 tokens
+    ftime.sleeps = list()
+    limiter = RateLimiter({'weight-1m': (8, 60)},
+                          clock=ftime.clock, sleep=ftime.sleep)
+    client = Client(step=1000)
+    store = getstore(client, limiter)
+    store._KLINES_PAGE = 3
+    klines = store.get_historical_klines('ETHUSDT', '1M', 0, 9999)
+    assert [k[0] for k in klines] == list(range(0, 10000, 1000))
+    assert len(client.calls) == 4 and not ftime.sleeps
+    limiter.acquire(**{'weight-1m': 1})
+    assert ftime.sleeps  # nothing left in the budget
+
+    # concurrent calls: each thread syncs the budget with the headers of its
+    # own response, even if the other thread got its response later
+    limiter = Limiter(BinanceStore._LIMITS,
+                      headers=BinanceStore._LIMIT_HEADERS)
+    client = Client()
+    client.barrier = threading.Barrier(2)
+    store = getstore(client, limiter)
+    threads = [threading.Thread(target=store.get_klines, name=name,
+                                args=('ETHUSDT', '1m', 0, 60000))
+               for name in ('kl1', 'kl2')]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    if main:
+        print('sent:', client.sent, 'seen:', limiter.seen)
+
+    assert limiter.seen == client.sent and len(client.sent) == 2
+
+    # klines with a cache: only what the cache lacks is downloaded
+    path = tempfile.mkdtemp()
+    try:
+        check_cache(KlineCache(path), main)
+    finally:
+        shutil.rmtree(path)
+
+
+def check_cache(cache, main):
+    step = 60000
+    now = int(time.time() * 1000) // step * step - 60 * step  # all closed
+    client = Client(step=step, now=now)
+    store = getstore(client, RateLimiter(BinanceStore._LIMITS), cache)
+
+    def columns(start):
+        client.calls = list()
+        cols = store.get_kline_columns('ETHUSDT', '1m', start)
+        return [int(t) for t in cols[0]]
+
+    # cold: everything from start downloaded and cached (the newest dropped)
+    start = now - 100 * step
+    assert columns(start) == list(range(start, now, step))
+    assert client.calls[0][0] == start
+    assert list(cache.read('ETHUSDT', '1m')[0]) == \
+        list(range(start, now + 1, step))
+
+    # warm: only the klines after the last cached one are downloaded
+    client.now = now + 5 * step
+    assert columns(start + 10 * step) == \
+        list(range(start + 10 * step, client.now, step))
+    assert [c[0] for c in client.calls] == [now + 1]
+    assert list(cache.read('ETHUSDT', '1m')[0]) == \
+        list(range(start, client.now + 1, step))
+
+    if main:
+        print('cached:', len(cache.read('ETHUSDT', '1m')[0]))
+
+    # start earlier than the cache: downloaded from start, cache rewritten
+    assert columns(start - 10 * step) == \
+        list(range(start - 10 * step, client.now, step))
+    assert client.calls[0][0] == start - 10 * step
+    assert list(cache.read('ETHUSDT', '1m')[0]) == \
+        list(range(start - 10 * step, client.now + 1, step))
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import shutil
+import tempfile
+
+import testcommon
+
+from backtrader.stores.klinecache import KlineCache
+
+
+def klines(start, count, step=60000):
+    # like the API: open time (ms), values as strings and more fields
+    return [[t, '1.5', '2.0', '1.0', str(1.0 + i / 8.0), '10', t + step - 1]
+            for i, t in enumerate(range(start, start + count * step, step))]
+
+
+def test_run(main=False):
+    path = tempfile.mkdtemp()
+    try:
+        cache = KlineCache(path)
+        assert not any(cache.read('BTCUSDT', '1m'))
+
+        cache.append('BTCUSDT', '1m', KlineCache.columns(klines(0, 3)))
+        cache.append('BTCUSDT', '1m', KlineCache.columns(klines(180000, 2)))
+        cache.append('BTCUSDT', '1M', KlineCache.columns(klines(0, 1)))
+
+        cols = KlineCache(path).read('BTCUSDT', '1m')  # a later run
+        if main:
+            print(cols)
+
+        assert list(cols[0]) == [t * 60000.0 for t in range(5)]
+        assert list(cols[4]) == [1.0, 1.125, 1.25, 1.0, 1.125]
+        assert len(cache.read('BTCUSDT', '1M')[0]) == 1
+
+        # an interrupted append leaves a longer column: ignored
+        with open(cache._files('BTCUSDT', '1m')[0], 'ab') as f:
+            f.write(b'\0' * 8)
+        assert [len(col) for col in cache.read('BTCUSDT', '1m')] == [5] * 6
+
+        # data older than the last cached kline rewrites the cache
+        cache.append('BTCUSDT', '1m', KlineCache.columns(klines(0, 2)))
+        assert len(cache.read('BTCUSDT', '1m')[0]) == 2
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import random
+import threading
+import time
+
+import testcommon
+
+import backtrader as bt
+from backtrader.stores.orderpipe import OrderPipeline
+from backtrader.utils.py3 import queue
+
+try:
+    from backtrader.stores.oandastore import OandaStore
+except ImportError:
+    OandaStore = None  # oandapy is not installed
+
+
+class Order(object):
+    def __init__(self, ref):
+        self.ref = ref
+        self.stamps = dict()
+
+
+class Broker(object):
+    '''Stand-in for OandaBroker which records the calls of the store'''
+    def __init__(self):
+        self.orders = dict()
+        self.calls = list()
+
+    def __getattr__(self, name):  # _submit, _accept, _reject, _cancel
+        return lambda oref: self.calls.append((name, oref))
+
+
+class API(object):
+    '''Stand-in for the REST api which blocks order creations until
+    released'''
+    def __init__(self):
+        self.release = threading.Event()
+        self.closed = list()
+
+    def create_order(self, account, **kwargs):
+        self.release.wait(5.0)
+        return {'orderOpened': {'id': 1000 + kwargs['ref']}}
+
+    def close_order(self, account, oid):
+        self.closed.append(oid)
+
+    def get_history(self, instrument, granularity, candleFormat, start, end):
+        '''A candle per minute in [start, end], both included as the server
+        does: consecutive pages overlap'''
+        if start in self.failing:
+            raise ValueError('unexpected failure')
+
+        time.sleep(random.random() / 100.0)  # pages done out of order
+        return {'candles': [{'time': str(t)}
+                            for t in range(start, end + 1, 60)]}
+
+
+def history(store, dtbegin, dtend):
+    q = store.candles('EUR_USD', dtbegin, dtend, bt.TimeFrame.Minutes, 1,
+                      'midpoint', True)
+    msgs = list()
+    while True:
+        msg = q.get(timeout=5.0)  # the download must not hang
+        msgs.append(msg)
+        if msg is None or msg == {}:  # error (after the response) or end
+            return msgs
+
+
+def orderstore():
+    store = OandaStore()
+    store.oapi = API()
+    store.broker = Broker()
+    store._orderpipe = OrderPipeline(workers=2, callback=store._order_done)
+    store.q_orderclose = queue.Queue()
+    t = threading.Thread(target=store._t_order_cancel)
+    t.daemon = True
+    t.start()
+    return store
+
+
+def test_run(main=False):
+    if OandaStore is None:
+        return
+
+    # an order cancelled while its creation is in flight is closed once the
+    # creation is done
+    store = orderstore()
+    for ref in (1, 2):
+        store.broker.orders[ref] = order = Order(ref)
+        store._orderpipe.put(ref, store._order_create, ref,
+                             dict(type='limit', ref=ref))
+
+    store.order_cancel(order)  # ref 2, still being created
+    while not store._cancelpend:
+        time.sleep(0.01)  # wait for the cancel thread
+
+    store.oapi.release.set()
+    store._orderpipe.stop()
+    store.q_orderclose.put(None)
+    while store._cancelpend or not store.broker.calls.count(('_cancel', 2)):
+        time.sleep(0.01)  # wait for the cancel thread
+
+    if main:
+        print(store.broker.calls, store.oapi.closed)
+
+    assert store.oapi.closed == [1002]
+    assert ('_cancel', 1) not in store.broker.calls
+
+    # historical download in pages of candles_count candles, delivered in
+    # order and without the candles repeated at the page boundaries
+    store.oapi.failing = set()
+    store.p.candles_count = 7
+    try:
+        dtbegin = datetime.datetime(2020, 1, 1)
+        msgs = history(store, dtbegin, dtbegin + datetime.timedelta(hours=1))
+        start = int((dtbegin - store._DTEPOCH).total_seconds())
+        assert msgs[-1] == {}
+        assert [int(m['time']) for m in msgs[:-1]] == \
+            list(range(start, start + 3601, 60))
+
+        # a page failing with any exception ends with an error, not a hang
+        store.oapi.failing.add(start + 7 * 60 * 2)
+        msgs = history(store, dtbegin, dtbegin + datetime.timedelta(hours=1))
+        if main:
+            print(msgs[-2:], store.notifs)
+
+        assert msgs[-1] is None and msgs[-2]['code'] == 599
+        assert [int(m['time']) for m in msgs[:-2]] == \
+            list(range(start, start + 7 * 60 * 2 + 1, 60))
+    finally:
+        store.p.candles_count = 5000
+        store.broker = None  # only the download workers to be stopped
+        store.stop()
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import threading
+import time
+
+import testcommon
+
+from backtrader.stores.orderpipe import OrderPipeline
+
+
+class Exchange(object):
+    '''Stand-in for an order entry API which blocks until released'''
+    def __init__(self):
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        self.running = self.maxrunning = 0
+
+    def create_order(self, ref):
+        with self.lock:
+            self.running += 1
+            self.maxrunning = max(self.maxrunning, self.running)
+
+        self.release.wait(5.0)
+        with self.lock:
+            self.running -= 1
+
+        if ref == 3:
+            raise ValueError('rejected')
+
+        return 'id%d' % ref
+
+
+def test_run(main=False):
+    exchange = Exchange()
+    pipe = OrderPipeline(workers=2)
+    for ref in range(6):
+        pipe.put(ref, exchange.create_order, ref)
+
+    # nothing is done yet and the caller has not waited for the requests
+    assert pipe.get() is None
+    assert pipe.inflight() == 6 and pipe.inflight(3)
+
+    while exchange.running < 2:  # let the workers take the first requests
+        time.sleep(0.01)
+
+    exchange.release.set()
+    pipe.stop()
+
+    done = sorted(iter(pipe.get, None), key=lambda x: x[0])
+    if main:
+        print(done)
+
+    assert exchange.maxrunning == 2  # bounded number of requests in flight
+    assert not pipe.inflight()
+    assert [(ref, ret) for ref, ret, exc in done] == \
+        [(0, 'id0'), (1, 'id1'), (2, 'id2'), (3, None), (4, 'id4'),
+         (5, 'id5')]
+    assert [ref for ref, ret, exc in done if exc is not None] == [3]
+
+    # with a callback the outcome is delivered from the worker
+    received = list()
+    pipe = OrderPipeline(workers=1,
+                         callback=lambda *args: received.append(args))
+    pipe.put('a', exchange.create_order, 1)
+    pipe.stop()
+    assert received == [('a', 'id1', None)] and pipe.get() is None
+
+
+if __name__ == '__main__':
+    test_run(main=True)
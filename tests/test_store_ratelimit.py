@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import threading
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import testcommon
+
+from backtrader.stores.ratelimit import RateLimiter
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    '''Answers like a rate limited API: reports the used weight in a header
+    and rejects requests with a 429 when asked via the path'''
+    used = 0
+
+    def do_GET(self):
+        cls = self.__class__
+        weight = int(self.path.strip('/').split('/')[-1])
+        cls.used += weight
+        if self.path.startswith('/limited/'):
+            self.send_response(429)
+            self.send_header('Retry-After', '3')
+        else:
+            self.send_response(200)
+        self.send_header('X-MBX-USED-WEIGHT-1M', str(cls.used))
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeTime(object):
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = list()
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, secs):
+        self.sleeps.append(secs)
+        self.now += secs
+
+
+def request(limiter, url, weight, attempt=1):
+    limiter.acquire(**{'weight-1m': weight})
+    try:
+        resp = urlopen(url)
+    except HTTPError as err:
+        limiter.update(err.headers)
+        if err.code in (418, 429):
+            limiter.backoff(attempt, err.headers.get('Retry-After'))
+        return err.code
+
+    limiter.update(resp.headers)
+    return resp.status
+
+
+def test_run(main=False):
+    server = HTTPServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    url = 'http://127.0.0.1:%d' % server.server_address[1]
+
+    try:
+        ftime = FakeTime()
+        limiter = RateLimiter({'weight-1m': (10, 60)},
+                              headers={'x-mbx-used-weight-': 'weight-'},
+                              clock=ftime.clock, sleep=ftime.sleep)
+
+        # below the budget: no waiting at all
+        for i in range(5):
+            assert request(limiter, url + '/ok/1', 1) == 200
+        assert not ftime.sleeps
+
+        # other clients used the budget: the server reports it
+        StubHandler.used = 9
+        assert request(limiter, url + '/ok/1', 1) == 200  # used 10
+        assert not ftime.sleeps
+        assert request(limiter, url + '/ok/1', 1) == 200
+        assert ftime.sleeps and abs(sum(ftime.sleeps) - 6.0) < 1e-6
+
+        # rejected: wait the time requested by the server (plus jitter)
+        ftime.sleeps = list()
+        StubHandler.used = 0
+        ftime.now += 60  # budget refilled
+        assert request(limiter, url + '/limited/1', 1) == 429
+        assert request(limiter, url + '/ok/1', 1) == 200
+        assert len(ftime.sleeps) == 1 and 3.0 <= ftime.sleeps[0] <= 3.3
+
+        if main:
+            print('sleeps after 429:', ftime.sleeps)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    test_run(main=True)
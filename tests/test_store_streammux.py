@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs, urlparse
+
+import testcommon
+
+from backtrader.stores.streammux import StreamMultiplexer, CombinedStreams
+
+try:
+    import websockets
+    from websockets.asyncio.server import serve
+except ImportError:
+    websockets = None
+
+
+class SocketManager(object):
+    '''Stand-in for a websocket manager with combined streams (the packing
+    and reopening logic is checked without a server)'''
+    def __init__(self):
+        self.sockets = dict()  # key -> (callback, streams)
+        self.opened = 0
+
+    def start_multiplex_socket(self, callback, streams):
+        self.opened += 1
+        key = 'socket%d' % self.opened
+        self.sockets[key] = (callback, streams)
+        return key
+
+    def stop_socket(self, key):
+        del self.sockets[key]
+
+    def subscribe(self, key, streams):
+        self.sockets[key][1].extend(streams)
+
+    def send(self, stream, data):
+        # deliver to the socket carrying the stream (as the server would)
+        for callback, streams in list(self.sockets.values()):
+            if stream in streams:
+                callback({'stream': stream, 'data': data})
+
+    def fail(self, key):
+        self.sockets[key][0]({'e': 'error', 'm': 'max reconnections'})
+
+
+class StreamServer(object):
+    '''Local combined stream server: streams asked for in the url and with
+    SUBSCRIBE requests'''
+    def __init__(self):
+        self.conns = dict()  # connection -> subscribed streams
+        self.urls = list()  # streams in the url of each connection
+        self.requests = list()
+
+    async def handler(self, conn):
+        query = parse_qs(urlparse(conn.request.path).query)
+        streams = query['streams'][0].split('/')
+        self.urls.append(streams)
+        self.conns[conn] = list(streams)
+        try:
+            async for msg in conn:
+                msg = json.loads(msg)
+                self.requests.append(msg['params'])
+                self.conns[conn].extend(msg['params'])
+                await conn.send(json.dumps(dict(result=None, id=msg['id'])))
+        finally:
+            self.conns.pop(conn, None)
+
+    async def send(self, stream, data):
+        for conn, streams in list(self.conns.items()):
+            if stream in streams:
+                msg = dict(stream=stream, data=data)
+                await conn.send(json.dumps(msg))
+
+
+async def until(cond, timeout=5.0):
+    t0 = time.time()
+    while not cond():
+        assert time.time() - t0 < timeout
+        await asyncio.sleep(0.01)
+
+
+async def run_websocket(main=False):
+    server = StreamServer()
+    async with serve(server.handler, '127.0.0.1', 0) as wsserver:
+        port = wsserver.sockets[0].getsockname()[1]
+        ws = CombinedStreams('ws://127.0.0.1:%d' % port, retrywait=0.05,
+                             msgwait=0.05)
+        mux = StreamMultiplexer(ws.start, ws.stop, maxstreams=3,
+                                subscribe=ws.subscribe)
+
+        received = list()
+        streams = ['s%d@kline_1m' % i for i in range(5)]
+        for stream in streams:
+            mux.subscribe(stream,
+                          lambda data, s=stream: received.append((s, data)))
+
+        # 5 streams in 2 connections, never reconnected to add a stream
+        await until(lambda: sorted(sum(server.conns.values(), [])) ==
+                    streams)
+        assert len(server.urls) == 2
+        assert sorted(map(len, server.conns.values())) == [2, 3]
+
+        # added later over the open connection
+        mux.subscribe('late@kline_1m', lambda data: received.append(data))
+        await until(lambda: ['late@kline_1m'] in server.requests)
+        assert len(server.urls) == 2
+
+        for i, stream in enumerate(streams):
+            await server.send(stream, i)
+        await server.send('late@kline_1m', 'late')
+        await until(lambda: len(received) == 6)
+        assert sorted(received[:5]) == [(s, i) for i, s in enumerate(streams)]
+
+        # a dropped connection asks for all its streams when reconnecting
+        conn = [c for c, s in server.conns.items() if len(s) == 3][0]
+        dropped = list(server.conns[conn])
+        await conn.close()
+        await until(lambda: len(server.urls) == 3)
+        assert server.urls[-1] == dropped
+
+        if main:
+            print('urls', server.urls, 'requests', server.requests)
+
+        mux.stop()
+        await until(lambda: not server.conns)
+
+
+def test_run(main=False):
+    manager = SocketManager()
+    mux = StreamMultiplexer(manager.start_multiplex_socket,
+                            manager.stop_socket, maxstreams=2)
+
+    received = list()
+    streams = ['btcusdt@kline_1m', 'ethusdt@kline_1m', 'btcusdt@kline_5m']
+    for stream in streams:
+        mux.subscribe(stream, lambda data, s=stream: received.append((s, data)))
+    mux.subscribe(streams[0], lambda data: received.append(('again', data)))
+
+    # 3 streams in 2 sockets, the 1st one reopened to add the 2nd stream
+    assert sorted(s for cb, s in manager.sockets.values()) == \
+        [streams[:2], streams[2:]]
+
+    for i, stream in enumerate(streams):
+        manager.send(stream, i)
+    assert received == [(streams[0], 0), ('again', 0),
+                        (streams[1], 1), (streams[2], 2)]
+
+    # a socket which gives up is opened again with the same streams
+    key = [k for k, (cb, s) in manager.sockets.items() if s == streams[2:]][0]
+    manager.fail(key)
+    assert key not in manager.sockets
+    assert sorted(s for cb, s in manager.sockets.values()) == \
+        [streams[:2], streams[2:]]
+
+    del received[:]
+    manager.send(streams[2], 'back')
+    assert received == [(streams[2], 'back')]
+
+    if main:
+        print(manager.sockets)
+
+    mux.stop()
+    assert not manager.sockets
+
+    # with subscribe the socket is not opened again to add a stream
+    manager = SocketManager()
+    mux = StreamMultiplexer(manager.start_multiplex_socket,
+                            manager.stop_socket, maxstreams=2,
+                            subscribe=manager.subscribe)
+    for stream in streams:
+        mux.subscribe(stream, lambda data: None)
+    assert manager.opened == 2
+    assert sorted(s for cb, s in manager.sockets.values()) == \
+        [streams[:2], streams[2:]]
+
+    if websockets is not None:
+        asyncio.run(run_websocket(main=main))
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from decimal import Decimal
+
+import testcommon
+
+import backtrader as bt
+
+
+class RebalanceStrategy(bt.Strategy):
+    params = (('batch', True),)
+
+    def __init__(self):
+        self.events = list()
+
+    def notify_order(self, order):
+        self.events.append((len(self), order.data._id, order.getstatusname(),
+                            str(order.executed.price),
+                            str(order.executed.size)))
+
+    def next(self):
+        if len(self) % 10:
+            return
+
+        # rotate the weights over the datas, leaving one of them out
+        n = len(self.datas)
+        k = len(self) // 10
+        targets = [(d, Decimal('0.15') * ((i + k) % n))
+                   for i, d in enumerate(self.datas)]
+
+        if self.p.batch:
+            self.rebalance(targets)
+        else:
+            for d, target in targets:
+                self.order_target_percent(data=d, target=target)
+
+
+def run_rebalance(batch, checksubmit=True):
+    cerebro = bt.Cerebro()
+    cerebro.broker = bt.brokers.BackBroker(cash=Decimal('100000'),
+                                           checksubmit=checksubmit)
+    for i in range(4):
+        cerebro.adddata(testcommon.getdata(i % 2))
+    cerebro.addstrategy(RebalanceStrategy, batch=batch)
+    strat = cerebro.run()[0]
+    return strat.events, str(strat.broker.getvalue())
+
+
+def test_run(main=False):
+    for checksubmit in [True, False]:
+        events, value = run_rebalance(True, checksubmit=checksubmit)
+        if main:
+            print(checksubmit, len(events), value)
+        else:
+            assert any(e[2] == 'Completed' for e in events)
+            assert (events, value) == run_rebalance(False, checksubmit)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
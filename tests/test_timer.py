@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import os.path
+
+import testcommon
+
+import backtrader as bt
+
+
+class FullCheckTimer(bt.Timer):
+    '''Evaluates every check in full (no precomputed next time)'''
+    def _nextcheck(self, ddate):
+        return float('-inf')
+
+
+timers = [
+    dict(when=datetime.time(10, 0)),
+    dict(when=datetime.time(10, 0), repeat=datetime.timedelta(minutes=45)),
+    dict(when=bt.timer.SESSION_START, offset=datetime.timedelta(minutes=15)),
+    dict(when=bt.timer.SESSION_END, cheat=True),
+    dict(when=datetime.time(15, 30), weekdays=[2, 4], weekcarry=True),
+    dict(when=datetime.time(9, 0), monthdays=[1, 15, 31]),
+]
+
+
+class TimersStrategy(bt.Strategy):
+    params = (('timercls', bt.Timer),)
+
+    def __init__(self):
+        self.fired = list()
+        for i, kwargs in enumerate(timers):
+            timer = self.p.timercls(tid=i, owner=self, strats=False,
+                                    **kwargs)
+            self.env._pretimers.append(timer)
+
+    def notify_timer(self, timer, when, *args, **kwargs):
+        self.fired.append((timer.p.tid, when, len(self.data)))
+
+
+def fired_timers(timercls):
+    path = os.path.join(testcommon.modpath, testcommon.dataspath,
+                        '2006-min-005.txt')
+    data = bt.feeds.BacktraderCSVData(dataname=path,
+                                      timeframe=bt.TimeFrame.Minutes,
+                                      compression=5,
+                                      sessionstart=datetime.time(9, 30),
+                                      sessionend=datetime.time(17, 15))
+    cerebro = bt.Cerebro()
+    cerebro.adddata(data)
+    cerebro.addstrategy(TimersStrategy, timercls=timercls)
+    return cerebro.run()[0].fired
+
+
+def test_run(main=False):
+    fired = fired_timers(bt.Timer)
+    if main:
+        print(len(fired))
+    else:
+        assert fired
+        assert repr(fired) == repr(fired_timers(FullCheckTimer))
+
+
+if __name__ == '__main__':
+    test_run(main=True)
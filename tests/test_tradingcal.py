@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from datetime import date, datetime, time
+
+import testcommon
+
+import backtrader as bt
+
+
+def test_run(main=False):
+    cal = bt.TradingCalendar(
+        open=time(9, 30), close=time(16, 0),
+        holidays=[date(2006, 7, 4)],
+        earlydays=[(date(2006, 7, 3), time(9, 30), time(13, 0))])
+
+    for _ in range(2):  # 2nd round is served from the session table
+        # within the session and before the open
+        assert cal.schedule(datetime(2006, 7, 5, 10, 0)) == (
+            datetime(2006, 7, 5, 9, 30), datetime(2006, 7, 5, 16, 0))
+        assert cal.schedule(datetime(2006, 7, 5, 8, 0)) == (
+            datetime(2006, 7, 5, 9, 30), datetime(2006, 7, 5, 16, 0))
+        # after the close: the session of the next trading day
+        assert cal.schedule(datetime(2006, 7, 5, 17, 0)) == (
+            datetime(2006, 7, 6, 9, 30), datetime(2006, 7, 6, 16, 0))
+        assert cal.schedule(datetime(2006, 7, 7, 17, 0)) == (
+            datetime(2006, 7, 10, 9, 30), datetime(2006, 7, 10, 16, 0))
+        # early close (after it: the holiday on the next day is skipped)
+        assert cal.schedule(datetime(2006, 7, 3, 12, 0)) == (
+            datetime(2006, 7, 3, 9, 30), datetime(2006, 7, 3, 13, 0))
+        assert cal.schedule(datetime(2006, 7, 3, 14, 0)) == (
+            datetime(2006, 7, 5, 9, 30), datetime(2006, 7, 5, 16, 0))
+
+        # next trading days skip holidays and weekends
+        assert cal.nextday(date(2006, 7, 3)) == date(2006, 7, 5)
+        assert cal.nextday(date(2006, 7, 7)) == date(2006, 7, 10)
+        assert cal.last_weekday(date(2006, 7, 7))
+        assert not cal.last_weekday(date(2006, 7, 6))
+        assert cal.last_monthday(date(2006, 6, 30))
+
+    # the session table of the calendar is shared by runs and must not
+    # alter the resampled bars
+    calendar = bt.TradingCalendar()
+    bars = list()
+    for _ in range(2):
+        data = testcommon.getdata(0)
+        cerebro = bt.Cerebro()
+        cerebro.addcalendar(calendar)
+        cerebro.resampledata(data, timeframe=bt.TimeFrame.Weeks)
+        cerebro.addstrategy(bt.Strategy)
+        cerebro.run()
+        bars.append([tuple(line.array) for line in data.lines])
+
+    if main:
+        print(len(bars[0][0]), len(bars[1][0]))
+    else:
+        assert len(bars[0][0]) == 51
+        assert repr(bars[0]) == repr(bars[1])
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+
+import testcommon
+
+from backtrader.utils import date2num, num2date, dates2num, num2dates
+
+try:
+    import pytz
+except ImportError:
+    pytz = None
+
+# (timezone, local day with a change) Lord_Howe changes by 30 minutes
+DSTCHANGES = [
+    ('Europe/Madrid', datetime.datetime(2019, 3, 31)),
+    ('Europe/Madrid', datetime.datetime(2019, 10, 27)),
+    ('America/New_York', datetime.datetime(2019, 3, 10)),
+    ('America/New_York', datetime.datetime(2019, 11, 3)),
+    ('Australia/Lord_Howe', datetime.datetime(2019, 4, 7)),
+    ('Australia/Lord_Howe', datetime.datetime(2019, 10, 6)),
+]
+
+
+def check_dst(main=False):
+    # every 7 minutes (and some microseconds) around the changes
+    for tzname, day in DSTCHANGES:
+        tz = pytz.timezone(tzname)
+        x0 = date2num(day - datetime.timedelta(days=1))
+        xs = [x0 + i * 7.0 / 1440.0 + i * 1.23e-8 for i in range(3 * 206)]
+
+        dts = num2dates(xs, tz=tz)
+        assert dts == [num2date(x, tz=tz) for x in xs]
+
+        adts = num2dates(xs, tz=tz, naive=False)
+        expected = [num2date(x, tz=tz, naive=False) for x in xs]
+        assert adts == expected
+        assert [(dt.utcoffset(), dt.tzname()) for dt in adts] == \
+            [(dt.utcoffset(), dt.tzname()) for dt in expected]
+
+        # local times (ambiguous ones are localized as date2num does)
+        assert dates2num(dts, tz=tz) == [date2num(dt, tz=tz) for dt in dts]
+
+        # round trip of the aware datetimes
+        back = dates2num(adts)
+        assert max(abs(b - x) for b, x in zip(back, xs)) < 1e-10
+        if main:
+            print(tzname, day.date(), len(xs), 'offsets',
+                  sorted(set(str(dt.utcoffset()) for dt in adts)))
+
+
+def test_run(main=False):
+    if pytz is not None:
+        check_dst(main)
+
+
+if __name__ == '__main__':
+    test_run(main=True)